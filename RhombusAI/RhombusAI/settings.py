@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -135,3 +136,111 @@ CORS_ALLOWED_ORIGINS = [
     'http://192.168.0.3:3000'
     # Add other allowed origins as needed
 ]
+
+# Data type inference
+# 'vectorised' classifies whole columns with pandas string accessors (data/inference.py),
+# 'legacy' runs the original per-value predicates. Both return the same labels.
+INFERENCE_ENGINE = 'vectorised'
+
+# 'full' scans every value of every column; 'sampled' classifies columns longer than
+# INFERENCE_SAMPLE_SIZE from a head/tail/random sample and only falls back to a full scan
+# when the sample strata disagree or the confidence is below INFERENCE_CONFIDENCE_THRESHOLD.
+INFERENCE_MODE = 'full'
+INFERENCE_SAMPLE_SIZE = 3000
+INFERENCE_CONFIDENCE_THRESHOLD = 0.95
+
+# Frames with at least PARALLEL_MIN_CELLS cells (rows x columns) are inferred and converted
+# column by column across INFERENCE_WORKERS processes; smaller frames stay serial. The workers form one
+# pool per server process, shared by concurrent uploads and started with PARALLEL_START_METHOD
+# ('forkserver' or 'spawn'; never 'fork', which is unsafe in a threaded server). The default leaves
+# half the CPUs, and at most four, to the other server processes.
+INFERENCE_WORKERS = max(1, min(4, (os.cpu_count() or 1) // 2))
+PARALLEL_MIN_CELLS = 500000
+PARALLEL_START_METHOD = 'forkserver'
+
+# Processed datasets written by data/storage.py live in one directory per dataset under this root.
+PROCESSED_DATA_ROOT = BASE_DIR / 'processed_data'
+
+# Whole columns read from the column store are kept in an in-process LRU cache taking at most
+# DATASET_CACHE_MAX_BYTES, so repeated overrides and page reads skip deserialisation. 0 disables it.
+DATASET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# CSV uploads of at least STREAMING_UPLOAD_MIN_BYTES are read STREAMING_CHUNK_ROWS rows at a time
+# and written to PROCESSED_DATA_ROOT chunk by chunk. Columns with more than
+# STREAMING_DISTINCT_LIMIT distinct values are never inferred as categories when streaming.
+STREAMING_UPLOAD_MIN_BYTES = 50 * 1024 * 1024
+STREAMING_CHUNK_ROWS = 100000
+STREAMING_DISTINCT_LIMIT = 100000
+
+# After conversion every column is stored in the smallest dtype that holds its values exactly: integers
+# are downcast, whole-number floats with missing values become nullable integers, lossless floats become
+# float32, and text becomes a category when it has at most DTYPE_CATEGORY_MAX_RATIO distinct values
+# per row, or Arrow-backed strings otherwise. DTYPE_COMPACTION = False keeps the converted dtypes.
+DTYPE_COMPACTION = True
+DTYPE_CATEGORY_MAX_RATIO = 0.5
+
+# Uploaded files are read with the READ_DTYPE_BACKEND DataFrame backend. 'pyarrow' keeps string columns
+# in Arrow memory from the reader to the column store, and the text inference checks run as Arrow compute
+# kernels on them; numbers, booleans and dates are read as with the default 'numpy' backend.
+READ_DTYPE_BACKEND = 'numpy'
+
+# Excel workbooks are read with EXCEL_ENGINE: 'calamine' (needs the python-calamine package), 'openpyxl'
+# (read-only, row streaming) or 'auto', which picks calamine when it is installed. With openpyxl,
+# workbooks of at least EXCEL_STREAMING_MIN_BYTES are ingested STREAMING_CHUNK_ROWS rows at a time,
+# like large CSV files. Workbooks are compressed, so the threshold is lower than for CSV files.
+EXCEL_ENGINE = 'auto'
+EXCEL_STREAMING_MIN_BYTES = 10 * 1024 * 1024
+
+# Upload and override responses include the first ROWS_DEFAULT_LIMIT rows; further pages are
+# read from /data/<id>/rows/, which returns at most ROWS_MAX_LIMIT rows per request.
+ROWS_DEFAULT_LIMIT = 50
+ROWS_MAX_LIMIT = 1000
+
+# Uploads posted with mode=async are processed by JOB_WORKERS background threads and tracked through
+# /data/jobs/<id>/. JOB_QUEUE_EAGER runs each job inside the request instead (used by the tests).
+JOB_WORKERS = 2
+JOB_QUEUE_EAGER = False
+
+# Date columns are converted with a strftime format detected from up to DATE_FORMAT_SAMPLE_SIZE
+# distinct values; values no format reads are parsed with dateutil, whose results are kept in an
+# LRU cache of DATE_PARSE_CACHE_SIZE strings.
+DATE_FORMAT_SAMPLE_SIZE = 1000
+DATE_PARSE_CACHE_SIZE = 65536
+
+# Time Duration columns also read phrases such as '1 year and 2 months' and ISO 8601 durations such as
+# 'P1Y2M'. Months and years have no fixed length, so they are counted as DURATION_MONTH_DAYS and
+# DURATION_YEAR_DAYS days; the defaults are the average lengths in the Gregorian calendar.
+DURATION_MONTH_DAYS = 30.436875
+DURATION_YEAR_DAYS = 365.2425
+
+# An override dry run ('dry_run' in the request) converts up to OVERRIDE_PREVIEW_SAMPLE_SIZE
+# head/tail/random rows of the column and reports the values that would fail, without saving anything.
+OVERRIDE_PREVIEW_SAMPLE_SIZE = 1000
+
+# Log records of the data app go to the console. DATA_LOG_LEVEL=DEBUG adds per-column inference timings
+# and conversion details; the per-stage timings are logged at INFO on 'data.metrics', with the measured
+# values attached to each record as `metrics`. The aggregated timings are served at /data/metrics/.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        'data': {'handlers': ['console'], 'level': os.environ.get('DATA_LOG_LEVEL', 'INFO'), 'propagate': False},
+    },
+}
+
+# Uploads are hashed with BLAKE2b while they stream in. A file identical to one already processed with
+# the same inference settings is answered from the cache: the new dataset shares the stored raw file and
+# column store, which is copied only when a column type is overridden. The least recently used entries
+# are dropped beyond UPLOAD_CACHE_MAX_ENTRIES entries or UPLOAD_CACHE_MAX_BYTES of column stores, and
+# their files deleted once no dataset uses them. Bump UPLOAD_CACHE_VERSION when the inference or
+# conversion code changes its results, so cached entries stop being reused.
+UPLOAD_CACHE_ENABLED = True
+UPLOAD_CACHE_VERSION = 4
+UPLOAD_CACHE_MAX_ENTRIES = 100
+UPLOAD_CACHE_MAX_BYTES = 5 * 1024 ** 3
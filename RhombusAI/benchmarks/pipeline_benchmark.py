@@ -0,0 +1,276 @@
+"""
+Benchmarks the inference and conversion pipeline on synthetic datasets.
+
+Every stage is timed on the same frames from benchmarks/synthetic.py, which mix numbers with thousands
+separators and percentages, currency amounts, dates in several formats, durations, booleans, complex
+numbers, categories, free text and missing-value tokens:
+
+- infer_data_type on each column
+- the matching convert_to_* function on each column
+- infer_and_convert_data_types on the whole frame
+- serialise_dataframe on the converted frame
+- the upload, override and rows views end to end, through the Django test client against a throwaway
+  test database and storage directory
+
+Each result records the fastest run in seconds, the throughput in rows per second and the peak resident
+set size of the process during the runs. Results are written as JSON and can be compared with an earlier
+run, e.g. one taken on another commit.
+
+Usage, from the RhombusAI directory:
+    python benchmarks/pipeline_benchmark.py --rows 10000 100000 --output before.json
+    python benchmarks/pipeline_benchmark.py --rows 10000 100000 --output after.json --compare before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RhombusAI.settings')
+
+import django
+
+django.setup()
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from data.conversions import (
+    convert_to_boolean, convert_to_categorical, convert_to_complex, convert_to_datetime, convert_to_numeric,
+    convert_to_timedelta,
+)
+from data.typechecks import is_category
+from data.utils import infer_data_type, infer_and_convert_data_types, serialise_dataframe
+from synthetic import COLUMN_KINDS, make_csv, make_frame
+
+
+def convert_to_category(df, col):
+    return convert_to_categorical(df, col, is_category)
+
+
+CONVERTERS = {
+    'integer': convert_to_numeric,
+    'numeric': convert_to_numeric,
+    'currency': convert_to_numeric,
+    'date': convert_to_datetime,
+    'timedelta': convert_to_timedelta,
+    'boolean': convert_to_boolean,
+    'complex': convert_to_complex,
+    'category': convert_to_category,
+}
+
+
+class PeakRSS:
+    """
+    Measures the peak resident set size of the process.
+
+    On Linux the kernel's high-water mark is reset before each measurement, so the peak belongs to the
+    code being measured. Elsewhere the peak since the process started is reported.
+    """
+
+    def __init__(self):
+        self.resettable = os.path.exists('/proc/self/clear_refs')
+
+    def reset(self):
+        if self.resettable:
+            try:
+                with open('/proc/self/clear_refs', 'w') as f:
+                    f.write('5')
+            except OSError:
+                self.resettable = False
+
+    def peak_mb(self):
+        if self.resettable:
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return int(line.split()[1]) / 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(run, prepare=None, repeat=1, rss=None):
+    """
+    Times a benchmark, returning the fastest of `repeat` runs and the peak RSS across them.
+
+    `prepare` is called before every run, outside the timing, and its result is passed to `run`.
+    Anything the pipeline prints is discarded.
+    """
+    best, peak = None, 0.0
+    for _ in range(repeat):
+        state = prepare() if prepare is not None else None
+        rss.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+        peak = max(peak, rss.peak_mb())
+        best = elapsed if best is None else min(best, elapsed)
+    return best, peak
+
+
+def pipeline_cases(df):
+    """
+    Yields (name, prepare, run) for the in-process stages of the pipeline.
+    """
+    for col in df.columns:
+        yield f'infer_data_type[{col}]', None, lambda _, col=col: infer_data_type(df[col])
+
+    for col in df.columns:
+        converter = CONVERTERS.get(col.rsplit('_', 1)[0])
+        if converter is not None:
+            yield f'{converter.__name__}[{col}]', df.copy, lambda frame, col=col, converter=converter: converter(frame, col)
+
+    yield 'infer_and_convert_data_types', df.copy, infer_and_convert_data_types
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        converted = infer_and_convert_data_types(df.copy())
+    yield 'serialise_dataframe', None, lambda _: serialise_dataframe(converted)
+
+
+def view_cases(csv, columns):
+    """
+    Yields (name, prepare, run) for the views. The caller must have set up a test database.
+    """
+    client = Client()
+
+    def upload(_):
+        file = SimpleUploadedFile('benchmark.csv', csv, content_type='text/csv')
+        response = client.post(reverse('data:file_upload'), {'datafile': file})
+        if response.status_code != 200:
+            raise RuntimeError(f'Upload failed: {response.content[:200]}')
+        return response.json()
+
+    yield 'view:upload', None, upload
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        dataset_id = upload(None)['dataset_id']
+    column = next((col for col in columns if col.startswith('category_')), columns[0])
+    body = json.dumps({'column': column, 'new_type': 'Text'})
+    yield 'view:override', None, lambda _: client.post(reverse('data:override'), body, content_type='application/json')
+
+    url = reverse('data:rows', args=[dataset_id])
+    for orient in ('records', 'columns'):
+        params = {'limit': settings.ROWS_MAX_LIMIT, 'orient': orient}
+        yield f'view:rows[{orient}]', None, lambda _, params=params: client.get(url, params)
+
+
+@contextlib.contextmanager
+def test_environment():
+    """
+    Runs the views against a throwaway test database, media root and column store root.
+    """
+    directory = tempfile.mkdtemp(prefix='benchmark-')
+    overrides = override_settings(
+        MEDIA_ROOT=directory, PROCESSED_DATA_ROOT=os.path.join(directory, 'processed_data'), JOB_QUEUE_EAGER=True,
+    )
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    overrides.enable()
+    try:
+        yield
+    finally:
+        overrides.disable()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, cwd=BENCHMARK_DIR, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'inference_engine': getattr(settings, 'INFERENCE_ENGINE', 'vectorised'),
+        'inference_mode': getattr(settings, 'INFERENCE_MODE', 'full'),
+        'inference_workers': getattr(settings, 'INFERENCE_WORKERS', 1),
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['rows'], r['columns']): r for r in json.load(f)['results']}
+    print(f"\ncompared with {baseline_path}")
+    print(f"{'rows':>10} {'benchmark':<44} {'before':>9} {'after':>9} {'change':>8}")
+    for result in results:
+        before = baseline.get((result['benchmark'], result['rows'], result['columns']))
+        if before is None:
+            continue
+        change = before['seconds'] / result['seconds'] if result['seconds'] else float('inf')
+        print(f"{result['rows']:>10} {result['benchmark']:<44} {before['seconds']:>9.4f} {result['seconds']:>9.4f} {change:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--kinds', nargs='+', choices=list(COLUMN_KINDS), help='Column kinds to generate. Defaults to all.')
+    parser.add_argument('--columns', type=int, help='Number of columns, cycling through the kinds. Defaults to one per kind.')
+    parser.add_argument('--none-fraction', type=float, default=0.01, help='Share of cells replaced by missing-value tokens.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the fastest is reported.')
+    parser.add_argument('--only', help='Only run benchmarks whose name contains this string.')
+    parser.add_argument('--skip-views', action='store_true', help='Skip the end-to-end view benchmarks.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--compare', help='A JSON file from an earlier run to compare against.')
+    args = parser.parse_args()
+
+    rss = PeakRSS()
+    results = []
+    print(f"{'rows':>10} {'benchmark':<44} {'seconds':>9} {'rows/s':>12} {'peak MB':>8}")
+
+    def record(name, rows, columns, prepare, run):
+        if args.only and args.only not in name:
+            return
+        seconds, peak = measure(run, prepare, args.repeat, rss)
+        rate = rows / seconds if seconds else float('inf')
+        results.append({
+            'benchmark': name, 'rows': rows, 'columns': columns, 'seconds': round(seconds, 6),
+            'rows_per_second': round(rate, 1), 'peak_rss_mb': round(peak, 1),
+        })
+        print(f"{rows:>10} {name:<44} {seconds:>9.4f} {rate:>12,.0f} {peak:>8.1f}")
+
+    for rows in args.rows:
+        csv = make_csv(rows, args.kinds, args.columns, args.none_fraction)
+        df = make_frame(rows, args.kinds, args.columns, args.none_fraction)
+        for name, prepare, run in pipeline_cases(df):
+            record(name, rows, len(df.columns), prepare, run)
+        if not args.skip_views:
+            with test_environment():
+                for name, prepare, run in view_cases(csv, list(df.columns)):
+                    record(name, rows, len(df.columns), prepare, run)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'environment': environment(), 'arguments': vars(args), 'results': results}, f, indent=2)
+        print(f"\nresults written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Compares the JSON serialisation paths for processed datasets.
+
+Three paths are timed on the same synthetic frame of typed columns (integers, decimals with gaps, dates,
+durations, categories, text and booleans):
+
+- original: the former per-cell `serialise_dataframe`, kept below as the baseline, encoded by JsonResponse.
+- records: the current `serialise_dataframe`, encoded by JsonResponse.
+- columnar: `serialise_dataframe_columnar`, encoded by `dumps_json` (orjson when installed).
+
+Usage, from the RhombusAI directory:
+    python benchmarks/serialisation_benchmark.py --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'RhombusAI.settings')
+
+import django
+
+django.setup()
+
+import numpy as np
+import pandas as pd
+from django.http import JsonResponse
+from data.utils import serialise_dataframe, serialise_dataframe_columnar, dumps_json, orjson
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    floats = rng.normal(100, 25, rows)
+    floats[rng.random(rows) < 0.05] = np.nan
+    dates = pd.Series(pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 1500, rows), unit='D'))
+    dates[rng.random(rows) < 0.05] = pd.NaT
+    return pd.DataFrame({
+        'ints': rng.integers(0, 1000000, rows),
+        'floats': floats,
+        'dates': dates,
+        'durations': pd.to_timedelta(rng.integers(0, 86400, rows), unit='s'),
+        'category': pd.Categorical(rng.choice(['north', 'south', 'east', 'west'], rows)),
+        'text': rng.choice(['alpha', 'beta', 'gamma', None], rows),
+        'flags': rng.random(rows) < 0.5,
+    })
+
+
+def original_serialise_dataframe(df):
+    df = df.copy()
+    for column in df.columns:
+        dtype = df[column].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S').replace(pd.NaT, "N/A")
+        elif pd.api.types.is_timedelta64_dtype(dtype):
+            df[column] = df[column].apply(lambda x: x.total_seconds() if pd.notnull(x) else "N/A")
+        elif isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(dtype):
+            df[column] = df[column].astype(str).replace({'nan': "N/A", 'None': "N/A"})
+        elif pd.api.types.is_complex_dtype(dtype):
+            df[column] = df[column].apply(lambda x: str(x) if pd.notnull(x) else "N/A")
+        else:
+            df[column] = df[column].apply(lambda x: 'N/A' if pd.isnull(x) else x)
+    return df.to_dict(orient='records')
+
+
+PATHS = {
+    'original': lambda df: JsonResponse(original_serialise_dataframe(df), safe=False).content,
+    'records': lambda df: JsonResponse(serialise_dataframe(df), safe=False).content,
+    'columnar': lambda df: dumps_json(serialise_dataframe_columnar(df)),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per path; the fastest is reported.')
+    args = parser.parse_args()
+
+    print(f"encoder for columnar path: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'rows':>10} {'path':>10} {'seconds':>10} {'MB':>8} {'speed-up':>9}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        timings = {}
+        for name, serialise in PATHS.items():
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                content = serialise(df)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            speed_up = timings['original'] / best
+            print(f"{rows:>10} {name:>10} {best:>10.3f} {len(content) / 1e6:>8.1f} {speed_up:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Synthetic datasets for the benchmarks.
+
+Each column kind produces the raw strings a user would upload for that type. Frames are written to CSV and
+read back with `pd.read_csv`, so the benchmarks see the same dtypes as an uploaded file.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+WORDS = ['apple', 'river', 'stone', 'cloud', 'maple', 'ember', 'harbor', 'violet', 'falcon', 'meadow', 'copper', 'lantern']
+CATEGORIES = ['north', 'south', 'east', 'west', 'central', 'online', 'partner', 'other']
+CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY']
+DURATION_UNITS = ['minutes', 'hours', 'days', 'weeks']
+BOOLEANS = ['yes', 'no', 'True', 'false', 't', 'f']
+# Missing-value tokens from ALLOWED_NONE_TYPES that read_csv keeps as strings
+NONE_TOKENS = ['missing', 'unknow', 'unk', 'not available', 'miss']
+
+
+def _integer(rng, rows):
+    return rng.integers(0, 1000000, rows)
+
+
+def _numeric(rng, rows):
+    # Thousands separators and percentages
+    values = rng.normal(5000, 3000, rows).round(2)
+    strings = np.array([f'{value:,.2f}' for value in values], dtype=object)
+    percent = rng.random(rows) < 0.2
+    strings[percent] = [f'{value:.1f}%' for value in rng.uniform(0, 100, percent.sum())]
+    return strings
+
+
+def _currency(rng, rows):
+    codes = rng.choice(CURRENCIES, rows)
+    amounts = rng.uniform(1, 10000, rows).round(2)
+    return np.array([f'{code} {amount}' for code, amount in zip(codes, amounts)], dtype=object)
+
+
+def _date(rng, rows):
+    # Mostly ISO dates with some US-style and long-form dates mixed in
+    dates = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 3650, rows), unit='D')
+    strings = np.asarray(dates.strftime('%Y-%m-%d'), dtype=object)
+    us = rng.random(rows) < 0.1
+    strings[us] = np.asarray(dates[us].strftime('%m/%d/%Y'), dtype=object)
+    long = rng.random(rows) < 0.05
+    strings[long] = np.asarray(dates[long].strftime('%B %d, %Y'), dtype=object)
+    return strings
+
+
+def _timedelta(rng, rows):
+    amounts = rng.integers(1, 60, rows)
+    units = rng.choice(DURATION_UNITS, rows)
+    return np.array([f'{amount} {unit}' for amount, unit in zip(amounts, units)], dtype=object)
+
+
+def _boolean(rng, rows):
+    return rng.choice(BOOLEANS, rows)
+
+
+def _complex(rng, rows):
+    real = rng.integers(-50, 50, rows)
+    imag = rng.integers(1, 50, rows)
+    return np.array([f'{a}+{b}j' for a, b in zip(real, imag)], dtype=object)
+
+
+def _category(rng, rows):
+    return rng.choice(CATEGORIES, rows)
+
+
+def _text(rng, rows):
+    first = rng.choice(WORDS, rows)
+    second = rng.choice(WORDS, rows)
+    ids = rng.permutation(rows)
+    return np.array([f'{a} {b} #{i:x}' for a, b, i in zip(first, second, ids)], dtype=object)
+
+
+COLUMN_KINDS = {
+    'integer': _integer,
+    'numeric': _numeric,
+    'currency': _currency,
+    'date': _date,
+    'timedelta': _timedelta,
+    'boolean': _boolean,
+    'complex': _complex,
+    'category': _category,
+    'text': _text,
+}
+
+# Kinds kept free of missing-value tokens: a single token turns a boolean column into a category, and
+# integer columns stay numeric so the numeric dtype path is measured as well as the string one
+TOKEN_FREE_KINDS = {'boolean', 'integer'}
+
+
+def make_csv(rows, kinds=None, columns=None, none_fraction=0.01, seed=0):
+    """
+    Generates a CSV file of synthetic columns.
+
+    Parameters:
+    - rows (int): The number of rows.
+    - kinds (list, optional): Column kinds from COLUMN_KINDS. Defaults to every kind.
+    - columns (int, optional): The number of columns, cycling through `kinds`. Defaults to one column per kind.
+    - none_fraction (float): The share of cells replaced by missing-value tokens.
+    - seed (int): The random seed.
+
+    Returns:
+    - bytes: The CSV file, with columns named `<kind>_<n>`.
+    """
+    kinds = kinds or list(COLUMN_KINDS)
+    columns = columns or len(kinds)
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(columns):
+        kind = kinds[i % len(kinds)]
+        values = np.asarray(COLUMN_KINDS[kind](rng, rows), dtype=object)
+        if none_fraction and kind not in TOKEN_FREE_KINDS:
+            missing = rng.random(rows) < none_fraction
+            values[missing] = rng.choice(NONE_TOKENS, missing.sum())
+        data[f'{kind}_{i // len(kinds)}'] = values
+    return pd.DataFrame(data).to_csv(index=False).encode('utf-8')
+
+
+def make_frame(rows, kinds=None, columns=None, none_fraction=0.01, seed=0):
+    """
+    Generates a synthetic DataFrame as `pd.read_csv` would read it from an upload. Takes the same
+    parameters as `make_csv`.
+    """
+    return pd.read_csv(io.BytesIO(make_csv(rows, kinds, columns, none_fraction, seed)))
@@ -0,0 +1,181 @@
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from .compaction import compact_column
+from .dedup import private_store
+from .inference import ColumnProfile, widen_data_type
+from .metrics import stage
+from .models import DatasetAppend
+from .processing import read_file
+from .storage import common_dtype
+from .utils import convert_column, get_user_friendly_dtype, override_data
+
+
+def append_to_dataset(dataset, datafile):
+    """
+    Appends the rows of an uploaded file to a processed dataset without processing the stored rows again.
+
+    Each column of the new rows is profiled on its own and its label combined with the column's current
+    type through `widen_data_type`; mixes the labels cannot decide are settled by profiling the raw rows
+    of the column together with the new ones, as a full scan would. Only the new rows are converted and
+    they are appended to the column store as new parts, leaving the stored parts untouched. When the
+    combined type differs from the current one, the stored rows are brought in line first: Category and
+    Text only change the recorded dtype, while any other widening converts the column again from the raw
+    files of the dataset. The raw file is kept for such later widenings. A type the user chose for a
+    column is never widened: the new rows are converted to it as an override would convert them.
+
+    Parameters:
+    - dataset (Dataset): A processed dataset.
+    - datafile (UploadedFile): A CSV file or Excel workbook with the same columns as the dataset, in any order.
+
+    Returns:
+    - dict: The number of 'appended_rows' and the 'widened' columns, each with the type it changed 'from' and 'to'.
+
+    Raises:
+    - ValueError: If the columns of the file differ from those of the dataset, or if the new rows of a
+      column cannot be converted to the type the user chose for it.
+    """
+    part = DatasetAppend(dataset=dataset, file_name=datafile.name, file=datafile)
+    part.save()
+    try:
+        with stage('append', dataset_id=dataset.id) as record:
+            result = _append(dataset, part)
+            record['rows'] = result['appended_rows']
+        return result
+    except Exception:
+        part.file.delete(save=False)
+        part.delete()
+        raise
+
+
+def _append(dataset, part):
+    df = read_file(part.file.path)
+    column_types = {col.column_name: col for col in dataset.column_types.all()}
+    if set(map(str, df.columns)) != set(map(str, column_types)) or len(df.columns) != len(column_types):
+        raise ValueError(
+            f"The appended columns ({', '.join(map(str, df.columns))}) do not match the dataset's "
+            f"columns ({', '.join(map(str, column_types))})."
+        )
+
+    # Datasets uploaded from the same file share a store until one of them is modified
+    store = private_store(dataset)
+    df = df.rename(columns=str)[[str(col) for col in store.columns]]
+    # The raw files with the sheet each was read from; appended workbooks are read from their first sheet
+    sources = [(dataset.original_file.path, dataset.sheet_name)] + [
+        (previous.file.path, None) for previous in dataset.appends.exclude(id=part.id).order_by('id')
+    ]
+
+    widened = {}
+    # The dtype of each column's converted values, which the store may hold in a compacted dtype
+    dtypes = {}
+    for col in store.columns:
+        if _user_chosen(column_types[col]):
+            df[col] = _compact_like(_convert_to_chosen(df, col, column_types[col].user_modified_type), store.dtypes[col])
+            continue
+        current = _current_data_type(column_types[col])
+        profile = ColumnProfile(settings.STREAMING_DISTINCT_LIMIT)
+        profile.update(df[col])
+        data_type = widen_data_type(
+            current, profile.data_type if profile.meaningful else None, lambda: _rescan(df[col], sources),
+        )
+        dtypes[col] = column_types[col].inferred_type
+        if data_type != current:
+            _change_data_type(store, col, current, data_type, sources)
+            widened[col] = {'from': current, 'to': data_type}
+            dtypes[col] = store.dtypes[col]
+        converted = _convert(df, col, data_type)
+        dtypes[col] = common_dtype(dtypes[col], str(converted.dtype))
+        df[col] = _compact_like(converted, store.dtypes[col])
+
+    with stage('store_write', rows=len(df), dataset_id=dataset.id):
+        store.append(df)
+
+    with transaction.atomic():
+        # Columns with a type the user chose keep their record, so later appends still see the choice
+        for col, column_type in column_types.items():
+            if col in dtypes and (col in widened or dtypes[col] != column_type.inferred_type):
+                column_type.inferred_type = dtypes[col]
+                column_type.user_modified_type = get_user_friendly_dtype(dtypes[col])
+                column_type.save()
+        part.rows = len(df)
+        part.save()
+    return {'appended_rows': len(df), 'widened': widened}
+
+
+def _user_chosen(column_type):
+    # Overrides only change the label; a label that still names the inferred dtype was set at upload
+    label = column_type.user_modified_type
+    return bool(label) and label != get_user_friendly_dtype(column_type.inferred_type)
+
+
+def _current_data_type(column_type):
+    label = column_type.user_modified_type or get_user_friendly_dtype(column_type.inferred_type)
+    # Integer columns are inferred as Decimal; the stored dtype keeps them integers until a float arrives
+    return 'Decimal' if label == 'Integer' else label
+
+
+def _rescan(new_rows, sources):
+    # The stored rows have been converted already, so they are profiled from the raw files, which keep
+    # what the converted values lose (e.g. whether Boolean tokens were 0/1 or 'yes'/'no')
+    profile = ColumnProfile(settings.STREAMING_DISTINCT_LIMIT)
+    for chunk in _raw_chunks(new_rows.name, sources):
+        profile.update(chunk[new_rows.name])
+    profile.update(new_rows)
+    return profile
+
+
+def _raw_chunks(col, sources):
+    # Reads one column of the raw files in chunks, in the order its rows are stored
+    for path, sheet_name in sources:
+        if path.lower().endswith('.csv'):
+            chunks = read_file(path, usecols=[col], chunksize=settings.STREAMING_CHUNK_ROWS)
+        else:
+            chunks = [read_file(path, sheet_name=sheet_name, usecols=[col])]
+        for chunk in chunks:
+            yield chunk.reset_index(drop=True).rename(columns=str)
+
+
+def _convert_to_chosen(df, col, data_type):
+    # The new rows are converted as an override would convert them, except that a chunk of a category
+    # column need not look like a category on its own
+    if data_type == 'Category':
+        return df[col].astype('category')
+    success, message = override_data(df, col, data_type)
+    if not success:
+        raise ValueError(message)
+    return df[col]
+
+
+def _convert(df, col, data_type):
+    converted = convert_column(df, col, data_type)
+    # Text parts are stored as strings whatever the reader made of them, so parts never get promoted to numbers
+    if data_type == 'Text' and converted.dtype != object:
+        converted = converted.astype(object)
+    return converted
+
+
+def _compact_like(converted, stored_dtype):
+    # Numbers are compacted on their own, as the store promotes the dtypes of its parts; text is only
+    # stored as Arrow strings if the stored rows are, since any other mix of dtypes falls back to objects
+    if pd.api.types.is_numeric_dtype(converted.dtype) and not pd.api.types.is_bool_dtype(converted.dtype):
+        return compact_column(converted)
+    if stored_dtype == 'string' and pd.api.types.infer_dtype(converted, skipna=True) in ('string', 'empty'):
+        return converted.astype(pd.StringDtype('pyarrow'))
+    return converted
+
+
+def _change_data_type(store, col, old_type, new_type, sources):
+    """
+    Brings the stored rows of a column in line with a wider data type, converting them again from the
+    raw files they were read from.
+    """
+    if {old_type, new_type} == {'Category', 'Text'}:
+        store.set_dtype(col, 'category' if new_type == 'Category' else 'object')
+        return
+
+    def reconverted():
+        for chunk in _raw_chunks(col, sources):
+            yield _convert(chunk, col, new_type)
+
+    with stage('widen_column', rows=store.row_count, column=col, old_type=old_type, new_type=new_type):
+        store.replace_column(col, reconverted())
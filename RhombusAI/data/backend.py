@@ -0,0 +1,128 @@
+import pandas as pd
+import pyarrow as pa
+from django.conf import settings
+from .excel import read_sheet
+
+# The dtype string columns are kept in when READ_DTYPE_BACKEND is 'pyarrow'. It is the dtype the
+# compaction step already stores text in (see data/compaction.py), so the pipeline sees one kind of
+# Arrow-backed string whichever way a column was produced.
+ARROW_STRING_DTYPE = pd.StringDtype('pyarrow')
+
+
+def uses_arrow_strings():
+    """
+    Returns True when files are read into Arrow-backed string columns (READ_DTYPE_BACKEND = 'pyarrow').
+    """
+    return getattr(settings, 'READ_DTYPE_BACKEND', 'numpy') == 'pyarrow'
+
+
+def read_csv(source, **kwargs):
+    """
+    Reads a CSV file with the backend selected by READ_DTYPE_BACKEND, passing any keyword arguments to
+    `pd.read_csv`.
+
+    With the 'pyarrow' backend the file is read with `dtype_backend='pyarrow'` and every DataFrame (or
+    every chunk, when `chunksize` is given) goes through `normalise_arrow_columns`.
+
+    Parameters:
+    - source (str or file): The CSV file.
+
+    Returns:
+    - pd.DataFrame or iterator: The DataFrame, or an iterator of DataFrames when `chunksize` is given.
+    """
+    if not uses_arrow_strings():
+        return pd.read_csv(source, **kwargs)
+    result = pd.read_csv(source, dtype_backend='pyarrow', **kwargs)
+    if isinstance(result, pd.DataFrame):
+        return normalise_arrow_columns(result)
+    return (normalise_arrow_columns(chunk) for chunk in result)
+
+
+def read_excel(path, **kwargs):
+    """
+    Reads a sheet of an Excel workbook with the backend selected by READ_DTYPE_BACKEND, passing any
+    keyword arguments to `read_sheet` (see data/excel.py).
+
+    Parameters:
+    - path (str): The path of the workbook.
+
+    Returns:
+    - pd.DataFrame: The sheet, by default the first one of the workbook.
+    """
+    return normalise_excel_columns(read_sheet(path, **kwargs))
+
+
+def normalise_excel_columns(df):
+    """
+    Moves the columns of a DataFrame read from Excel that hold nothing but strings to Arrow-backed strings,
+    when READ_DTYPE_BACKEND is 'pyarrow'.
+
+    Excel cells keep their own types, and the pyarrow backend would turn a column mixing numbers and text
+    into strings. So workbooks are read as usual and only their string columns are moved.
+
+    Parameters:
+    - df (pd.DataFrame): The rows read from a sheet.
+
+    Returns:
+    - pd.DataFrame: The same DataFrame.
+    """
+    if uses_arrow_strings():
+        for col in df.columns:
+            if pd.api.types.is_object_dtype(df[col].dtype) and pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+                df[col] = df[col].astype(ARROW_STRING_DTYPE)
+    return df
+
+
+def is_arrow_string(dtype):
+    """
+    Checks whether a dtype holds strings in Arrow memory, either as pandas' Arrow-backed StringDtype or
+    as an ArrowDtype wrapping an Arrow string type.
+    """
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage in ('pyarrow', 'pyarrow_numpy')
+    if isinstance(dtype, pd.ArrowDtype):
+        return pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype)
+    return False
+
+
+def arrow_strings(strings):
+    """
+    Returns a column of strings as one Arrow string array, for Arrow compute kernels. Arrow-backed
+    columns are combined without copying their values; object columns are converted, with missing
+    values as nulls.
+
+    Parameters:
+    - strings (pd.Series): A column holding nothing but strings and missing values.
+
+    Returns:
+    - pa.Array: The strings.
+    """
+    if is_arrow_string(strings.dtype):
+        return pa.chunked_array(strings.array.__arrow_array__()).cast(pa.string()).combine_chunks()
+    return pa.array(strings.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+
+
+def normalise_arrow_columns(df):
+    """
+    Brings the columns of a DataFrame read with the pyarrow backend in line with the rest of the pipeline.
+
+    String columns stay Arrow-backed and become `ARROW_STRING_DTYPE`. Every other Arrow column (numbers,
+    booleans, timestamps) is converted to the dtype the numpy backend would have read it as, e.g.
+    integers with missing values become float64 and booleans with missing values become objects, so
+    inference and conversion treat them exactly as before.
+
+    Parameters:
+    - df (pd.DataFrame): A DataFrame read with `dtype_backend='pyarrow'`.
+
+    Returns:
+    - pd.DataFrame: The same DataFrame with its columns normalised.
+    """
+    for col in df.columns:
+        dtype = df[col].dtype
+        if is_arrow_string(dtype):
+            if dtype != ARROW_STRING_DTYPE:
+                df[col] = df[col].astype(ARROW_STRING_DTYPE)
+        elif isinstance(dtype, pd.ArrowDtype):
+            values = pa.chunked_array(df[col].array.__arrow_array__())
+            df[col] = values.to_pandas().set_axis(df.index)
+    return df
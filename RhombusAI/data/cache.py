@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from .metrics import COLUMN_CACHE_REQUESTS
+
+
+class ColumnCache:
+    """
+    An in-process LRU cache of deserialised columns, bounded by the memory the cached values take.
+
+    Entries are keyed by the store, the column and the column's version in the store's manifest (its
+    directory, part count and dtype), so a rewritten or appended column is never served stale. Stores
+    also drop their entries whenever they save their manifest or are deleted.
+
+    The cache is per process: each server worker process keeps its own. Hits and misses are counted in
+    the metrics served at /data/metrics/.
+
+    Parameters:
+    - max_bytes (int, optional): The memory the cached columns may take. Defaults to the
+      DATASET_CACHE_MAX_BYTES setting; 0 disables the cache.
+    """
+
+    def __init__(self, max_bytes=None):
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, 'DATASET_CACHE_MAX_BYTES', 256 * 1024 ** 2)
+
+    @property
+    def size_bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        """
+        Returns the cached column for a key, marking it as recently used, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        COLUMN_CACHE_REQUESTS.inc(result='miss' if entry is None else 'hit')
+        return None if entry is None else entry[0]
+
+    def put(self, key, series):
+        """
+        Caches a column, evicting the least recently used columns to stay within `max_bytes`.
+
+        Columns larger than `max_bytes` are not cached.
+        """
+        size = int(series.memory_usage(index=False, deep=True))
+        max_bytes = self.max_bytes
+        if max_bytes <= 0 or size > max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (series, size)
+            self._bytes += size
+            while self._bytes > max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def invalidate(self, store_key, keep=()):
+        """
+        Drops the cached columns of a store, except the entries whose keys are in `keep`.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == store_key and key not in keep]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+# The cache shared by every ColumnStore of the process
+column_cache = ColumnCache()
@@ -0,0 +1,198 @@
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from .backend import ARROW_STRING_DTYPE, is_arrow_string
+from .conversions import ALLOWED_NONE_TYPES, BOOLEAN_TOKENS
+from .dates import contains_date
+from .typechecks import (
+    NUMBER_PATTERN, CURRENCY_PATTERN, COMPLEX_PATTERN, TIMEDELTA_PATTERN, NON_DATE_PATTERN, COMPLEX_SUFFIX, COMPLEX_RE,
+    TIMEDELTA_RE, NON_DATE_RE,
+)
+
+BOOLEAN_VALUES = list(BOOLEAN_TOKENS)
+NONE_TOKENS = frozenset(ALLOWED_NONE_TYPES)
+
+# The classes a value is sorted into. Every value gets exactly one: none tokens first, then the first
+# pattern that matches the whole cleaned value, then durations; anything else is OTHER.
+NONE = 'none'
+NUMBER = 'number'
+PERCENT = 'percent'
+CURRENCY = 'currency'
+COMPLEX = 'complex'
+TIMEDELTA = 'timedelta'
+OTHER = 'other'
+CLASSES = (NONE, NUMBER, PERCENT, CURRENCY, COMPLEX, TIMEDELTA, OTHER)
+
+# One alternation with a named group per class, matched against the whole cleaned value. A number with a
+# percent sign is a PERCENT, and a plain number is a NUMBER even though it is also a valid currency amount.
+# Complex numbers are only matched for values ending in their suffix, so other columns skip the pattern.
+VALUE_RE = re.compile(
+    r'(?P<number>-?\d+(?:\.\d+)?)'
+    r'|(?P<percent>-?\d+(?:\.\d+)?%)'
+    r'|(?P<currency>[a-zA-Z]{3} \d+(?:\.\d+)?)'
+)
+
+
+def classify_value(string):
+    """
+    Sorts a string into one of the value classes in a single scan.
+
+    The string is cleaned as the inference rules clean it (commas removed, surrounding spaces stripped)
+    and matched once against `VALUE_RE`. Values ending in 'j' are matched against the complex number
+    pattern without their spaces (e.g. '1 + 2j'), and durations are searched for in the raw string.
+
+    Parameters:
+    - string (str): The value to classify.
+
+    Returns:
+    - str: One of `CLASSES`.
+    """
+    cleaned = string.replace(',', '').strip()
+    if cleaned.lower() in NONE_TOKENS:
+        return NONE
+    match = VALUE_RE.fullmatch(cleaned)
+    if match is not None:
+        return match.lastgroup
+    if cleaned.endswith(COMPLEX_SUFFIX) and COMPLEX_RE.fullmatch(cleaned.replace(' ', '')):
+        return COMPLEX
+    if TIMEDELTA_RE.search(string):
+        return TIMEDELTA
+    return OTHER
+
+
+def classify_strings(strings):
+    """
+    Sorts distinct strings into value classes and flags the ones that may be dates.
+
+    Python strings are classified with `classify_value`, one scan per string. Arrow-backed strings
+    (see data/backend.py) are classified with one Arrow compute kernel per pattern over the whole array
+    instead, which gives the same classes without turning the values into Python strings.
+
+    Parameters:
+    - strings (pd.Series): Distinct strings.
+
+    Returns:
+    - tuple: An array with the class of each string, and a boolean array marking the strings that are
+      not plain integers or decimals and so are checked for dates.
+    """
+    if is_arrow_string(strings.dtype):
+        return _classify_arrow(strings)
+    values = strings.tolist()
+    classes = np.array([classify_value(value) for value in values], dtype=object)
+    date_candidates = np.array([NON_DATE_RE.search(value) is None for value in values], dtype=bool)
+    return classes, date_candidates
+
+
+def _classify_arrow(strings):
+    cleaned = strings.str.replace(',', '', regex=False).str.strip()
+    numeric = np.asarray(cleaned.str.fullmatch(NUMBER_PATTERN), dtype=bool)
+    percent = numeric & np.asarray(cleaned.str.endswith('%'), dtype=bool)
+    # Only values ending in the suffix can be complex numbers, so the pattern runs on those alone
+    complex_numbers = np.asarray(cleaned.str.endswith(COMPLEX_SUFFIX), dtype=bool)
+    if complex_numbers.any():
+        candidates = cleaned[complex_numbers].str.replace(' ', '', regex=False)
+        complex_numbers[complex_numbers] = np.asarray(candidates.str.fullmatch(COMPLEX_PATTERN), dtype=bool)
+    # The same precedence as classify_value: the first mask that holds gives the class
+    masks = {
+        NONE: cleaned.str.lower().isin(NONE_TOKENS),
+        PERCENT: percent,
+        NUMBER: numeric,
+        CURRENCY: cleaned.str.fullmatch(CURRENCY_PATTERN),
+        COMPLEX: complex_numbers,
+        TIMEDELTA: strings.str.contains(TIMEDELTA_PATTERN, case=False, regex=True),
+    }
+    conditions = [np.asarray(mask, dtype=bool) for mask in masks.values()]
+    classes = np.select(conditions, list(masks), default=OTHER).astype(object)
+    date_candidates = ~np.asarray(strings.str.contains(NON_DATE_PATTERN, regex=True), dtype=bool)
+    return classes, date_candidates
+
+
+class TypeHistogram:
+    """
+    Counts the rows of a column in each value class, from one classification of its distinct values.
+
+    The inference rules are all(...) and any(...) checks over the values, a boolean token check and a
+    distinct-value count, so they can all be decided from the histogram: `data_type` gives the same label
+    as the separate passes of the vectorised engine.
+
+    Parameters:
+    - col (pd.Series): A column of strings, as read from a file.
+
+    Attributes:
+    - rows (int): The number of rows, including nulls.
+    - non_null (int): The number of non-null rows.
+    - distinct (int): The number of distinct non-null values.
+    - counts (dict): The number of non-null rows in each class of `CLASSES`.
+    - boolean_tokens (bool): Whether every distinct value is a boolean token such as 'yes' or '0'.
+    - date_candidates (pd.Series): The distinct values that are checked for dates.
+    """
+
+    def __init__(self, col):
+        values = col.dropna()
+        codes, distinct = pd.factorize(values)
+        occurrences = np.bincount(codes, minlength=len(distinct))
+        strings = distinct_strings(distinct, values.dtype)
+        classes, date_candidates = classify_strings(strings)
+
+        self.rows = len(col)
+        self.non_null = len(values)
+        self.distinct = len(distinct)
+        self.counts = {name: int(occurrences[classes == name].sum()) for name in CLASSES}
+        self.boolean_tokens = bool(strings.str.lower().isin(BOOLEAN_VALUES).all())
+        self.date_candidates = strings[date_candidates]
+
+    @property
+    def meaningful(self):
+        """
+        The number of non-null rows that are not allowed none tokens.
+        """
+        return self.non_null - self.counts[NONE]
+
+    @property
+    def data_type(self):
+        """
+        Returns the data type label the histogram supports, applying the rules in the legacy order.
+        """
+        meaningful = self.meaningful
+        if self.rows and self.non_null == self.rows and self.boolean_tokens:
+            return 'Boolean'
+        if not meaningful:
+            return 'Boolean'
+        if self.counts[COMPLEX]:
+            return 'Complex Number'
+        if self.counts[NUMBER] + self.counts[PERCENT] == meaningful:
+            return 'Decimal'
+        if self.counts[NUMBER] + self.counts[CURRENCY] == meaningful:
+            return 'Decimal'
+        if self.counts[TIMEDELTA]:
+            return 'Time Duration'
+        if contains_date(self.date_candidates):
+            return 'Date'
+        if self.distinct < self.non_null / 2:
+            return 'Category'
+        return 'Text'
+
+
+def distinct_strings(distinct, dtype):
+    """
+    Returns the distinct values of a column as strings for the pattern checks.
+
+    Arrow-backed string columns (see data/backend.py) stay in Arrow memory, so the pattern checks run as
+    Arrow compute kernels instead of per-value Python calls. Arrow's regular expressions only treat
+    ASCII digits as digits, so a column holding any other characters falls back to Python strings and
+    keeps the results of the per-value predicates.
+
+    Parameters:
+    - distinct (array-like): The distinct non-null values of a column.
+    - dtype: The dtype of the column the values come from.
+
+    Returns:
+    - pd.Series: The values as strings.
+    """
+    if is_arrow_string(dtype):
+        strings = pd.Series(distinct, dtype=ARROW_STRING_DTYPE)
+        if pc.all(pc.string_is_ascii(pa.array(strings))).as_py() is not False:
+            return strings
+    return pd.Series(distinct, dtype=object).astype(str)
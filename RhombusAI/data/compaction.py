@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .typechecks import is_category
+from .backend import is_arrow_string
+
+# Integer dtypes tried when downcasting, smallest first
+INTEGER_DTYPES = ('int8', 'int16', 'int32', 'int64')
+
+
+def compact_dtypes(df, report=None):
+    """
+    Stores each converted column of a DataFrame in the smallest dtype that holds its values exactly.
+
+    See `compact_column` for the rules. Nothing is done when DTYPE_COMPACTION is off.
+
+    Parameters:
+    - df (pd.DataFrame): The converted DataFrame.
+    - report (dict, optional): If given, filled with the dtype and memory of each column before and
+      after compaction, as {column: {'original_type', 'original_memory_bytes', 'memory_bytes'}}.
+
+    Returns:
+    - pd.DataFrame: A DataFrame with the compacted columns.
+    """
+    enabled = getattr(settings, 'DTYPE_COMPACTION', True)
+    compacted = {}
+    for col in df.columns:
+        compacted[col] = compact_column(df[col]) if enabled else df[col]
+        if report is not None:
+            report[col] = _memory_entry(df[col], compacted[col])
+    return pd.DataFrame(compacted, columns=df.columns)
+
+
+def compact_store(store, report=None):
+    """
+    Compacts the columns of a column store in place, one column at a time, so that only one column is
+    held in memory. Used for uploads that were ingested chunk by chunk.
+
+    Parameters:
+    - store (ColumnStore): The store to compact.
+    - report (dict, optional): Filled as by `compact_dtypes`.
+    """
+    for name in store.columns:
+        col = store.read_column(name)
+        compacted = compact_column(col) if getattr(settings, 'DTYPE_COMPACTION', True) else col
+        if report is not None:
+            report[name] = _memory_entry(col, compacted)
+        if compacted is not col:
+            store.replace_column(name, [compacted], dtype=str(compacted.dtype))
+
+
+def compact_column(col):
+    """
+    Returns a column in the smallest dtype that holds its values exactly, or the column unchanged.
+
+    - Integers are downcast to the smallest of int8, int16, int32 and int64 that holds their range.
+    - Floats holding only whole numbers and missing values become pandas nullable integers (Int8 to
+      Int64), so the missing values no longer force a float dtype.
+    - Other floats become float32 when every value survives the round trip unchanged.
+    - Text columns with at most DTYPE_CATEGORY_MAX_RATIO distinct values per row become categories;
+      other text becomes Arrow-backed strings. Columns mixing strings with other objects are kept, and
+      text read into Arrow-backed strings (see data/backend.py) only ever becomes a category.
+
+    Booleans, dates, durations, complex numbers and categories are kept as they are.
+
+    Parameters:
+    - col (pd.Series): A converted column.
+
+    Returns:
+    - pd.Series: The compacted column.
+    """
+    dtype = col.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+        return _downcast_integers(col, col.min(), col.max(), nullable=False) if len(col) else col
+    if isinstance(dtype, np.dtype) and dtype.kind == 'f':
+        return _compact_floats(col)
+    if pd.api.types.is_object_dtype(dtype) and len(col):
+        return _compact_text(col)
+    if is_arrow_string(dtype) and len(col):
+        return col.astype('category') if is_category(col, getattr(settings, 'DTYPE_CATEGORY_MAX_RATIO', 0.5)) else col
+    return col
+
+
+def column_memory(col):
+    """
+    Returns the memory a column's values take, including the Python objects of object columns.
+    """
+    return int(col.memory_usage(index=False, deep=True))
+
+
+def _memory_entry(col, compacted):
+    return {
+        'original_type': str(col.dtype),
+        'original_memory_bytes': column_memory(col),
+        'memory_bytes': column_memory(compacted),
+    }
+
+
+def _downcast_integers(col, low, high, nullable):
+    for name in INTEGER_DTYPES:
+        info = np.iinfo(name)
+        if info.min <= low and high <= info.max:
+            target = name.capitalize() if nullable else name
+            return col if str(col.dtype) == target else col.astype(target)
+    return col
+
+
+def _compact_floats(col):
+    values = col.to_numpy()
+    present = values[~np.isnan(values)]
+    if len(present) == 0:
+        return col
+    if len(present) < len(values) and np.isfinite(present).all() and (present == np.trunc(present)).all():
+        low, high = present.min(), present.max()
+        # Whole numbers beyond int64 (or beyond the float's exact integer range) stay floats
+        if -2 ** 53 <= low and high <= 2 ** 53:
+            return _downcast_integers(col, low, high, nullable=True)
+    if col.dtype == np.float64:
+        narrowed = values.astype(np.float32)
+        if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+            return pd.Series(narrowed, index=col.index, name=col.name)
+    return col
+
+
+def _compact_text(col):
+    if pd.api.types.infer_dtype(col, skipna=True) != 'string':
+        return col
+    if is_category(col, getattr(settings, 'DTYPE_CATEGORY_MAX_RATIO', 0.5)):
+        return col.astype('category')
+    return col.astype(pd.StringDtype('pyarrow'))
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from .backend import arrow_strings
+from .encoding import map_unique
+
+# A real or imaginary part: an integer, a decimal or a number in scientific notation
+PART_PATTERN = r'(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+# A complex number once spaces and enclosing brackets are removed, e.g. '3+4j', '-2.5i', '1e3-j' or '7':
+# a first part, then either nothing (it is real), a suffix alone (it is imaginary) or a signed imaginary
+# part. Each character decides the branch, which keeps the extraction to one pass over the value.
+COMPLEX_PARTS_PATTERN = (
+    rf'^(?P<first>[+-]?(?:{PART_PATTERN})?)(?P<rest>[ijIJ]|[+-](?:{PART_PATTERN})?[ijIJ])?$'
+)
+
+# Parts without digits
+SIGNS = pa.array(['', '+', '-'])
+
+# A value enclosed in brackets, as `complex` writes them, e.g. '(1+2j)'
+BRACKETS_PATTERN = r'^\((.*)\)$'
+
+# Number of invalid values named in the error of a failed conversion
+COMPLEX_ERROR_EXAMPLES = 5
+
+
+def parse_complex(col, errors='coerce'):
+    """
+    Converts a column of complex numbers written as text, such as '3+4j', '1 - 2.5i' or '(5j)', to
+    complex128.
+
+    The real and imaginary parts of every string are split with one Arrow regex extraction over the whole
+    column, cast to two float arrays and combined into one complex array, instead of calling `complex`
+    on each value. Both the 'j' and 'i' suffixes are read, in either case, and spaces are ignored. The
+    few values the pattern does not read (e.g. 'nan', '1_000j', or values that are not strings) are
+    converted one distinct value at a time with `complex`. Missing values become NaN.
+
+    Parameters:
+    - col (pd.Series): The column to convert.
+    - errors (str): 'coerce' turns values that are not complex numbers into NaN; 'raise' raises for them.
+
+    Returns:
+    - pd.Series: The complex numbers, with the index and name of `col`.
+
+    Raises:
+    - ValueError: With errors='raise', if a value is not a complex number, naming the first few of them.
+    """
+    if pd.api.types.is_complex_dtype(col.dtype):
+        return col
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        # Each category is parsed once and the results are taken by the codes
+        categories = parse_complex(pd.Series(col.cat.categories, dtype=object), errors)
+        values = np.append(categories.to_numpy(), np.nan)[col.cat.codes.to_numpy()]
+        return pd.Series(values, index=col.index, name=col.name)
+    if pd.api.types.is_numeric_dtype(col.dtype):
+        values = col.to_numpy(dtype=float, na_value=np.nan).astype(np.complex128)
+        return pd.Series(values, index=col.index, name=col.name)
+
+    values = np.full(len(col), np.nan, dtype=np.complex128)
+    pending = col.notna().to_numpy()
+    is_string = _string_mask(col) & pending
+    if is_string.any():
+        parsed, valid = _parse_strings(col[is_string])
+        positions = np.flatnonzero(is_string)[valid]
+        values[positions] = parsed[valid]
+        pending[positions] = False
+
+    if pending.any():
+        # The rest are read as `complex` reads them
+        rest = col[pending].astype(object)
+        failed = map_unique(rest, lambda value: _to_complex(value) is None).to_numpy(dtype=bool)
+        converted = map_unique(rest[~failed], _to_complex)
+        values[np.flatnonzero(pending)[~failed]] = converted.to_numpy(dtype=np.complex128)
+        if errors == 'raise' and failed.any():
+            invalid = pd.unique(rest[failed].astype(str))
+            examples = ', '.join(repr(value) for value in invalid[:COMPLEX_ERROR_EXAMPLES])
+            raise ValueError(f"Values that are not complex numbers: {examples}.")
+    return pd.Series(values, index=col.index, name=col.name)
+
+
+def _parse_strings(strings):
+    text = pc.replace_substring_regex(pc.utf8_trim_whitespace(arrow_strings(strings)), BRACKETS_PATTERN, r'\1')
+    parts = pc.extract_regex(pc.replace_substring(text, ' ', ''), COMPLEX_PARTS_PATTERN)
+    # Rows that did not match are nulls, and a group that took no part in a match is an empty string
+    first, rest = parts.field('first'), parts.field('rest')
+    imaginary_only = pc.equal(pc.utf8_length(rest), 1)
+    # Without the suffix, an imaginary part without digits ('j', '-i') stands for one
+    imag = pc.if_else(imaginary_only, first, pc.utf8_slice_codeunits(rest, 0, -1))
+    imag = pc.if_else(pc.is_in(imag, SIGNS), pc.binary_join_element_wise(imag, '1', ''), imag)
+    imag = pc.if_else(pc.equal(rest, ''), '0', imag)
+    real = pc.if_else(imaginary_only, '0', first)
+    # A real part needs digits, so '+' or '-+j' are not numbers
+    valid = pc.and_(parts.is_valid(), pc.or_(imaginary_only, pc.invert(pc.is_in(first, SIGNS))))
+
+    parsed = np.empty(len(strings), dtype=np.complex128)
+    # Set apart, as `real + 1j * imag` would turn an infinite imaginary part into a NaN real part
+    parsed.real = _to_floats(pc.if_else(valid, real, '0'))
+    parsed.imag = _to_floats(pc.if_else(valid, imag, '0'))
+    return parsed, valid.to_numpy(zero_copy_only=False)
+
+
+def _to_floats(text):
+    return pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+
+
+def _string_mask(col):
+    if pd.api.types.is_string_dtype(col.dtype) and not pd.api.types.is_object_dtype(col.dtype):
+        return np.ones(len(col), dtype=bool)
+    if pd.api.types.infer_dtype(col, skipna=True) in ('string', 'empty'):
+        return np.ones(len(col), dtype=bool)
+    return np.array([isinstance(value, str) for value in col], dtype=bool)
+
+
+def _to_complex(value):
+    try:
+        return complex(value)
+    except (TypeError, ValueError):
+        return None
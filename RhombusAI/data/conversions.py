@@ -1,10 +1,13 @@
-import re
-import pandas as pd
-import re
+import logging
 import pandas as pd
 import numpy as np
-from dateutil import parser
-from .typechecks import looks_like_number, is_complex
+from types import MappingProxyType
+from .encoding import can_factorize, map_unique, transform_unique
+from .complex_numbers import parse_complex
+from .durations import parse_durations
+from .numbers import parse_numbers
+
+logger = logging.getLogger(__name__)
 
 ALLOWED_NONE_TYPES = [
     "nan",
@@ -21,9 +24,56 @@ ALLOWED_NONE_TYPES = [
     ''
 ]
 
+TRUE_VALUES = ['true', '1', 'yes', 't', 'on']
+FALSE_VALUES = ['false', '0', 'no', 'f', 'off']
+
+# Lowercased boolean tokens and the values they stand for. Inference only accepts the tokens themselves;
+# a conversion to boolean also reads 'none' as a missing value.
+BOOLEAN_TOKENS = MappingProxyType({**dict.fromkeys(TRUE_VALUES, True), **dict.fromkeys(FALSE_VALUES, False)})
+BOOLEAN_CONVERSIONS = MappingProxyType({**BOOLEAN_TOKENS, 'none': None})
+
+# Number of invalid values named in the error of a failed boolean conversion
+BOOLEAN_ERROR_EXAMPLES = 5
+
 def is_allowed_none(val):
     return pd.isnull(val) or str(val).strip().lower() in ALLOWED_NONE_TYPES
 
+def map_booleans(col, tokens=BOOLEAN_TOKENS):
+    """
+    Maps the values of a column to a nullable boolean array in one pass over its distinct values.
+
+    Each distinct value is lowercased once with the string accessor and looked up in `tokens` with
+    `Series.map`, and the results are spread back to the rows by their factorized codes. Missing values,
+    tokens mapped to None and values that are not tokens become pd.NA.
+
+    Parameters:
+    - col (pd.Series): The column to map.
+    - tokens (Mapping): The lowercased tokens and the boolean (or None) each stands for. Defaults to
+      `BOOLEAN_TOKENS`.
+
+    Returns:
+    - tuple: The column as a Series of the nullable 'boolean' dtype, with the index and name of `col`,
+      and a list of the distinct non-missing values that are not tokens.
+    """
+    missing = col.isna().to_numpy()
+    values = col[~missing]
+    if can_factorize(values):
+        codes, uniques = pd.factorize(values)
+    else:
+        # Mixed values such as 1 and True would share a code, but read differently as strings
+        codes, uniques = np.arange(len(values)), values.to_numpy(dtype=object)
+
+    lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    mapped = lowered.map(tokens)
+    known = lowered.isin(tokens).to_numpy()
+    data = np.zeros(len(col), dtype=bool)
+    mask = missing.copy()
+    data[~missing] = mapped.eq(True).to_numpy()[codes]
+    mask[~missing] = (~known | mapped.isna().to_numpy())[codes]
+
+    invalid = pd.unique(pd.Series(uniques[~known], dtype=object)).tolist()
+    return pd.Series(pd.arrays.BooleanArray(data, mask), index=col.index, name=col.name), invalid
+
 def convert_to_categorical(df, col, is_category):
     """
     Converts a specified column in a DataFrame to categorical data type, if the column is deemed categorical.
@@ -44,6 +94,9 @@ def convert_to_datetime(df, col):
     """
     Attempts to convert a specified column in a DataFrame to datetime using a custom parser.
 
+    Values are parsed with `dates.convert_dates`, which reads the column with its detected strftime format
+    and only passes the remaining values to dateutil's fuzzy parser.
+
     Parameters:
     - df (pd.DataFrame): The DataFrame containing the column to convert.
     - col (str): The name of the column to convert.
@@ -51,22 +104,34 @@ def convert_to_datetime(df, col):
     Returns:
     - pd.Series: The converted column as a pandas Series, or the original column if conversion is not successful.
     """
+    from .dates import convert_dates
+
     try:
-        converted_col = []
-        for value in df[col]:
-            if pd.isnull(value) or is_allowed_none(value):
-                converted_col.append(pd.NaT)  # Append NaT for null values and allowed none types
-            else:
-                converted_col.append(parser.parse(str(value), fuzzy=True))
-        return pd.Series(converted_col)
+        values = df[col]
+        if values.empty:
+            return pd.Series([], dtype=object)
+        strings = values.astype(object).map(str)
+        missing = (values.isna() | strings.str.strip().str.lower().isin(ALLOWED_NONE_TYPES)).to_numpy()
+        dates = convert_dates(strings[~missing])
+        if dates.dtype == object:
+            # Time zones or out-of-range dates: let pandas pick the dtype, as for a list of parsed values
+            converted = np.full(len(values), pd.NaT, dtype=object)
+            converted[~missing] = dates.to_numpy()
+            return pd.Series(list(converted))
+        converted = pd.Series(pd.NaT, index=pd.RangeIndex(len(values)), dtype='datetime64[ns]')
+        converted[~missing] = dates.to_numpy()
+        return converted
     except Exception as e:
-        print(f"Error converting column '{col}' to datetime: {e}")
+        logger.warning("Error converting column '%s' to datetime: %s", col, e)
         return df[col]
     
 def convert_to_timedelta(df, col):
     """
     Attempts to convert a specified column in a DataFrame to timedelta.
 
+    Values are parsed with `durations.parse_durations`, which also reads ISO 8601 durations and phrases
+    such as '1 year and 2 months' that `pd.to_timedelta` does not. Values that are not durations become NaT.
+
     Parameters:
     - df (pd.DataFrame): The DataFrame containing the column to convert.
     - col (str): The name of the column to convert.
@@ -75,19 +140,22 @@ def convert_to_timedelta(df, col):
     - pd.Series: The converted column as a pandas Series, or the original column if conversion is not successful.
     """
     try:
-        converted_col = pd.to_timedelta(df[col], errors='coerce')
+        converted_col = transform_unique(df[col], parse_durations)
         return converted_col
     except Exception as e:
-        print(f"Error converting column '{col}' to timedelta: {e}")
+        logger.warning("Error converting column '%s' to timedelta: %s", col, e)
         return df[col]
 
-def convert_to_numeric(df, col):
+def convert_to_numeric(df, col, currency_column=None):
     """
     Converts a column in a DataFrame to numeric values.
 
     Parameters:
     - df (DataFrame): The pandas DataFrame containing the column to be converted.
     - col (str): The name of the column to be converted.
+    - currency_column (str, optional): The name of a column to store the currency codes of amounts such
+      as 'EUR 40.00' in, as a categorical companion of the converted column. Not added when no value has
+      a currency code.
 
     Returns:
     - pandas.Series: The converted column with numeric data types.
@@ -96,32 +164,20 @@ def convert_to_numeric(df, col):
     - ValueError: If the column contains complex numbers or encounters errors during conversion.
 
     Notes:
-    - This function attempts to convert string representations of numbers or percentages into numeric values.
+    - Values are parsed with `numbers.parse_numbers`, which works on the whole column at once.
     - String representations of percentages are converted to decimals.
+    - Currency amounts are converted to their amount.
     - Non-string values are kept as they are.
     - Any non-convertible values are coerced to NaN (Not a Number).
     """
     try:
-        # First, check if there are complex numbers in the column
-        if df[col].apply(lambda x: is_complex(str(x))).any():
-            raise ValueError(f"Column '{col}' contains complex numbers, cannot convert to numeric.")
-        
-        # Convert values that look like a number or percentage to decimals, else set to NaN
-        df[col] = df[col].apply(
-            lambda x: float(str(x).replace(',', '').strip('%')) / 100 
-            if isinstance(x, str) and x.endswith('%') 
-            else float(str(x).replace(',', '')) 
-            if isinstance(x, str) and looks_like_number(x) 
-            else x  # Keep the original value if it's not a string
-        )
-        
-        # Now that the column is cleaned up, coerce any stragglers to NaN
-        converted_col = pd.to_numeric(df[col], errors='coerce')
-        print(f"Converted {col} dtype: {converted_col.dtype}")  # Diagnostic print
-        return converted_col
-    
+        converted_col, currencies = parse_numbers(df[col])
     except Exception as e:
         raise ValueError(f"Error converting column '{col}' to numeric: {e}")
+    if currency_column is not None and currencies is not None:
+        df[currency_column] = currencies
+    logger.debug("Converted %s dtype: %s", col, converted_col.dtype)
+    return converted_col
 
 
 def convert_to_boolean(df, col):
@@ -135,40 +191,22 @@ def convert_to_boolean(df, col):
 
     Returns:
     - pd.Series: The column converted to boolean, or raises an exception if conversion is not possible.
-    """
-    bool_variable_map = {
-        "true": True,
-        "false": False,
-        "1": True,
-        "0": False,
-        "yes": True,
-        "no": False,
-        "t": True,
-        "f": False,
-        "on": True,
-        "off": False,
-        "none": None,
-    }
-
-    # Check if all values can be converted
-    if not df[col].apply(lambda x: str(x).lower() in bool_variable_map or pd.isnull(x)).all():
-        raise ValueError(f"Column '{col}' contains values that cannot be converted to boolean.")
 
-    try:
-        # Convert the column using the mapping
-        converted_col = df[col].apply(lambda x: bool_variable_map[str(x).lower()] if pd.notnull(x) else x)
-        # Convert None explicitly to pd.NA to handle nullable boolean types
-        converted_col = converted_col.where(pd.notnull(converted_col), pd.NA)
-        return converted_col.astype("boolean")  # Use Pandas' nullable boolean type
-    except Exception as e:
-        raise ValueError(f"Error converting column '{col}' to boolean: {e}")
+    Raises:
+    - ValueError: If the column holds values that are not boolean tokens, naming the first few of them.
+    """
+    converted, invalid = map_booleans(df[col], BOOLEAN_CONVERSIONS)
+    if invalid:
+        examples = ', '.join(repr(str(value)) for value in invalid[:BOOLEAN_ERROR_EXAMPLES])
+        raise ValueError(f"Column '{col}' contains values that cannot be converted to boolean: {examples}.")
+    return converted
 
-# Example usage:
-    
-    
 def convert_to_complex(df, col):
     """
-    Converts a specified column in a DataFrame to complex numbers, if the column contains complex number data.
+    Converts a specified column in a DataFrame to complex numbers, if every value is a complex number.
+
+    Values are parsed with `complex_numbers.parse_complex`, once per distinct value, which reads both the
+    'j' and 'i' suffixes and ignores spaces. Allowed none tokens such as 'N/A' become missing values.
 
     Parameters:
     - df (pd.DataFrame): The DataFrame containing the column to convert.
@@ -178,13 +216,9 @@ def convert_to_complex(df, col):
     - pd.Series: The column converted to complex numbers, or the original column if conversion is not successful.
     """
     try:
-        # Check if any value in the column is a complex number
-        if df[col].apply(lambda x: isinstance(x, complex) or isinstance(x, str) and '+' in x and 'j' in x).any():
-            converted_col = df[col].apply(lambda x: complex(x) if pd.notna(x) else x)
-            return converted_col
-        else:
-            return df[col]  # If no complex numbers found, return original column
+        values = df[col]
+        values = values.mask(map_unique(values, is_allowed_none).to_numpy(dtype=bool))
+        return transform_unique(values, lambda uniques: parse_complex(uniques, errors='raise'))
     except Exception as e:
-        print(f"Error converting column '{col}' to complex: {e}")
+        logger.warning("Error converting column '%s' to complex: %s", col, e)
         return df[col]
-    
@@ -1,10 +1,10 @@
-import re
 import pandas as pd
 import numpy as np
 import traceback
 from dateutil import parser
 from dateutil.parser import ParserError
-from .conversions import is_allowed_none
+from .conversions import is_allowed_none, BOOLEAN_TOKENS
+from .typechecks import NON_DATE_RE
 
 def normalise_boolean(val):
     """
@@ -16,14 +16,8 @@ def normalise_boolean(val):
     Returns:
     - bool or pd.NA: The normalized boolean value, or pd.NA if unconvertible.
     """
-    true_values = ['true', '1', 'yes', 't', 'on']
-    false_values = ['false', '0', 'no', 'f', 'off']
-    if str(val).lower() in true_values:
-        return True
-    elif str(val).lower() in false_values:
-        return False
-    else:
-        return pd.NA  # Use pandas NA for undefined or unconvertible values
+    # Use pandas NA for undefined or unconvertible values
+    return BOOLEAN_TOKENS.get(str(val).lower(), pd.NA)
 
 
 def parse_mixed_data(col):
@@ -71,13 +65,8 @@ def can_parse_date(string):
         Returns:
         
     bool: True if the string can be parsed as a date, False otherwise."""
-    # Define non-date patterns to exclude strings that shouldn't be considered as dates
-    non_date_patterns = [
-        r"^\d+$",  # Strings that are only digits are not dates
-        r"^-?\d+(.\d+)?$",  # Strings that represent a float number are not dates
-    ]
-    # Check against non-date patterns before attempting to parse
-    if any(re.search(pattern, string) for pattern in non_date_patterns):
+    # Strings that are only digits, or represent a float number, are not dates
+    if NON_DATE_RE.search(string):
         return False
     try:# Attempt to parse the string as a date without using fuzzy logic
         parsed_date = parser.parse(string, fuzzy=False)
@@ -0,0 +1,136 @@
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from dateutil import parser
+from django.conf import settings
+from .data_handling import can_parse_date
+
+# strftime formats tried when detecting the format of a date column, most common first. Every format
+# reads values exactly as dateutil does: month-first for numeric dates, four-digit years only and no
+# time zones, so a value parsed with a format equals the value dateutil would return for it.
+DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M',
+    '%m/%d/%Y',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%Y/%m/%d',
+    '%Y/%m/%d %H:%M:%S',
+    '%m-%d-%Y',
+    '%m.%d.%Y',
+    '%Y.%m.%d',
+    '%d %B %Y',
+    '%d %b %Y',
+    '%d-%b-%Y',
+    '%d %b %Y %H:%M:%S',
+    '%B %d, %Y',
+    '%b %d, %Y',
+    '%B %d %Y',
+    '%b %d %Y',
+]
+
+
+@lru_cache(maxsize=getattr(settings, 'DATE_PARSE_CACHE_SIZE', 65536))
+def parse_date(string):
+    """
+    Parses a date string with dateutil's fuzzy parser, remembering the result for repeated strings.
+
+    Raises the parser's error if the string is not a date; failures are not cached.
+    """
+    return parser.parse(string, fuzzy=True)
+
+
+@lru_cache(maxsize=getattr(settings, 'DATE_PARSE_CACHE_SIZE', 65536))
+def is_date_string(string):
+    """
+    Memoised `can_parse_date`.
+    """
+    return can_parse_date(string)
+
+
+def detect_date_format(strings):
+    """
+    Detects the strftime format of a sample of date strings.
+
+    The formats in DATE_FORMATS are tried in order on at most DATE_FORMAT_SAMPLE_SIZE distinct strings.
+    The first format that reads every string wins; otherwise the format reading the most strings is
+    returned.
+
+    Parameters:
+    - strings (pd.Series): The date strings to inspect.
+
+    Returns:
+    - str or None: The detected format, or None if no format reads any of the strings.
+    """
+    sample = pd.Series(pd.unique(strings)[:getattr(settings, 'DATE_FORMAT_SAMPLE_SIZE', 1000)], dtype=object)
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if count == len(sample):
+            return date_format
+        if count > best_count:
+            best_format, best_count = date_format, count
+    return best_format
+
+
+def contains_date(strings):
+    """
+    Checks whether any of the given strings can be parsed as a date, like `can_parse_date`.
+
+    A sample is first matched against the known date formats, which settles typical date columns
+    without calling dateutil; otherwise each string is checked with the memoised `can_parse_date`.
+
+    Parameters:
+    - strings (pd.Series): Distinct candidate strings.
+
+    Returns:
+    - bool: True if at least one string is a date.
+    """
+    if strings.empty:
+        return False
+    if detect_date_format(strings) is not None:
+        return True
+    return any(is_date_string(value) for value in strings)
+
+
+def convert_dates(strings):
+    """
+    Converts date strings to timestamps, giving the same values as parsing each string with dateutil.
+
+    The column's format is detected from a sample and every distinct string is converted with
+    `pd.to_datetime(format=...)`. Strings the format cannot read are parsed one by one with the
+    memoised dateutil parser. Results are computed once per distinct string and mapped back to the rows.
+
+    Parameters:
+    - strings (pd.Series): The date strings to convert, without missing values.
+
+    Returns:
+    - pd.Series: The parsed dates with the index of `strings`. The Series is datetime64[ns] when every
+      date is naive and within the pandas timestamp range; otherwise it holds Python datetimes.
+
+    Raises:
+    - ValueError, OverflowError: If a string cannot be parsed as a date.
+    """
+    codes, uniques = pd.factorize(strings)
+    uniques = pd.Series(uniques, dtype=object)
+    date_format = detect_date_format(uniques)
+    if date_format is not None:
+        # dateutil keeps at most microseconds
+        parsed = pd.to_datetime(uniques, format=date_format, errors='coerce').dt.floor('us').to_numpy()
+    else:
+        parsed = np.full(len(uniques), np.datetime64('NaT'), dtype='datetime64[ns]')
+
+    leftovers = np.isnat(parsed)
+    leftover_dates = [parse_date(string) for string in uniques[leftovers]]
+    if any(date.tzinfo is not None or not pd.Timestamp.min <= date <= pd.Timestamp.max for date in leftover_dates):
+        values = pd.Series(parsed).astype(object).to_numpy()
+        values[leftovers] = leftover_dates
+        return pd.Series(values[codes], index=strings.index, dtype=object)
+    if leftover_dates:
+        parsed[leftovers] = pd.to_datetime(leftover_dates).to_numpy()
+    return pd.Series(parsed[codes], index=strings.index)
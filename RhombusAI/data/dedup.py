@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from .models import Dataset, ColumnType, ProcessedUpload
+from .storage import ColumnStore
+from .utils import get_user_friendly_dtype
+
+logger = logging.getLogger(__name__)
+
+# Settings that change how a file is inferred and converted. An upload is only served from the cache
+# while these settings, and UPLOAD_CACHE_VERSION, are unchanged.
+FINGERPRINT_SETTINGS = (
+    'UPLOAD_CACHE_VERSION', 'INFERENCE_MODE', 'INFERENCE_SAMPLE_SIZE', 'INFERENCE_CONFIDENCE_THRESHOLD',
+    'STREAMING_UPLOAD_MIN_BYTES', 'STREAMING_CHUNK_ROWS', 'STREAMING_DISTINCT_LIMIT', 'DATE_FORMAT_SAMPLE_SIZE',
+    'DTYPE_COMPACTION', 'DTYPE_CATEGORY_MAX_RATIO', 'READ_DTYPE_BACKEND', 'EXCEL_ENGINE', 'DURATION_MONTH_DAYS',
+    'DURATION_YEAR_DAYS',
+)
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Computes the BLAKE2b digest of every uploaded file as its chunks arrive, before passing them on to the
+    next upload handler, so the file is not read a second time.
+
+    Add the handler in front of the others before the request body is read:
+
+        hasher = HashingUploadHandler(request)
+        request.upload_handlers.insert(0, hasher)
+        digest = hasher.digests['datafile']
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = {}
+        self._hash = None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = hashlib.blake2b()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hash.hexdigest()
+        return None
+
+
+def file_digest(file):
+    """
+    Computes the BLAKE2b digest of an uploaded file by reading it, for files that did not pass through a
+    HashingUploadHandler.
+
+    Parameters:
+    - file (UploadedFile): The uploaded file.
+
+    Returns:
+    - str: The hexadecimal digest.
+    """
+    digest = hashlib.blake2b()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def sheet_digest(content_hash, sheet_name):
+    """
+    Returns the digest a dataset read from one sheet of an uploaded workbook is cached under, so each sheet
+    of a workbook has its own cache entry.
+
+    Parameters:
+    - content_hash (str): The digest of the uploaded workbook.
+    - sheet_name (str): The name of the sheet.
+
+    Returns:
+    - str: The hexadecimal digest.
+    """
+    return hashlib.blake2b(f'{content_hash}:{sheet_name}'.encode('utf-8')).hexdigest()
+
+
+def inference_fingerprint():
+    """
+    Returns a digest of the settings that determine how an uploaded file is processed.
+    """
+    values = {name: str(getattr(settings, name, None)) for name in FINGERPRINT_SETTINGS}
+    return hashlib.blake2b(json.dumps(values, sort_keys=True).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def find_processed_upload(content_hash):
+    """
+    Looks up the processed result of an identical file, processed with the current settings.
+
+    The entry's access time and hit count are updated. Entries whose column store has gone missing are dropped.
+
+    Parameters:
+    - content_hash (str): The digest of the uploaded file.
+
+    Returns:
+    - ProcessedUpload or None: The cached result, if any.
+    """
+    if not getattr(settings, 'UPLOAD_CACHE_ENABLED', True):
+        return None
+    entry = ProcessedUpload.objects.filter(content_hash=content_hash, inference_fingerprint=inference_fingerprint()).first()
+    if entry is None:
+        return None
+    if not ColumnStore(entry.storage_path).exists() or not default_storage.exists(entry.original_file):
+        entry.delete()
+        return None
+    ProcessedUpload.objects.filter(id=entry.id).update(last_accessed_at=timezone.now(), hits=F('hits') + 1)
+    return entry
+
+
+def dataset_from_processed_upload(entry, file_name, sheet_name=None):
+    """
+    Creates a dataset for a new upload of an already processed file. The dataset shares the raw file and
+    the column store of the cached result, so nothing is parsed, inferred or written.
+
+    Parameters:
+    - entry (ProcessedUpload): The cached result.
+    - file_name (str): The name the file was uploaded under.
+    - sheet_name (str, optional): The sheet of the workbook the cached result was read from.
+
+    Returns:
+    - Dataset: The new, processed dataset.
+    """
+    with transaction.atomic():
+        dataset = Dataset(
+            file_name=file_name, sheet_name=sheet_name, storage_path=entry.storage_path, content_hash=entry.content_hash,
+            processed_at=timezone.now(),
+        )
+        dataset.original_file.name = entry.original_file
+        dataset.save()
+        ColumnType.objects.bulk_create([
+            ColumnType(
+                dataset=dataset, column_name=column['column'], original_type=column['dtype'], inferred_type=column['dtype'],
+                user_modified_type=get_user_friendly_dtype(column['dtype']), confidence=column['confidence'], sampled=column['sampled'],
+                original_memory_bytes=column.get('original_memory_bytes'), memory_bytes=column.get('memory_bytes'),
+            )
+            for column in entry.columns
+        ])
+    return dataset
+
+
+def remember_processed_upload(dataset, store):
+    """
+    Records a freshly processed dataset as the cached result for its file, then evicts old entries.
+
+    Nothing is recorded if the dataset has no content hash, or if another upload of the same file was
+    recorded first.
+
+    Parameters:
+    - dataset (Dataset): The processed dataset, with its ColumnType rows saved.
+    - store (ColumnStore): The dataset's column store.
+    """
+    if not dataset.content_hash or not getattr(settings, 'UPLOAD_CACHE_ENABLED', True):
+        return
+    columns = [
+        {
+            'column': col.column_name, 'dtype': col.inferred_type, 'confidence': col.confidence, 'sampled': col.sampled,
+            'original_memory_bytes': col.original_memory_bytes, 'memory_bytes': col.memory_bytes,
+        }
+        for col in dataset.column_types.order_by('id')
+    ]
+    try:
+        with transaction.atomic():
+            ProcessedUpload.objects.create(
+                content_hash=dataset.content_hash, inference_fingerprint=inference_fingerprint(),
+                original_file=dataset.original_file.name, storage_path=store.key, size_bytes=store.size_bytes, columns=columns,
+            )
+    except IntegrityError:
+        return
+    evict_processed_uploads()
+
+
+def evict_processed_uploads():
+    """
+    Drops the least recently used cache entries until at most UPLOAD_CACHE_MAX_ENTRIES entries taking at
+    most UPLOAD_CACHE_MAX_BYTES remain.
+
+    The column store and raw file of a dropped entry are deleted once no dataset uses them; until then
+    they stay with their datasets, and only stop being offered to new uploads.
+
+    Returns:
+    - int: The number of entries dropped.
+    """
+    max_entries = getattr(settings, 'UPLOAD_CACHE_MAX_ENTRIES', 100)
+    max_bytes = getattr(settings, 'UPLOAD_CACHE_MAX_BYTES', 5 * 1024 ** 3)
+    count = ProcessedUpload.objects.count()
+    total = ProcessedUpload.objects.aggregate(total=Sum('size_bytes'))['total'] or 0
+    evicted = 0
+    for entry in ProcessedUpload.objects.order_by('last_accessed_at', 'id'):
+        if count <= max_entries and total <= max_bytes:
+            break
+        entry.delete()
+        count -= 1
+        total -= entry.size_bytes
+        evicted += 1
+        release_files(entry.storage_path, entry.original_file)
+        logger.info("Evicted processed upload %s (%d bytes)", entry.content_hash, entry.size_bytes)
+    return evicted
+
+
+def release_files(storage_path, original_file):
+    """
+    Deletes a column store and a raw file unless a dataset or cache entry still uses them.
+    """
+    if storage_path and not _store_in_use(storage_path):
+        ColumnStore(storage_path).delete()
+    if original_file and not (
+        Dataset.objects.filter(original_file=original_file).exists()
+        or ProcessedUpload.objects.filter(original_file=original_file).exists()
+    ):
+        default_storage.delete(original_file)
+
+
+def private_store(dataset):
+    """
+    Returns a column store that only the given dataset uses, copying its store first if it is shared with
+    other datasets or the upload cache. Call this before modifying a dataset's stored data.
+
+    Parameters:
+    - dataset (Dataset): A processed dataset.
+
+    Returns:
+    - ColumnStore: The dataset's own store.
+    """
+    store = ColumnStore(dataset.storage_path)
+    if not _store_in_use(dataset.storage_path, exclude_dataset=dataset):
+        return store
+    store = store.copy()
+    dataset.storage_path = store.key
+    dataset.save(update_fields=['storage_path'])
+    return store
+
+
+def _store_in_use(storage_path, exclude_dataset=None):
+    datasets = Dataset.objects.filter(storage_path=storage_path)
+    if exclude_dataset is not None:
+        datasets = datasets.exclude(id=exclude_dataset.id)
+    return datasets.exists() or ProcessedUpload.objects.filter(storage_path=storage_path).exists()
@@ -0,0 +1,151 @@
+import re
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+NANOSECONDS_PER_DAY = 86400 * 10 ** 9
+
+# Unit words of natural-language durations, as the typechecks read them, with common abbreviations.
+# Months and years are as long as DURATION_MONTH_DAYS and DURATION_YEAR_DAYS say.
+UNIT_ALIASES = {
+    'year': 'year', 'years': 'year', 'yr': 'year', 'yrs': 'year',
+    'month': 'month', 'months': 'month', 'mo': 'month', 'mos': 'month',
+    'week': 'week', 'weeks': 'week', 'wk': 'week', 'wks': 'week',
+    'day': 'day', 'days': 'day',
+    'hour': 'hour', 'hours': 'hour', 'hr': 'hour', 'hrs': 'hour',
+    'minute': 'minute', 'minutes': 'minute', 'min': 'minute', 'mins': 'minute',
+    'second': 'second', 'seconds': 'second', 'sec': 'second', 'secs': 'second',
+}
+# Longest aliases first, so e.g. 'mins' is not read as 'min' followed by 's'
+UNIT_PATTERN = '|'.join(sorted(UNIT_ALIASES, key=len, reverse=True))
+NUMBER_PATTERN = r'\d+(?:\.\d+)?'
+PAIR_PATTERN = rf'(?P<value>{NUMBER_PATTERN})\s*(?P<unit>{UNIT_PATTERN})\b'
+# A whole phrase of value/unit pairs, e.g. '1 year, 2 months and 3 days'
+_PAIR = rf'{NUMBER_PATTERN}\s*(?:{UNIT_PATTERN})\b'
+PHRASE_PATTERN = rf'{_PAIR}(?:\s*(?:,|and)?\s*{_PAIR})*'
+
+# ISO 8601 durations, e.g. 'P1Y2M10DT2H30M', including the years and months pandas does not read
+ISO_UNITS = ['year', 'month', 'week', 'day', 'hour', 'minute', 'second']
+ISO_PATTERN = (
+    rf'P(?:(?P<year>{NUMBER_PATTERN})Y)?(?:(?P<month>{NUMBER_PATTERN})M)?(?:(?P<week>{NUMBER_PATTERN})W)?'
+    rf'(?:(?P<day>{NUMBER_PATTERN})D)?'
+    rf'(?:T(?:(?P<hour>{NUMBER_PATTERN})H)?(?:(?P<minute>{NUMBER_PATTERN})M)?(?:(?P<second>{NUMBER_PATTERN})S)?)?'
+)
+
+# Durations beyond the range of timedelta64[ns] (about 292 years) cannot be stored
+MAX_NANOSECONDS = pd.Timedelta.max.value
+
+
+def unit_nanoseconds():
+    """
+    Returns the length of each duration unit in nanoseconds, with months and years as long as the
+    DURATION_MONTH_DAYS and DURATION_YEAR_DAYS settings say (by default the average Gregorian lengths).
+
+    Returns:
+    - dict: The number of nanoseconds per canonical unit ('year', 'month', ..., 'second').
+    """
+    return {
+        'year': round(getattr(settings, 'DURATION_YEAR_DAYS', 365.2425) * NANOSECONDS_PER_DAY),
+        'month': round(getattr(settings, 'DURATION_MONTH_DAYS', 30.436875) * NANOSECONDS_PER_DAY),
+        'week': 7 * NANOSECONDS_PER_DAY,
+        'day': NANOSECONDS_PER_DAY,
+        'hour': 3600 * 10 ** 9,
+        'minute': 60 * 10 ** 9,
+        'second': 10 ** 9,
+    }
+
+
+def parse_durations(col, errors='coerce'):
+    """
+    Converts a column of durations to timedelta64[ns], reading pandas formats ('3 days', '1 days 02:00:00',
+    '1h30m'), ISO 8601 durations ('P1Y2M3DT4H') and natural-language phrases ('1 year, 2 months and 3
+    days').
+
+    The column is read with `pd.to_timedelta` first, so every value pandas reads keeps its value, except
+    ISO durations, which are matched with one vectorised `str.extract`. The values left are matched with
+    one `str.extractall` for the value/unit pairs of phrases, and the pairs are summed into nanoseconds
+    with NumPy. Months and years are as long as the DURATION_MONTH_DAYS and DURATION_YEAR_DAYS settings
+    say.
+
+    Parameters:
+    - col (pd.Series): The column to convert.
+    - errors (str): 'coerce' turns values that are not durations into NaT; 'raise' raises for them, as
+      `pd.to_timedelta` does.
+
+    Returns:
+    - pd.Series: The durations, with the index and name of `col`.
+
+    Raises:
+    - ValueError: With errors='raise', if a value is not a duration.
+    """
+    if not (pd.api.types.is_object_dtype(col.dtype) or pd.api.types.is_string_dtype(col.dtype)):
+        return pd.to_timedelta(col, errors=errors)
+
+    parsed = pd.to_timedelta(col, errors='coerce').to_numpy()
+    # pandas misreads fractions of ISO components other than seconds ('P1.5D'), so ISO durations are
+    # always read here
+    iso = np.flatnonzero(_starts_with_p(col))
+    if len(iso):
+        nanoseconds, valid = _iso_nanoseconds(col.iloc[iso].str.strip().reset_index(drop=True))
+        parsed[iso[valid]] = nanoseconds[valid].view('m8[ns]')
+
+    pending = np.flatnonzero(np.isnat(parsed) & col.notna().to_numpy())
+    if len(pending):
+        strings = col.iloc[pending].astype(str).str.strip().reset_index(drop=True)
+        nanoseconds, valid = _phrase_nanoseconds(strings)
+        parsed[pending[valid]] = nanoseconds[valid].view('m8[ns]')
+
+    if errors == 'raise':
+        failed = np.isnat(parsed) & col.notna().to_numpy()
+        if failed.any():
+            # pandas reads some values (e.g. 'nan') as NaT itself, and raises for the others
+            pd.to_timedelta(col[failed], errors='raise')
+    return pd.Series(parsed, index=col.index, name=col.name)
+
+
+def _starts_with_p(col):
+    try:
+        return col.str.startswith('P', na=False).to_numpy(dtype=bool)
+    except AttributeError:
+        # Object columns without a single string have no string accessor
+        return np.zeros(len(col), dtype=bool)
+
+
+def _iso_nanoseconds(strings):
+    parts = strings.str.extract(f'^{ISO_PATTERN}$')
+    values = parts[ISO_UNITS].astype(float).to_numpy()
+    # 'P' and 'PT' alone match the pattern without a single component
+    valid = ~np.isnan(values).all(axis=1)
+    units = np.array([unit_nanoseconds()[unit] for unit in ISO_UNITS], dtype=np.int64)
+    values = np.nan_to_num(values)
+    nanoseconds, fits = _nanoseconds(values, units)
+    return nanoseconds.sum(axis=1), valid & fits.all(axis=1) & _in_range(values @ units.astype(float))
+
+
+def _phrase_nanoseconds(strings):
+    matched = strings.str.fullmatch(PHRASE_PATTERN, case=False).to_numpy(dtype=bool)
+    nanoseconds = np.zeros(len(strings), dtype=np.int64)
+    totals = np.zeros(len(strings))
+    if matched.any():
+        pairs = strings[matched].str.extractall(PAIR_PATTERN, flags=re.IGNORECASE)
+        rows = pairs.index.get_level_values(0).to_numpy()
+        lengths = unit_nanoseconds()
+        units = pairs['unit'].str.lower().map(UNIT_ALIASES).map(lengths).to_numpy(dtype=np.int64)
+        values = pairs['value'].astype(float).to_numpy()
+        pair_nanoseconds, _ = _nanoseconds(values, units)
+        np.add.at(nanoseconds, rows, pair_nanoseconds)
+        np.add.at(totals, rows, values * units)
+    return nanoseconds, matched & _in_range(totals)
+
+
+def _nanoseconds(values, units):
+    # Whole units are multiplied in integers and only the fraction in floats, so long durations stay exact
+    whole = np.floor(values)
+    fits = _in_range(values * units)
+    whole_nanoseconds = np.where(fits, whole, 0).astype(np.int64) * units
+    fraction_nanoseconds = np.rint(np.where(fits, values - whole, 0) * units).astype(np.int64)
+    return whole_nanoseconds + fraction_nanoseconds, fits
+
+
+def _in_range(nanoseconds):
+    return np.abs(nanoseconds) < MAX_NANOSECONDS
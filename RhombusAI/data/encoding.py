@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Object columns whose values all share one of these inferred types can be factorized safely. Columns
+# mixing types are not, because values such as 1, 1.0 and True compare equal and would share a code
+# even though per-value functions (e.g. str) treat them differently.
+HOMOGENEOUS_TYPES = {
+    'string', 'empty', 'integer', 'floating', 'boolean', 'decimal', 'complex', 'bytes',
+    'datetime', 'datetime64', 'date', 'timedelta', 'timedelta64', 'time',
+}
+
+
+def can_factorize(col):
+    """
+    Checks whether the distinct values of a column can stand in for its rows in per-value functions.
+
+    Parameters:
+    - col (pd.Series): The column to check.
+
+    Returns:
+    - bool: True for columns with a non-object dtype, or object columns holding a single type of value.
+    """
+    if not pd.api.types.is_object_dtype(col.dtype):
+        return True
+    return pd.api.types.infer_dtype(col, skipna=True) in HOMOGENEOUS_TYPES
+
+
+def distinct_values(col):
+    """
+    Returns the values of a column that per-value predicates need to see, once each.
+
+    Parameters:
+    - col (pd.Series): The column, usually without missing values.
+
+    Returns:
+    - array-like: The distinct values, or every value when the column cannot be factorized.
+    """
+    return pd.unique(col) if can_factorize(col) else col.to_numpy()
+
+
+def map_unique(col, func):
+    """
+    Applies a function to each distinct value of a column and maps the results back to the rows.
+
+    Gives the same result as `col.apply(func)`, but calls `func` once per distinct value instead of once
+    per row, which matters for low-cardinality columns such as statuses or country codes. Missing values
+    are passed to `func` once per kind (None, NaN, NaT, pd.NA). Columns that cannot be factorized are
+    processed row by row.
+
+    Parameters:
+    - col (pd.Series): The column to transform.
+    - func (function): The per-value function.
+
+    Returns:
+    - pd.Series: The results, with the index and name of `col` and an inferred dtype.
+    """
+    if col.empty or not can_factorize(col):
+        return col.apply(func)
+
+    codes, uniques = pd.factorize(col)
+    results = np.empty(len(uniques) + 1, dtype=object)
+    results[:len(uniques)] = [func(value) for value in uniques]
+    mapped = results[codes]
+
+    missing = codes == -1
+    if missing.any():
+        nulls = col.to_numpy(dtype=object)[missing]
+        kind_codes, _ = pd.factorize(pd.Series(nulls).map(type))
+        kinds, first = np.unique(kind_codes, return_index=True)
+        kind_results = np.empty(len(kinds), dtype=object)
+        kind_results[:] = [func(nulls[position]) for position in first]
+        mapped[missing] = kind_results[kind_codes]
+    return pd.Series(mapped, index=col.index, name=col.name).infer_objects()
+
+
+def transform_unique(col, func):
+    """
+    Applies a vectorised function to the distinct values of a column and maps the results back to the rows.
+
+    Parameters:
+    - col (pd.Series): The column to transform.
+    - func (function): Takes a pd.Series and returns a result of the same length, e.g. `pd.to_timedelta`.
+      Missing values are passed as a single NaN.
+
+    Returns:
+    - pd.Series: The results, with the index and name of `col`.
+    """
+    if not can_factorize(col):
+        return pd.Series(func(col), index=col.index, name=col.name)
+
+    codes, uniques = pd.factorize(col, use_na_sentinel=False)
+    results = np.asarray(func(pd.Series(uniques)))
+    return pd.Series(results[codes], index=col.index, name=col.name)
@@ -0,0 +1,199 @@
+import importlib.util
+import pandas as pd
+from django.conf import settings
+from pandas.io.parsers import TextParser
+
+# Values openpyxl returns for cells holding a formula error; pandas reads them as missing values
+ERROR_VALUES = frozenset(('#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A', '#GETTING_DATA'))
+
+
+def excel_engine():
+    """
+    Returns the engine used to read Excel workbooks, selected with the EXCEL_ENGINE setting.
+
+    'calamine' reads whole sheets with the Rust calamine library (the optional python-calamine package);
+    'openpyxl' streams the rows of a sheet with openpyxl in read-only mode, so large sheets can be read
+    in chunks. 'auto', the default, picks calamine when it is installed and openpyxl otherwise.
+    """
+    engine = getattr(settings, 'EXCEL_ENGINE', 'auto')
+    if engine == 'auto':
+        return 'calamine' if importlib.util.find_spec('python_calamine') is not None else 'openpyxl'
+    return engine
+
+
+def sheet_names(path):
+    """
+    Returns the names of the worksheets of a workbook, in order, without reading their cells.
+
+    Parameters:
+    - path (str or file): The path of the workbook, or the open workbook file.
+
+    Returns:
+    - list: The sheet names.
+    """
+    if excel_engine() == 'calamine':
+        from python_calamine import CalamineWorkbook
+        return list(CalamineWorkbook.from_object(path).sheet_names)
+    workbook = _open_workbook(path)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def read_sheet(path, sheet_name=0, usecols=None, nrows=None):
+    """
+    Reads one worksheet of a workbook into a DataFrame, with the values and dtypes `pd.read_excel` gives.
+
+    With the openpyxl engine the rows are streamed as plain values, which skips the cell objects
+    `pd.read_excel` builds for every cell; with `nrows` only the header and the first rows are read.
+
+    Parameters:
+    - path (str): The path of the workbook.
+    - sheet_name (str or int): The name or position of the sheet. Defaults to the first sheet.
+    - usecols (list, optional): The names or positions of the columns to keep.
+    - nrows (int, optional): The number of data rows to read.
+
+    Returns:
+    - pd.DataFrame: The sheet's rows.
+    """
+    if excel_engine() == 'calamine':
+        return pd.read_excel(path, engine='calamine', sheet_name=sheet_name, usecols=usecols, nrows=nrows)
+    with SheetReader(path, sheet_name) as reader:
+        return reader.read(usecols=usecols, nrows=nrows)
+
+
+class SheetReader:
+    """
+    Streams the rows of one worksheet with openpyxl in read-only mode, so only one chunk of rows is held
+    in memory at a time.
+
+    Cells are converted the way `pd.read_excel` converts them (whole numbers become integers, empty and
+    error cells become missing values) and each chunk is parsed with the same parser, so a chunk has the
+    dtypes `pd.read_excel` would give the same rows. Trailing empty rows are dropped.
+
+    Use it as a context manager, so the workbook is closed:
+
+        with SheetReader(path, 'Sales') as reader:
+            for chunk in reader.chunks(100000):
+                ...
+
+    Parameters:
+    - path (str): The path of the workbook.
+    - sheet_name (str or int): The name or position of the sheet. Defaults to the first sheet.
+
+    Attributes:
+    - rows (int or None): The number of data rows the sheet declares, or None if the workbook does not
+      record it. Only used to estimate progress.
+    """
+
+    def __init__(self, path, sheet_name=0):
+        self.workbook = _open_workbook(path)
+        try:
+            self.sheet = _worksheet(self.workbook, sheet_name)
+        except ValueError:
+            self.workbook.close()
+            raise
+        self.sheet_name = self.sheet.title
+        # Read-only sheets trust the dimensions the workbook records; they are only used as hints
+        self.width = self.sheet.max_column or 0
+        self.rows = self.sheet.max_row - 1 if self.sheet.max_row else None
+        self.sheet.reset_dimensions()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def read(self, usecols=None, nrows=None):
+        """
+        Reads the rows of the sheet into a single DataFrame.
+        """
+        rows = list(self._rows(nrows))
+        if not rows:
+            return pd.DataFrame()
+        width = max(len(row) for row in rows)
+        return _parse([_pad(row, width) for row in rows], usecols)
+
+    def chunks(self, chunk_rows, usecols=None, nrows=None):
+        """
+        Yields the data rows of the sheet as DataFrames of at most `chunk_rows` rows, each with the header.
+
+        Raises:
+        - ValueError: If a data row has more cells than the header and the recorded sheet width.
+        """
+        rows = self._rows(nrows)
+        header = next(rows, None)
+        if header is None:
+            return
+        width = max(len(header), self.width)
+        header = _pad(header, width)
+        chunk = []
+        for number, row in enumerate(rows, start=2):
+            if len(row) > width:
+                raise ValueError(f"Row {number} of sheet '{self.sheet_name}' has more cells than its header.")
+            chunk.append(_pad(row, width))
+            if len(chunk) == chunk_rows:
+                yield _parse([header] + chunk, usecols)
+                chunk = []
+        if chunk:
+            yield _parse([header] + chunk, usecols)
+
+    def _rows(self, nrows):
+        # Empty rows are held back until a row with values follows them, so trailing ones are dropped
+        empty = 0
+        emitted = 0
+        for row in self.sheet.iter_rows(values_only=True):
+            values = [_convert_cell(value) for value in row]
+            while values and values[-1] == '':
+                values.pop()
+            if not values:
+                empty += 1
+                continue
+            for _ in range(empty):
+                if nrows is not None and emitted > nrows:
+                    return
+                yield []
+                emitted += 1
+            empty = 0
+            if nrows is not None and emitted > nrows:
+                return
+            yield values
+            emitted += 1
+
+
+def _open_workbook(path):
+    from openpyxl import load_workbook
+    return load_workbook(path, read_only=True, data_only=True, keep_links=False)
+
+
+def _worksheet(workbook, sheet_name):
+    if isinstance(sheet_name, int):
+        if not 0 <= sheet_name < len(workbook.sheetnames):
+            raise ValueError(f"Worksheet index {sheet_name} is invalid, {len(workbook.sheetnames)} worksheets found")
+        return workbook.worksheets[sheet_name]
+    if sheet_name not in workbook.sheetnames:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    return workbook[sheet_name]
+
+
+def _convert_cell(value):
+    if value is None:
+        return ''
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is str and value in ERROR_VALUES:
+        return float('nan')
+    return value
+
+
+def _pad(row, width):
+    return row + [''] * (width - len(row)) if len(row) < width else row
+
+
+def _parse(rows, usecols):
+    return TextParser(rows, header=0, skip_blank_lines=False, usecols=usecols).read()
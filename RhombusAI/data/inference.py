@@ -0,0 +1,335 @@
+import logging
+import numpy as np
+import pandas as pd
+from .classifier import (
+    BOOLEAN_VALUES, NONE, NUMBER, PERCENT, CURRENCY, COMPLEX, TIMEDELTA, TypeHistogram, classify_strings,
+    distinct_strings,
+)
+from .conversions import is_allowed_none, map_booleans
+from .typechecks import is_complex, is_timedelta, looks_like_currency, looks_like_number
+from .data_handling import can_parse_date
+from .dates import contains_date, is_date_string
+from .encoding import can_factorize, distinct_values, map_unique
+
+logger = logging.getLogger(__name__)
+
+
+def infer_data_type_legacy(col):
+    """
+    Infers the most likely data type of a given pandas Series by analyzing its contents.
+
+    The function checks for specific patterns and types within the series, such as boolean values,
+    complex numbers, numeric values, currencies, time durations, dates, categories, and textual data.
+    It preprocesses the data to normalize boolean values and clean numeric and textual representations.
+
+    Parameters:
+    - col (pd.Series): A pandas Series whose data type is to be inferred.
+
+    Returns:
+    - str: A string representing the inferred data type, such as 'Boolean', 'Decimal', 'Date', etc.
+    """
+    # Preprocess column, removing commas and converting to None types as needed. Every per-value
+    # function runs once per distinct value (see data/encoding.py).
+    booleans, invalid = map_booleans(col)
+    if len(col) and not invalid and booleans.notna().all():
+        return 'Boolean'
+
+    col_cleaned = map_unique(col, lambda x: x.replace(',', '').strip() if isinstance(x, str) else x)
+    col_cleaned = map_unique(col_cleaned, lambda x: None if is_allowed_none(x) else x)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Cleaned %s: %s", col.name, col_cleaned.head(10).tolist())
+    cleaned_values = distinct_values(col_cleaned.dropna())
+    raw_values = distinct_values(col.dropna())
+    if all(isinstance(x, bool) for x in cleaned_values):
+        return 'Boolean'
+    if any(is_complex(x) for x in cleaned_values):
+        return 'Complex Number'
+    if all(looks_like_number(x) for x in cleaned_values):
+        return 'Decimal'
+    if all(looks_like_currency(x) for x in cleaned_values):
+        return 'Decimal'
+    if any(is_timedelta(str(x)) for x in raw_values):
+        return 'Time Duration'
+    if any(can_parse_date(str(x)) for x in raw_values):
+        return 'Date'
+    if len(set(col.dropna())) < len(col.dropna()) / 2:
+        return 'Category'
+    if all(isinstance(x, str) for x in raw_values):
+        return 'Text'
+
+    return 'Text'
+
+
+def infer_data_type_vectorised(col):
+    """
+    Infers the data type of a pandas Series using whole-column operations instead of per-value loops.
+
+    Columns with a numeric, boolean, timestamp or purely textual dtype are classified from their dtype or from
+    a type histogram of their distinct values (see data/classifier.py), and return the same labels as
+    `infer_data_type_legacy`. Columns holding a mix of Python types (e.g. numbers and strings read from
+    Excel) fall back to the legacy per-value predicates.
+
+    Parameters:
+    - col (pd.Series): A pandas Series whose data type is to be inferred.
+
+    Returns:
+    - str: A string representing the inferred data type, such as 'Boolean', 'Decimal', 'Date', etc.
+    """
+    dtype = col.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'Boolean'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return _infer_numeric(col)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        # Date cells of Excel workbooks are read as timestamps already
+        return 'Date' if col.notna().any() else 'Boolean'
+    if _is_text_column(col):
+        return _infer_text(col)
+    return infer_data_type_legacy(col)
+
+
+def _is_text_column(col):
+    if pd.api.types.is_object_dtype(col.dtype):
+        return pd.api.types.infer_dtype(col, skipna=True) in ('string', 'empty')
+    return pd.api.types.is_string_dtype(col.dtype)
+
+
+def _infer_numeric(col):
+    values = col.dropna()
+    if pd.api.types.is_complex_dtype(col.dtype):
+        return 'Complex Number' if len(values) else 'Boolean'
+
+    if pd.api.types.is_integer_dtype(col.dtype):
+        # Integers only read as booleans when every cell is 0 or 1, and -999 is an allowed none token
+        if len(col) and len(values) == len(col) and values.isin([0, 1]).all():
+            return 'Boolean'
+        values = values[values != -999]
+
+    # An empty column after dropping none tokens passes every all(...) check, starting with Boolean
+    return 'Decimal' if len(values) else 'Boolean'
+
+
+def _infer_text(col):
+    # Every rule is an all(...) or any(...) over the values, so one classification of the distinct values
+    # decides them all (see data/classifier.py)
+    return TypeHistogram(col).data_type
+
+
+def stratified_sample(col, size, random_state=0):
+    """
+    Splits a sample of a pandas Series into head, random-middle and tail strata.
+
+    Parameters:
+    - col (pd.Series): The column to sample.
+    - size (int): The total number of rows to sample across the three strata.
+    - random_state (int): Seed for the random middle stratum, so repeated uploads sample the same rows.
+
+    Returns:
+    - list: Three pd.Series (head, random middle rows in original order, tail).
+    """
+    edge = size // 3
+    head = col.iloc[:edge]
+    tail = col.iloc[len(col) - edge:]
+    middle = col.iloc[edge:len(col) - edge]
+    middle = middle.sample(n=min(size - 2 * edge, len(middle)), random_state=random_state).sort_index()
+    return [head, middle, tail]
+
+
+def label_confidence(col, label):
+    """
+    Computes the share of meaningful values in a column that individually support an inferred label.
+
+    Null values and allowed none tokens are ignored. Each distinct value is checked once with the
+    per-value predicates and weighted by how often it occurs. 'Category' and 'Text' are supported by
+    values that are not booleans, numbers, currencies, complex numbers or durations; date parsing is
+    skipped for them to keep the score cheap on free-text columns.
+
+    Parameters:
+    - col (pd.Series): The values the label was inferred from.
+    - label (str): The inferred data type label.
+
+    Returns:
+    - float: A confidence score between 0 and 1, or 0 when the column holds no meaningful values.
+    """
+    counts = col.dropna().value_counts(sort=False)
+    supported = 0
+    total = 0
+    for value, count in counts.items():
+        cleaned = value.replace(',', '').strip() if isinstance(value, str) else value
+        if is_allowed_none(cleaned):
+            continue
+        total += count
+        if _supports_label(value, cleaned, label):
+            supported += count
+    return round(float(supported / total), 4) if total else 0.0
+
+
+def _supports_label(value, cleaned, label):
+    is_boolean = isinstance(value, bool) or str(value).lower() in BOOLEAN_VALUES
+    is_number = looks_like_number(cleaned) or (isinstance(cleaned, str) and looks_like_currency(cleaned))
+    if label == 'Boolean':
+        return is_boolean
+    if label == 'Decimal':
+        return is_number
+    if label == 'Complex Number':
+        return is_number or is_complex(cleaned.replace(' ', '') if isinstance(cleaned, str) else cleaned)
+    if label == 'Time Duration':
+        return is_timedelta(str(value))
+    if label == 'Date':
+        return is_date_string(str(value))
+    return not (is_boolean or is_number or is_complex(cleaned) or is_timedelta(str(value)))
+
+
+class ColumnProfile:
+    """
+    Accumulates the facts the inference rules depend on across successive chunks of one column.
+
+    Each rule of `infer_data_type_legacy` is an all(...) or any(...) over the column's values (or a
+    distinct-value count), so it can be decided chunk by chunk: `update` folds a chunk into the running
+    flags and `data_type` applies the rules in the legacy order to everything seen so far. Distinct values
+    are tracked up to `distinct_limit`; a column with more distinct values than that is never a Category.
+
+    Attributes:
+    - count (int): The number of values seen, including nulls.
+    - non_null (int): The number of non-null values seen, including allowed none tokens.
+    - meaningful (int): The number of values that are neither null nor an allowed none token.
+    """
+
+    def __init__(self, distinct_limit=100000):
+        self.distinct_limit = distinct_limit
+        self.count = 0
+        self.non_null = 0
+        self.meaningful = 0
+        self.boolean_tokens = True
+        self.all_bool = True
+        self.any_complex = False
+        self.all_number = True
+        self.all_currency = True
+        self.any_timedelta = False
+        self.any_date = False
+        self.distinct = set()
+
+    def update(self, col):
+        """
+        Folds a chunk of the column into the profile.
+
+        Parameters:
+        - col (pd.Series): The next chunk of the column, as read from the file.
+        """
+        values = col.dropna()
+        self.count += len(col)
+        self.non_null += len(values)
+
+        if pd.api.types.is_bool_dtype(col.dtype):
+            self._update_distinct(values.astype(str))
+            self.meaningful += len(values)
+        elif pd.api.types.is_numeric_dtype(col.dtype):
+            self._update_distinct(values.astype(str))
+            is_integer = pd.api.types.is_integer_dtype(col.dtype)
+            self.boolean_tokens &= bool(is_integer and values.isin([0, 1]).all())
+            meaningful = values[values != -999] if is_integer else values
+            self.meaningful += len(meaningful)
+            self.all_bool &= meaningful.empty
+            self.any_complex |= bool(pd.api.types.is_complex_dtype(col.dtype) and len(meaningful))
+        elif pd.api.types.is_datetime64_any_dtype(col.dtype):
+            self._update_distinct(values.astype(str))
+            self.meaningful += len(values)
+            self.boolean_tokens &= values.empty
+            self.all_bool &= values.empty
+            self.all_number &= values.empty
+            self.all_currency &= values.empty
+            self.any_date |= not values.empty
+        else:
+            # Text rules only need each distinct value once, plus how often it occurs for the counts
+            if can_factorize(values):
+                codes, distinct = pd.factorize(values)
+                counts = np.bincount(codes, minlength=len(distinct))
+            else:
+                distinct = values.reset_index(drop=True)
+                counts = np.ones(len(values), dtype=int)
+            strings = distinct_strings(distinct, col.dtype)
+            distinct = pd.Series(distinct, dtype=object) if strings.dtype == object else strings
+            self._update_distinct(strings)
+            self._update_text(distinct, strings, counts)
+
+    def _update_text(self, values, strings, counts):
+        self.boolean_tokens &= bool(strings.str.lower().isin(BOOLEAN_VALUES).all())
+        classes, date_candidates = classify_strings(strings)
+        meaningful = classes != NONE
+        self.meaningful += int(counts[meaningful].sum())
+        self.all_bool &= pd.api.types.infer_dtype(values[meaningful], skipna=True) in ('boolean', 'empty')
+        if not meaningful.any():
+            return
+
+        found = classes[meaningful]
+        self.any_complex |= bool((found == COMPLEX).any())
+        self.all_number &= bool(np.isin(found, (NUMBER, PERCENT)).all())
+        self.all_currency &= bool(np.isin(found, (NUMBER, CURRENCY)).all())
+        # Complex numbers outrank durations and dates, and a duration outranks dates, so once one is seen
+        # the lower-ranked checks can no longer change the outcome
+        if self.any_complex or self.any_timedelta:
+            return
+        self.any_timedelta = bool((classes == TIMEDELTA).any())
+        if not self.any_timedelta and not self.any_date:
+            self.any_date = contains_date(pd.Series(strings[date_candidates].unique()))
+
+    def _update_distinct(self, strings):
+        if self.distinct is not None:
+            self.distinct.update(strings.unique())
+            if len(self.distinct) > self.distinct_limit:
+                self.distinct = None
+
+    @property
+    def data_type(self):
+        """
+        Returns the data type label for all the values seen so far.
+        """
+        if self.count and self.non_null == self.count and self.boolean_tokens:
+            return 'Boolean'
+        if not self.meaningful or self.all_bool:
+            return 'Boolean'
+        if self.any_complex:
+            return 'Complex Number'
+        if self.all_number or self.all_currency:
+            return 'Decimal'
+        if self.any_timedelta:
+            return 'Time Duration'
+        if self.any_date:
+            return 'Date'
+        if self.distinct is not None and len(self.distinct) < self.non_null / 2:
+            return 'Category'
+        return 'Text'
+
+
+# Labels that win as soon as one part of a column has them, in the order the legacy rules check them
+DOMINANT_TYPES = ['Complex Number', 'Time Duration', 'Date']
+
+
+def widen_data_type(current, new, rescan=None):
+    """
+    Returns the data type label for a column made of two parts with known labels, e.g. stored rows and
+    newly appended ones.
+
+    The result follows the order of the legacy rules: complex numbers, then durations, then dates win as
+    soon as either part has them, as they would in a full scan. Otherwise an existing Text part stays
+    Text. Any other mix cannot be decided from the labels alone (Boolean 0/1 tokens and numbers give Decimal, but 'yes'/'no' tokens and numbers give
+    Text), so it is decided by `rescan`, which profiles the values of both parts together. Without it,
+    such mixes give Text.
+
+    Parameters:
+    - current (str): The label of the existing part.
+    - new (str or None): The label of the new part, or None if it holds no meaningful values.
+    - rescan (callable, optional): Returns a `ColumnProfile` of both parts; only called when needed.
+
+    Returns:
+    - str: The label for the whole column.
+    """
+    if new is None or new == current:
+        return current
+    for label in DOMINANT_TYPES:
+        if label in (current, new):
+            return label
+    if current == 'Text' or rescan is None:
+        return 'Text'
+    return rescan().data_type
@@ -0,0 +1,145 @@
+import os
+import pandas as pd
+from django.conf import settings
+from .inference import ColumnProfile, stratified_sample, label_confidence
+from .utils import convert_column
+from .backend import read_csv, normalise_excel_columns
+from .excel import SheetReader
+from .metrics import column_stage, stage
+
+
+def ingest_csv(path, store, report=None, progress=None):
+    """
+    Reads a CSV file in chunks, infers and converts each chunk, and appends it to a column store.
+
+    Memory stays bounded by the chunk size regardless of the file size. The column types are inferred
+    from the first chunk and re-validated on every later chunk through a `ColumnProfile`, which applies
+    the same rules as a full scan to all rows seen so far. When a chunk changes a column's type (e.g.
+    a numeric column turns out to contain text), only that column is re-read from the source file and
+    re-converted with the wider type; the other columns keep the parts already written.
+
+    Parameters:
+    - path (str): The path of the CSV file.
+    - store (ColumnStore): The empty store to write the converted columns to.
+    - report (dict, optional): If given, filled with the inferred 'data_type', 'confidence' and 'sampled'
+      flag of each column, like `infer_and_convert_data_types`.
+    - progress (function, optional): Called as `progress(column, fraction)` after every chunk, with the
+      share of the file read so far.
+
+    Returns:
+    - ColumnStore: The store holding the converted dataset.
+    """
+    file_size = max(os.path.getsize(path), 1)
+
+    def column_chunks(position, rows):
+        return read_csv(path, usecols=[position], chunksize=settings.STREAMING_CHUNK_ROWS, nrows=rows)
+
+    with open(path, 'rb') as source:
+        # The reader works ahead in blocks, so the file position is an estimate of the rows done
+        chunks = (
+            (chunk, min(source.tell() / file_size, 1.0))
+            for chunk in read_csv(source, chunksize=settings.STREAMING_CHUNK_ROWS)
+        )
+        return _ingest(chunks, column_chunks, store, report, progress)
+
+
+def ingest_excel(path, store, sheet_name=0, report=None, progress=None):
+    """
+    Reads a sheet of an Excel workbook in chunks, infers and converts each chunk, and appends it to a
+    column store, like `ingest_csv`.
+
+    The rows are streamed with openpyxl in read-only mode (see data/excel.py), so memory stays bounded by
+    the chunk size. The column types are inferred from the header and the first chunk, and re-validated
+    on every later chunk; a column whose type changes is re-read from the sheet.
+
+    Parameters:
+    - path (str): The path of the workbook.
+    - store (ColumnStore): The empty store to write the converted columns to.
+    - sheet_name (str or int): The name or position of the sheet. Defaults to the first sheet.
+    - report (dict, optional): Filled as by `ingest_csv`.
+    - progress (function, optional): Called as `progress(column, fraction)` after every chunk, with the
+      share of the rows the sheet declares read so far. Not called if the workbook does not record it.
+
+    Returns:
+    - ColumnStore: The store holding the converted dataset.
+    """
+    chunk_rows = settings.STREAMING_CHUNK_ROWS
+
+    def column_chunks(position, rows):
+        with SheetReader(path, sheet_name) as reader:
+            for chunk in reader.chunks(chunk_rows, usecols=[position], nrows=rows):
+                yield normalise_excel_columns(chunk)
+
+    with SheetReader(path, sheet_name) as reader:
+        def chunks():
+            done = 0
+            for chunk in reader.chunks(chunk_rows):
+                done += len(chunk)
+                yield normalise_excel_columns(chunk), min(done / reader.rows, 1.0) if reader.rows else None
+
+        return _ingest(chunks(), column_chunks, store, report, progress)
+
+
+def _ingest(chunks, column_chunks, store, report, progress):
+    """
+    Infers, converts and stores the chunks of a file, yielded by `chunks` with the share of the file
+    read so far (or None). `column_chunks(position, rows)` reads the first `rows` rows of one column again.
+    """
+    profiles = {}
+    data_types = {}
+    samples = {}
+    rows = 0
+    for chunk, fraction in chunks:
+        chunk = chunk.reset_index(drop=True)
+        if not profiles:
+            profiles = {col: ColumnProfile(settings.STREAMING_DISTINCT_LIMIT) for col in chunk.columns}
+            samples = {col: _sample(chunk[col]) for col in chunk.columns}
+
+        for position, col in enumerate(chunk.columns):
+            with column_stage(col, len(chunk)) as record:
+                profiles[col].update(chunk[col])
+                data_type = profiles[col].data_type
+                if col in data_types and data_type != data_types[col]:
+                    _change_data_type(column_chunks, store, position, col, data_types[col], data_type, rows)
+                data_types[col] = data_type
+                chunk[col] = convert_column(chunk, col, data_type)
+                record['data_type'] = data_type
+
+        with stage('store_write', rows=len(chunk)):
+            store.append(chunk)
+        rows += len(chunk)
+        if progress is not None and fraction is not None:
+            for col in chunk.columns:
+                progress(col, fraction)
+
+    if report is not None:
+        for col, data_type in data_types.items():
+            report[col] = {'data_type': data_type, 'confidence': label_confidence(samples[col], data_type), 'sampled': False}
+    return store
+
+
+def _sample(col):
+    sample_size = getattr(settings, 'INFERENCE_SAMPLE_SIZE', 3000)
+    return pd.concat(stratified_sample(col, sample_size)) if len(col) > sample_size else col
+
+
+def _change_data_type(column_chunks, store, position, col, old_type, new_type, rows):
+    """
+    Brings the parts already stored for a column in line with a new data type.
+
+    Category and Text columns store the same values, so switching between them only changes the
+    recorded dtype. Any other change re-reads the column from the source file, chunk by chunk, and
+    converts it again with `column_chunks`.
+    """
+    if {old_type, new_type} == {'Category', 'Text'}:
+        store.set_dtype(col, 'category' if new_type == 'Category' else 'object')
+        return
+
+    def reconverted():
+        for chunk in column_chunks(position, rows):
+            chunk = chunk.reset_index(drop=True)
+            chunk.columns = [col]
+            yield convert_column(chunk, col, new_type)
+
+    with stage('widen_column', rows=rows, column=col, old_type=old_type, new_type=new_type):
+        store.replace_column(col, reconverted())
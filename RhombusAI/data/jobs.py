@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ProcessingJob
+from .processing import process_dataset
+
+# Minimum number of seconds between two progress writes of the same job
+PROGRESS_SAVE_INTERVAL = 0.5
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def enqueue_dataset(dataset):
+    """
+    Queues the background processing of a saved dataset.
+
+    The job is handed to the local worker pool once the current transaction commits. With JOB_QUEUE_EAGER
+    set, the job runs straight away in the calling thread instead, which keeps tests deterministic. Jobs
+    that are still queued when the server stops can be run with the `process_jobs` management command.
+
+    Parameters:
+    - dataset (Dataset): A saved dataset whose `original_file` holds the uploaded file.
+
+    Returns:
+    - ProcessingJob: The queued job.
+    """
+    job = ProcessingJob.objects.create(dataset=dataset)
+    if getattr(settings, 'JOB_QUEUE_EAGER', False):
+        run_job(job.id)
+        job.refresh_from_db()
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, job.id))
+    return job
+
+
+def run_job(job_id):
+    """
+    Claims a queued job and processes its dataset, recording progress and the outcome on the job.
+
+    A job is claimed with a conditional update, so when several workers pick up the same job only
+    one of them runs it.
+
+    Parameters:
+    - job_id (int): The id of the job to run.
+
+    Returns:
+    - bool: True if this call claimed and ran the job, False if it was not queued.
+    """
+    claimed = ProcessingJob.objects.filter(id=job_id, status=ProcessingJob.QUEUED).update(
+        status=ProcessingJob.RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = ProcessingJob.objects.select_related('dataset').get(id=job_id)
+    tracker = _ProgressTracker(job)
+    try:
+        process_dataset(job.dataset, progress=tracker)
+    except Exception as e:
+        logger.exception("Processing job %s failed", job_id)
+        job.status = ProcessingJob.FAILED
+        job.error = str(e)
+    else:
+        job.status = ProcessingJob.SUCCEEDED
+        job.column_progress = {col: 1.0 for col in job.column_progress}
+        job.progress = 1.0
+    job.finished_at = timezone.now()
+    job.save()
+    return True
+
+
+def run_queued_jobs():
+    """
+    Runs every queued job in the calling thread, oldest first.
+
+    Returns:
+    - int: The number of jobs run.
+    """
+    count = 0
+    for job_id in ProcessingJob.objects.filter(status=ProcessingJob.QUEUED).order_by('created_at').values_list('id', flat=True):
+        count += run_job(job_id)
+    return count
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix='processing-job')
+        return _executor
+
+
+def _run_in_worker(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        # Worker threads open their own database connection, which Django does not close for them
+        connection.close()
+
+
+class _ProgressTracker:
+    """
+    Collects per-column progress reported during processing and writes it to the job at most every
+    PROGRESS_SAVE_INTERVAL seconds.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.saved_at = 0.0
+
+    def __call__(self, column, fraction):
+        self.job.column_progress[str(column)] = round(fraction, 4)
+        now = time.monotonic()
+        if now - self.saved_at >= PROGRESS_SAVE_INTERVAL:
+            self.saved_at = now
+            values = self.job.column_progress.values()
+            self.job.progress = round(sum(values) / len(values), 4)
+            self.job.save(update_fields=['progress', 'column_progress'])
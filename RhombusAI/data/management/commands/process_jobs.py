@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand
+from data.jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs the queued dataset processing jobs, e.g. jobs left queued when the server stopped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll', type=float, default=None,
+                            help='Keep running, checking for new jobs every POLL seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_queued_jobs()
+            if count:
+                self.stdout.write(f'Ran {count} job(s).')
+            if options['poll'] is None:
+                break
+            time.sleep(options['poll'])
@@ -0,0 +1,254 @@
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+RATE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+MEMORY_BUCKETS = (0, 1 << 20, 4 << 20, 16 << 20, 64 << 20, 256 << 20, 1 << 30, 4 << 30)
+
+
+class Histogram:
+    """
+    A labelled histogram rendered in the Prometheus text format.
+
+    Parameters:
+    - name (str): The metric name.
+    - documentation (str): The HELP text.
+    - label_names (tuple): The names of the labels every observation carries.
+    - buckets (tuple): The upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key))
+            prefix = f'{labels},' if labels else ''
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {_format(total)}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """
+    A labelled counter rendered in the Prometheus text format.
+    """
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, value in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key))
+            lines.append(f'{self.name}{{{labels}}} {_format(value)}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+STAGE_SECONDS = Histogram(
+    'data_stage_duration_seconds', 'Time spent in each stage of the processing pipeline.', ['stage'], DURATION_BUCKETS,
+)
+STAGE_ROWS_PER_SECOND = Histogram(
+    'data_stage_rows_per_second', 'Rows handled per second by each stage of the processing pipeline.', ['stage'], RATE_BUCKETS,
+)
+STAGE_MEMORY_BYTES = Histogram(
+    'data_stage_memory_growth_bytes', 'Growth of the resident set size during each stage.', ['stage'], MEMORY_BUCKETS,
+)
+STAGE_ROWS = Counter('data_stage_rows_total', 'Rows handled by each stage of the processing pipeline.', ['stage'])
+STAGE_ERRORS = Counter('data_stage_errors_total', 'Stages that raised an exception.', ['stage'])
+COLUMN_SECONDS = Histogram(
+    'data_column_inference_duration_seconds', 'Time spent inferring and converting one column, by inferred type.',
+    ['data_type'], DURATION_BUCKETS,
+)
+COLUMN_ROWS_PER_SECOND = Histogram(
+    'data_column_inference_rows_per_second', 'Rows inferred and converted per second for one column, by inferred type.',
+    ['data_type'], RATE_BUCKETS,
+)
+COLUMN_CACHE_REQUESTS = Counter(
+    'data_column_cache_requests_total', 'Column reads answered from the in-process column cache (hit) or from disk (miss).', ['result'],
+)
+
+REGISTRY = [
+    STAGE_SECONDS, STAGE_ROWS_PER_SECOND, STAGE_MEMORY_BYTES, STAGE_ROWS, STAGE_ERRORS, COLUMN_SECONDS, COLUMN_ROWS_PER_SECOND,
+    COLUMN_CACHE_REQUESTS,
+]
+
+
+@contextmanager
+def stage(name, rows=None, **fields):
+    """
+    Times a stage of the processing pipeline and records its duration, throughput and memory growth.
+
+    The measurements are added to the stage histograms served by the metrics endpoint and logged as
+    one structured record on the 'data.metrics' logger, with the values under `extra['metrics']`.
+    The row count may also be filled in inside the block, once it is known.
+
+    Usage:
+        with stage('read_csv') as record:
+            df = pd.read_csv(path)
+            record['rows'] = len(df)
+
+    Parameters:
+    - name (str): The stage name, used as the 'stage' label.
+    - rows (int, optional): The number of rows the stage handles.
+    - **fields: Extra values to include in the log record, e.g. the dataset id.
+
+    Yields:
+    - dict: The record that will be logged.
+    """
+    record = {'stage': name, 'rows': rows, **fields}
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record['error'] = str(e)
+        STAGE_ERRORS.inc(stage=name)
+        raise
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 6)
+        rss_after = rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            record['rss_bytes'] = rss_after
+            record['rss_growth_bytes'] = rss_after - rss_before
+        if 'error' not in record:
+            _observe_stage(record)
+        _log(logging.WARNING if 'error' in record else logging.INFO, record)
+
+
+@contextmanager
+def column_stage(column, rows):
+    """
+    Times the inference and conversion of one column. The inferred type must be stored in the yielded
+    record as 'data_type' before the block ends; it labels the per-type histograms.
+
+    Parameters:
+    - column (str): The column name.
+    - rows (int): The number of rows in the column.
+
+    Yields:
+    - dict: The record that will be logged.
+    """
+    record = {'stage': 'infer_column', 'column': str(column), 'rows': rows, 'data_type': None}
+    start = time.perf_counter()
+    yield record
+    observe_column(record['column'], record['data_type'], rows, time.perf_counter() - start)
+
+
+def observe_column(column, data_type, rows, seconds):
+    """
+    Records the time taken to infer and convert one column, e.g. when it was measured in a worker process.
+    """
+    COLUMN_SECONDS.observe(seconds, data_type=data_type)
+    if seconds > 0:
+        COLUMN_ROWS_PER_SECOND.observe(rows / seconds, data_type=data_type)
+    _log(logging.DEBUG, {'stage': 'infer_column', 'column': str(column), 'rows': rows, 'data_type': data_type, 'seconds': round(seconds, 6)})
+
+
+def render():
+    """
+    Renders every metric in the Prometheus text exposition format.
+
+    Metrics are kept per process, so each server worker process reports its own.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """
+    Clears every metric. Used by the tests.
+    """
+    for metric in REGISTRY:
+        metric.clear()
+
+
+def rss_bytes():
+    """
+    Returns the current resident set size of the process, or its peak on platforms without /proc.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (AttributeError, ValueError):
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _observe_stage(record):
+    name, rows, seconds = record['stage'], record['rows'], record['seconds']
+    STAGE_SECONDS.observe(seconds, stage=name)
+    if 'rss_growth_bytes' in record:
+        STAGE_MEMORY_BYTES.observe(max(record['rss_growth_bytes'], 0), stage=name)
+    if rows is not None:
+        STAGE_ROWS.inc(rows, stage=name)
+        if seconds > 0:
+            STAGE_ROWS_PER_SECOND.observe(rows / seconds, stage=name)
+
+
+def _log(level, record):
+    if logger.isEnabledFor(level):
+        message = ' '.join(f'{key}={value}' for key, value in record.items() if value is not None)
+        logger.log(level, message, extra={'metrics': record})
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0003_dataset_processed_file_pkl'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='columntype',
+            name='confidence',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='columntype',
+            name='sampled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
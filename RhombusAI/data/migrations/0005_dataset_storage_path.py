@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0004_columntype_confidence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='storage_path',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,121 @@
+import json
+import os
+import pickle
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from django.conf import settings
+from django.db import migrations
+
+# The column store layout this migration writes and reads: a directory per dataset under
+# PROCESSED_DATA_ROOT holding a JSON manifest and one directory of Arrow IPC part files per column. It
+# is copied here rather than imported from data.storage, so later changes to the store do not change
+# what this migration does.
+MANIFEST_NAME = 'manifest.json'
+
+
+def _series_to_arrow(series):
+    if pd.api.types.is_complex_dtype(series.dtype):
+        values = series.to_numpy()
+        return pa.StructArray.from_arrays([pa.array(values.real), pa.array(values.imag)], names=['real', 'imag'])
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return _series_to_arrow(series.astype(object))
+    if pd.api.types.is_object_dtype(series.dtype):
+        try:
+            values = pa.array(series, from_pandas=True)
+            if pa.types.is_string(values.type) or pa.types.is_null(values.type):
+                return values.cast(pa.string())
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+        strings = series.map(lambda value: value if isinstance(value, str) else str(value), na_action='ignore')
+        return pa.array(strings, type=pa.string(), from_pandas=True)
+    return pa.array(series, from_pandas=True)
+
+
+def write_store(df):
+    """
+    Writes a DataFrame to a new column store, one part file per column, and returns the store's key.
+    """
+    key = uuid.uuid4().hex
+    path = os.path.join(str(settings.PROCESSED_DATA_ROOT), key)
+    columns = []
+    for position, name in enumerate(df.columns):
+        directory = f'c{position:04d}'
+        os.makedirs(os.path.join(path, directory))
+        table = pa.table({'values': _series_to_arrow(df[name])})
+        with pa.OSFile(os.path.join(path, directory, 'part-00000.arrow'), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        columns.append({'name': name, 'directory': directory, 'dtype': str(df[name].dtype), 'parts': ['part-00000.arrow']})
+    with open(os.path.join(path, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump({'row_count': len(df), 'columns': columns}, manifest_file)
+    return key
+
+
+def read_store(key):
+    """
+    Reads every column of a column store back into a DataFrame with the recorded dtypes.
+    """
+    path = os.path.join(str(settings.PROCESSED_DATA_ROOT), key)
+    with open(os.path.join(path, MANIFEST_NAME)) as manifest_file:
+        manifest = json.load(manifest_file)
+    data = {}
+    for column in manifest['columns']:
+        arrays = []
+        for part in column['parts']:
+            with pa.memory_map(os.path.join(path, column['directory'], part)) as source:
+                arrays.extend(pa.ipc.open_file(source).read_all().column(0).chunks)
+        dtype = column['dtype']
+        if dtype.startswith('complex'):
+            real = np.concatenate([array.field('real').to_numpy(zero_copy_only=False) for array in arrays] or [[]])
+            imag = np.concatenate([array.field('imag').to_numpy(zero_copy_only=False) for array in arrays] or [[]])
+            series = pd.Series(real + 1j * imag, dtype=dtype)
+        elif arrays:
+            series = pa.chunked_array(arrays).to_pandas()
+            series = series.astype(object if dtype == 'object' else dtype)
+        else:
+            series = pd.Series([], dtype=object if dtype == 'category' else dtype)
+        data[column['name']] = series
+    return pd.DataFrame(data, columns=[column['name'] for column in manifest['columns']])
+
+
+def pickles_to_column_stores(apps, schema_editor):
+    """
+    Writes the pickled DataFrame of every dataset to a column store and clears the blob.
+
+    Blobs that cannot be unpickled are dropped, leaving the dataset without processed data.
+    """
+    Dataset = apps.get_model('data', 'Dataset')
+    for dataset in Dataset.objects.exclude(processed_file_pkl=None).iterator():
+        try:
+            processed_df = pickle.loads(dataset.processed_file_pkl)
+        except Exception:
+            processed_df = None
+        if processed_df is not None:
+            dataset.storage_path = write_store(processed_df)
+        dataset.processed_file_pkl = None
+        dataset.save(update_fields=['storage_path', 'processed_file_pkl'])
+
+
+def column_stores_to_pickles(apps, schema_editor):
+    Dataset = apps.get_model('data', 'Dataset')
+    for dataset in Dataset.objects.exclude(storage_path=None).iterator():
+        dataset.processed_file_pkl = pickle.dumps(read_store(dataset.storage_path))
+        key, dataset.storage_path = dataset.storage_path, None
+        dataset.save(update_fields=['storage_path', 'processed_file_pkl'])
+        shutil.rmtree(os.path.join(str(settings.PROCESSED_DATA_ROOT), key), ignore_errors=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0005_dataset_storage_path'),
+    ]
+
+    # The pickle column itself is removed by a later migration, once every dataset has been converted
+    operations = [
+        migrations.RunPython(pickles_to_column_stores, column_stores_to_pickles),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0007_processingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=128, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProcessedUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=128)),
+                ('inference_fingerprint', models.CharField(max_length=64)),
+                ('original_file', models.CharField(max_length=255)),
+                ('storage_path', models.CharField(max_length=255)),
+                ('size_bytes', models.BigIntegerField(default=0)),
+                ('columns', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('hits', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('content_hash', 'inference_fingerprint')},
+            },
+        ),
+    ]
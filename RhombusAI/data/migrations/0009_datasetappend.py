@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0008_processedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetAppend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('file', models.FileField(upload_to='datasets/appends/')),
+                ('rows', models.IntegerField(default=0)),
+                ('appended_at', models.DateTimeField(auto_now_add=True)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='appends', to='data.dataset')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0009_datasetappend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='columntype',
+            name='memory_bytes',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='columntype',
+            name='original_memory_bytes',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
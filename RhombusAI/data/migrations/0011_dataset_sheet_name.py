@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0010_columntype_memory_bytes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='sheet_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
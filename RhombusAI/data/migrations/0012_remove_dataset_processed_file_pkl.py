@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0011_dataset_sheet_name'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='dataset',
+            name='processed_file_pkl',
+        ),
+    ]
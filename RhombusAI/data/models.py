@@ -10,6 +10,11 @@ class Dataset(models.Model):
     - processed_at (DateTimeField): The date and time when the dataset was processed. Optional and can be blank.
     - original_file (FileField): A file field that stores the uploaded dataset file. Files are uploaded to the 'datasets/' directory.
     - processed_data (TextField): Field to store the processed data as a JSON string.
+    - storage_path (CharField): The directory under PROCESSED_DATA_ROOT holding the processed columns (see data/storage.py).
+      Datasets uploaded from identical files share one directory until one of them is modified (see data/dedup.py).
+    - content_hash (CharField): The BLAKE2b digest of the uploaded file. This field can be blank.
+    - sheet_name (CharField): The worksheet of an Excel workbook the dataset was read from. Blank for CSV files and
+      for the first sheet of a workbook uploaded without choosing one.
 
     Methods:
     - __str__(self): Returns a human-readable string representation of the model, which is the file name of the uploaded dataset.
@@ -19,7 +24,9 @@ class Dataset(models.Model):
     processed_at = models.DateTimeField(null=True, blank=True)
     original_file = models.FileField(upload_to='datasets/')
     processed_data = models.TextField(blank=True, null=True)  # New field to store processed data
-    processed_file_pkl = models.BinaryField(null=True, blank=True)
+    storage_path = models.CharField(max_length=255, blank=True, null=True)
+    content_hash = models.CharField(max_length=128, blank=True, null=True, db_index=True)
+    sheet_name = models.CharField(max_length=255, blank=True, null=True)
 
     def str(self):
         return self.file_name
@@ -33,8 +40,13 @@ class ColumnType(models.Model):
       This establishes a many-to-one relationship where a dataset can have many column types.
     - column_name (CharField): The name of the column.
     - original_type (CharField): The original data type of the column as detected by the system.
-    - inferred_type (CharField): The data type of the column after being inferred/processed by the system.
+    - inferred_type (CharField): The data type of the column after being inferred/processed by the system. The column
+      store may hold the values in a smaller dtype (see data/compaction.py).
     - user_modified_type (CharField): The data type of the column after a user has optionally modified it. This field can be blank.
+    - confidence (FloatField): The share of sampled values that support the inferred type, between 0 and 1.
+    - sampled (BooleanField): Whether the inferred type was decided from a sample rather than a full scan of the column.
+    - original_memory_bytes (BigIntegerField): The memory the converted column took before its dtype was compacted, if measured.
+    - memory_bytes (BigIntegerField): The memory the column takes with its compacted dtype, if measured.
 
     Methods:
     - __str__(self): Returns a string representation of the model, including the column name, dataset file name, original, and inferred data types.
@@ -44,6 +56,93 @@ class ColumnType(models.Model):
     original_type = models.CharField(max_length=50)
     inferred_type = models.CharField(max_length=50)
     user_modified_type = models.CharField(max_length=50, blank=True, null=True)
+    confidence = models.FloatField(null=True, blank=True)
+    sampled = models.BooleanField(default=False)
+    original_memory_bytes = models.BigIntegerField(null=True, blank=True)
+    memory_bytes = models.BigIntegerField(null=True, blank=True)
 
     def str(self):
-        return f"{self.column_name} in {self.dataset.file_name} - Original: {self.original_type}, Inferred: {self.inferred_type}"
\ No newline at end of file
+        return f"{self.column_name} in {self.dataset.file_name} - Original: {self.original_type}, Inferred: {self.inferred_type}"
+
+class ProcessingJob(models.Model):
+    """
+    Tracks the background processing of an uploaded dataset (see data/jobs.py).
+
+    Jobs are queued in the database and claimed by a worker, so no external message broker is needed.
+
+    Fields:
+    - dataset (ForeignKey): The dataset whose raw file is processed by the job.
+    - status (CharField): One of 'queued', 'running', 'succeeded' or 'failed'.
+    - progress (FloatField): The share of the work done, between 0 and 1.
+    - column_progress (JSONField): The share of the work done for each column, keyed by column name.
+    - error (TextField): The error message of a failed job. This field can be blank.
+    - created_at (DateTimeField): The date and time when the job was queued.
+    - started_at (DateTimeField): The date and time when a worker claimed the job. This field can be blank.
+    - finished_at (DateTimeField): The date and time when the job succeeded or failed. This field can be blank.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    progress = models.FloatField(default=0.0)
+    column_progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+
+class ProcessedUpload(models.Model):
+    """
+    Caches the result of processing an uploaded file, so an identical upload can reuse it (see data/dedup.py).
+
+    Fields:
+    - content_hash (CharField): The BLAKE2b digest of the uploaded file.
+    - inference_fingerprint (CharField): A digest of the settings the file was processed with. An entry is
+      only reused while the settings produce the same fingerprint.
+    - original_file (CharField): The stored name of the raw file, shared by every dataset uploaded from it.
+    - storage_path (CharField): The column store holding the processed file, shared by every dataset uploaded
+      from it until that dataset is modified.
+    - size_bytes (BigIntegerField): The space taken by the column store on disk.
+    - columns (JSONField): The inferred 'dtype', 'confidence' and 'sampled' flag of each column, in order.
+    - created_at (DateTimeField): The date and time when the entry was created.
+    - last_accessed_at (DateTimeField): The date and time when the entry was last created or reused.
+    - hits (IntegerField): The number of uploads that reused the entry.
+    """
+    content_hash = models.CharField(max_length=128)
+    inference_fingerprint = models.CharField(max_length=64)
+    original_file = models.CharField(max_length=255)
+    storage_path = models.CharField(max_length=255)
+    size_bytes = models.BigIntegerField(default=0)
+    columns = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    hits = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [('content_hash', 'inference_fingerprint')]
+
+
+class DatasetAppend(models.Model):
+    """
+    Records a file of rows appended to a processed dataset (see data/appending.py).
+
+    The raw file is kept so that a column can be converted again from its source values when a later
+    append widens its type.
+
+    Fields:
+    - dataset (ForeignKey): The dataset the rows were appended to.
+    - file_name (CharField): The name of the uploaded file.
+    - file (FileField): The uploaded file. Files are uploaded to the 'datasets/appends/' directory.
+    - rows (IntegerField): The number of rows appended from the file.
+    - appended_at (DateTimeField): The date and time when the rows were appended.
+    """
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='appends')
+    file_name = models.CharField(max_length=255)
+    file = models.FileField(upload_to='datasets/appends/')
+    rows = models.IntegerField(default=0)
+    appended_at = models.DateTimeField(auto_now_add=True)
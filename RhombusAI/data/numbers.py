@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from .backend import arrow_strings
+from .encoding import map_unique
+from .typechecks import COMPLEX_RE, COMPLEX_SUFFIX, looks_like_number
+
+# An amount of the form 'EUR 40.00', read by `looks_like_currency`: a three-letter code, a space, a number
+CURRENCY_CODE_LENGTH = 3
+CURRENCY_PREFIX_PATTERN = r'^[a-zA-Z]{3} '
+# A plain number once thousands separators, the percent sign or the currency code are removed
+PLAIN_NUMBER_PATTERN = r'^-?\d+(?:\.\d+)?$'
+# Number of leading values whose distinct count decides whether a column is parsed by distinct value
+DISTINCT_SAMPLE_SIZE = 10000
+
+
+def parse_numbers(col):
+    """
+    Parses a column of numbers written as text, such as '1,000', '12.5%' or 'EUR 40.00', in one pass of
+    Arrow compute kernels over the whole column.
+
+    Thousands separators and surrounding spaces are removed, a trailing percent sign divides the number
+    by 100 and a leading currency code is split off, then every value is cast to a float at once. The
+    few values that do not read as plain numbers after that (e.g. '1e5', or digits of other scripts) are
+    converted one distinct value at a time as `pd.to_numeric` would read them, and become NaN when they
+    are not numbers. Values that are not strings are kept as they are.
+
+    Parameters:
+    - col (pd.Series): The column to parse.
+
+    Returns:
+    - tuple: The parsed column, with the index and name of `col`, and the upper-cased currency code of
+      each value as a categorical Series (missing where a value has no code), or None when no value has
+      one.
+
+    Raises:
+    - ValueError: If the column holds complex numbers.
+    """
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return _parse_categories(col)
+    if not (pd.api.types.is_object_dtype(col.dtype) or pd.api.types.is_string_dtype(col.dtype)):
+        return pd.to_numeric(col, errors='coerce'), None
+
+    is_string = _string_mask(col)
+    only_strings = is_string is None
+    strings = arrow_strings(col if only_strings else col[is_string])
+    cleaned = pc.utf8_trim_whitespace(pc.replace_substring(strings, ',', ''))
+    plain = _plain_numbers(cleaned)
+    if pc.all(plain).as_py() is not False:
+        # Most columns hold plain numbers, which need no more than one cast
+        numbers, currencies = _to_numpy(pc.cast(cleaned, pa.float64())), None
+    else:
+        numbers, codes = _parse_formatted(strings, cleaned, plain)
+        currencies = _currency_column(col, codes, is_string) if codes is not None else None
+
+    if only_strings:
+        return pd.Series(numbers, index=col.index, name=col.name), currencies
+    values = col.to_numpy(dtype=object, copy=True)
+    values[is_string] = numbers
+    return pd.to_numeric(pd.Series(values, index=col.index, name=col.name), errors='coerce'), currencies
+
+
+def _parse_formatted(strings, cleaned, plain=None):
+    # Columns repeating a few values, e.g. rates or prices, are parsed once per distinct value
+    sample = cleaned.slice(0, DISTINCT_SAMPLE_SIZE)
+    if len(cleaned) > len(sample) and pc.count_distinct(sample).as_py() <= len(sample) // 2:
+        encoded = pc.dictionary_encode(strings)
+        dictionary = encoded.dictionary
+        cleaned = pc.utf8_trim_whitespace(pc.replace_substring(dictionary, ',', ''))
+        numbers, codes = _parse_formatted(dictionary, cleaned)
+        # Missing values have index -1, which takes the value appended last
+        indices = _to_numpy(pc.fill_null(encoded.indices, -1))
+        numbers = np.append(numbers, np.nan)[indices]
+        if codes is not None:
+            codes = (np.append(codes[0], -1)[indices], codes[1])
+        return numbers, codes
+
+    # Only values ending in 'j' can be complex numbers, so `is_complex` runs on those alone
+    maybe_complex = pc.filter(strings, pc.fill_null(pc.ends_with(cleaned, COMPLEX_SUFFIX), False))
+    if any(COMPLEX_RE.fullmatch(value.strip().replace(' ', '')) for value in maybe_complex.to_pylist()):
+        raise ValueError('The column contains complex numbers.')
+
+    percent = pc.fill_null(pc.ends_with(cleaned, '%'), False)
+    currency = pc.fill_null(pc.match_substring_regex(cleaned, CURRENCY_PREFIX_PATTERN), False)
+    text = cleaned
+    if pc.any(currency).as_py():
+        text = pc.if_else(currency, pc.utf8_slice_codeunits(cleaned, CURRENCY_CODE_LENGTH + 1), text)
+        plain = None
+    if pc.any(percent).as_py():
+        # Every percent sign around the number goes, as `str.strip('%')` removes them
+        text = pc.if_else(percent, pc.utf8_trim(text, '%'), text)
+        plain = None
+
+    numbers = _cast_numbers(text, plain)
+    numbers[_to_numpy(percent)] /= 100
+    codes = None
+    if pc.any(currency).as_py():
+        codes = _currency_codes(cleaned, currency)
+        # A value with both a code and a percent sign is not a number, as in `looks_like_currency`
+        numbers[_to_numpy(pc.and_(percent, currency))] = np.nan
+    return numbers, codes
+
+
+def _currency_codes(cleaned, currency):
+    # Codes are encoded before they are upper-cased, so only the distinct codes are
+    is_currency = _to_numpy(currency)
+    code = pc.utf8_slice_codeunits(pc.filter(cleaned, currency), 0, CURRENCY_CODE_LENGTH)
+    encoded = pc.dictionary_encode(code)
+    remap, categories = pd.factorize(pd.Series(encoded.dictionary.to_pylist(), dtype=object).str.upper())
+    indices = np.full(len(cleaned), -1)
+    indices[is_currency] = remap[_to_numpy(encoded.indices)]
+    return indices, categories.tolist()
+
+
+def _currency_column(col, codes, is_string):
+    # The codes are the category codes of the strings (-1 for none) and the currency codes they stand for
+    indices, categories = codes
+    if is_string is not None:
+        indices, strings = np.full(len(col), -1), indices
+        indices[is_string] = strings
+    return pd.Series(pd.Categorical.from_codes(indices, categories), index=col.index, name=col.name)
+
+
+def _string_mask(col):
+    # None when every value is a string or missing, else a mask of the strings
+    if pd.api.types.is_string_dtype(col.dtype) and not pd.api.types.is_object_dtype(col.dtype):
+        return None
+    if pd.api.types.infer_dtype(col, skipna=True) in ('string', 'empty'):
+        return None
+    return np.array([isinstance(value, str) for value in col], dtype=bool)
+
+
+def _parse_categories(col):
+    # Each category is parsed once and the results are taken by the codes; code -1 (missing) takes the
+    # value appended last
+    numbers, currencies = parse_numbers(pd.Series(col.cat.categories, dtype=object))
+    codes = col.cat.codes.to_numpy()
+    values = np.append(numbers.to_numpy(dtype=float), np.nan)[codes]
+    if currencies is not None:
+        currencies = np.append(currencies.to_numpy(dtype=object), None)[codes]
+        currencies = pd.Series(currencies, index=col.index, name=col.name).astype('category')
+    return pd.Series(values, index=col.index, name=col.name), currencies
+
+
+def _plain_numbers(text):
+    # Missing values count as plain numbers, as they cast to NaN
+    return pc.fill_null(pc.match_substring_regex(text, PLAIN_NUMBER_PATTERN), True)
+
+
+def _cast_numbers(text, plain=None):
+    # One cast for the values that are plain numbers; a cast fails as a whole, so the others are left out
+    if plain is None:
+        plain = _plain_numbers(text)
+    numbers = _to_numpy(pc.cast(pc.if_else(plain, text, pa.scalar(None, pa.string())), pa.float64()))
+    leftovers = ~_to_numpy(plain)
+    if leftovers.any():
+        # The rest are read as the per-value conversion reads them, so e.g. '1e5' and '١٢' keep their values
+        rest = pd.Series(_to_numpy(text.filter(pc.invert(plain))), dtype=object)
+        rest = map_unique(rest, _to_float)
+        numbers[leftovers] = pd.to_numeric(rest, errors='coerce').astype(float).to_numpy()
+    return numbers
+
+
+def _to_float(value):
+    # Values that look like numbers but still do not cast (e.g. '5 %') are left for the coercion to NaN
+    if looks_like_number(value):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _to_numpy(array):
+    # A writable copy, as Arrow arrays without nulls convert to read-only views
+    return array.to_numpy(zero_copy_only=False).copy()
@@ -0,0 +1,226 @@
+import atexit
+import multiprocessing
+import threading
+import time
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from django.conf import settings
+from .backend import ARROW_STRING_DTYPE
+from .metrics import observe_column
+
+# This module is imported by worker processes before Django is set up, so it must not import
+# models (directly or through utils) at module level.
+
+# The pool shared by every upload of the process, created on first use
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def infer_and_convert_parallel(df, workers, report=None, progress=None):
+    """
+    Infers and converts the columns of a DataFrame across a pool of worker processes.
+
+    Columns go to the process's shared worker pool (see `worker_pool`), so concurrent uploads share its
+    workers instead of each starting a pool of their own. Each column is written to a shared memory
+    block as an Arrow IPC stream, which workers read in place, so they receive the raw column buffers
+    instead of a pickled object Series. Columns Arrow cannot represent (e.g. mixed Python types) are
+    pickled instead. At most two columns per worker are in flight at any time to bound the extra
+    memory, and results are written back in the original column order so the output matches the
+    serial path exactly.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame whose columns are to be analyzed and converted.
+    - workers (int): The number of worker processes.
+    - report (dict, optional): If given, filled with the result of `infer_column_type` for each column.
+    - progress (function, optional): Called as `progress(column, 1.0)` as each worker finishes a column.
+
+    Returns:
+    - pd.DataFrame: The same DataFrame with its columns converted to the inferred data types.
+    """
+    from .dedup import FINGERPRINT_SETTINGS
+
+    columns = list(df.columns)
+    # Workers do not share the server's settings object, so the settings that affect results go with each column
+    task_settings = {name: getattr(settings, name) for name in FINGERPRINT_SETTINGS if hasattr(settings, name)}
+    pool = worker_pool(workers)
+    results = {}
+    blocks = {}
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            position = pending.pop(future)
+            _release(blocks.pop(position))
+            converted, inference, seconds = future.result()
+            results[position] = converted, inference
+            # Workers keep no metrics of their own, so their column timings are recorded here
+            observe_column(columns[position], inference['data_type'], len(converted), seconds)
+            if progress is not None:
+                progress(columns[position], 1.0)
+
+    try:
+        for position, col in enumerate(columns):
+            if len(pending) >= workers * 2:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            payload, blocks[position] = _share_column(df[col])
+            pending[pool.submit(_process_column, col, payload, task_settings)] = position
+        collect(wait(pending).done)
+    except BrokenProcessPool:
+        # A worker died; the next upload starts a new pool
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+        wait(pending)
+        for block in blocks.values():
+            _release(block)
+
+    for position, col in enumerate(columns):
+        converted, inference = results[position]
+        converted.index = df.index
+        df[col] = converted
+        if report is not None:
+            report[col] = inference
+    return df
+
+
+def worker_pool(workers):
+    """
+    Returns the process's shared pool of inference workers, starting it on first use.
+
+    Workers are started with the PARALLEL_START_METHOD context ('forkserver' by default, or 'spawn'),
+    never by forking the server process, whose threads and database connections a forked child would
+    inherit in an undefined state. The pool is kept for later uploads, so each upload does not pay for
+    starting the workers and Django in them, and is replaced only if it breaks or the number of workers
+    changes.
+
+    Parameters:
+    - workers (int): The number of worker processes.
+
+    Returns:
+    - ProcessPoolExecutor: The pool.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            method = getattr(settings, 'PARALLEL_START_METHOD', 'forkserver')
+            if method == 'fork' or method not in multiprocessing.get_all_start_methods():
+                method = 'spawn'
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method), initializer=_init_worker,
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Stops the shared worker pool, if one was started.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+        _pool, _pool_workers = None, None
+
+
+atexit.register(shutdown_pool)
+
+
+def _discard_pool(pool):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is pool:
+            _pool, _pool_workers = None, None
+    pool.shutdown(wait=False)
+
+
+def _share_column(series):
+    """
+    Copies a column into a new shared memory block as an Arrow IPC stream.
+
+    Returns:
+    - tuple: The payload to send to the worker and the shared memory block (None if the column was pickled).
+    """
+    null_values = series[series.isna()]
+    null_value = None if len(null_values) and all(value is None for value in null_values) else np.nan
+    try:
+        values = pa.array(series, from_pandas=True)
+    except (pa.ArrowException, TypeError, ValueError):
+        values = None
+    if values is None or (series.dtype == object and not (pa.types.is_string(values.type) or pa.types.is_null(values.type))):
+        # Object columns only travel as Arrow when they hold strings, so other values keep their Python types
+        return ('pickle', series.reset_index(drop=True)), None
+    table = pa.table({'values': values})
+
+    sizer = pa.MockOutputStream()
+    with pa.ipc.new_stream(sizer, table.schema) as writer:
+        writer.write_table(table)
+    size = sizer.size()
+
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    sink.close()
+    return ('arrow', block.name, size, series.dtype, null_value), block
+
+
+def _release(block):
+    if block is not None:
+        block.close()
+        block.unlink()
+
+
+def _read_column(payload, name):
+    if payload[0] == 'pickle':
+        return payload[1].rename(name)
+
+    _, block_name, size, dtype, null_value = payload
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        series = _read_stream(block, size, dtype).rename(name)
+    finally:
+        block.close()
+    if dtype == object:
+        # Arrow hands nulls back as None; restore the null marker the column was read with
+        series = series.astype(object).where(series.notna(), null_value)
+    return series
+
+
+def _read_stream(block, size, dtype):
+    # The stream is read in place from the shared memory; the pandas values are built from it, and no
+    # Arrow object referencing the block outlives this call, so the block can be closed afterwards
+    with pa.ipc.open_stream(pa.py_buffer(block.buf)[:size]) as reader:
+        values = reader.read_all().column('values')
+    if dtype == ARROW_STRING_DTYPE:
+        # Arrow-backed strings would keep pointing into the block, so they are copied out of it as
+        # Arrow strings rather than turned into Python objects
+        values = pa.chunked_array([pa.concat_arrays(values.chunks or [pa.array([], values.type)])])
+        return values.to_pandas(types_mapper={values.type: dtype}.get)
+    return values.to_pandas()
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _process_column(name, payload, task_settings):
+    from .utils import infer_column_type, convert_column
+
+    for setting, value in task_settings.items():
+        setattr(settings, setting, value)
+    start = time.perf_counter()
+    df = _read_column(payload, name).to_frame()
+    inference = infer_column_type(df[name])
+    return convert_column(df, name, inference['data_type']), inference, time.perf_counter() - start
@@ -0,0 +1,149 @@
+import os
+from django.conf import settings
+from django.utils import timezone
+from .storage import ColumnStore
+from .ingestion import ingest_csv, ingest_excel
+from .backend import read_csv, read_excel
+from .excel import excel_engine
+from .metrics import stage
+from .compaction import compact_dtypes, compact_store
+from .dedup import remember_processed_upload
+from .utils import infer_and_convert_data_types, get_user_friendly_dtype, serialise_dataframe
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx')
+
+
+def is_supported_file(file_name):
+    return str(file_name).lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def read_file(path, sheet_name=None, **kwargs):
+    """
+    Reads a CSV file or Excel workbook into a DataFrame, passing any keyword arguments to the reader.
+    The DataFrame backend is selected with READ_DTYPE_BACKEND (see data/backend.py). Workbooks are read
+    from the sheet named `sheet_name`, or their first sheet.
+    """
+    if path.lower().endswith('.csv'):
+        return read_csv(path, **kwargs)
+    return read_excel(path, sheet_name=sheet_name or 0, **kwargs)
+
+
+def process_dataset(dataset, progress=None):
+    """
+    Infers and converts the raw file of a saved dataset and writes the result to a new column store.
+
+    CSV files of at least STREAMING_UPLOAD_MIN_BYTES, and Excel workbooks of at least
+    EXCEL_STREAMING_MIN_BYTES read with openpyxl, are ingested chunk by chunk; smaller files are read
+    into memory and converted in one pass. Workbooks are read from the dataset's sheet, or their first
+    sheet (see data/excel.py). Either way the converted columns
+    are then compacted to their smallest exact dtypes (see data/compaction.py). The inferred types are
+    recorded as ColumnType rows, the dataset is pointed at the new store and the result is cached for
+    later uploads of the same file (see data/dedup.py). Every stage is timed and recorded in
+    the metrics (see data/metrics.py).
+
+    Parameters:
+    - dataset (Dataset): A saved dataset whose `original_file` holds the uploaded file.
+    - progress (function, optional): Called as `progress(column, fraction)` while each column is processed,
+      with `fraction` between 0 and 1.
+
+    Returns:
+    - ColumnStore: The store holding the converted dataset.
+    """
+    with stage('process_dataset', dataset_id=dataset.id) as record:
+        store = _process_dataset(dataset, progress)
+        record['rows'] = store.row_count
+    return store
+
+
+def _process_dataset(dataset, progress):
+    path = dataset.original_file.path
+    inference_report = {}
+    memory_report = {}
+    store = ColumnStore.create()
+    try:
+        if _streams(path):
+            if path.lower().endswith('.csv'):
+                with stage('ingest_csv', dataset_id=dataset.id) as record:
+                    ingest_csv(path, store, report=inference_report, progress=progress)
+                    record['rows'] = store.row_count
+            else:
+                with stage('ingest_excel', dataset_id=dataset.id, sheet=dataset.sheet_name) as record:
+                    ingest_excel(path, store, sheet_name=dataset.sheet_name or 0, report=inference_report, progress=progress)
+                    record['rows'] = store.row_count
+            with stage('compact_dtypes', rows=store.row_count, dataset_id=dataset.id):
+                compact_store(store, report=memory_report)
+        else:
+            with stage('read_file', dataset_id=dataset.id) as record:
+                df = read_file(path, sheet_name=dataset.sheet_name)
+                record['rows'] = len(df)
+            if progress is not None:
+                for col in df.columns:
+                    progress(col, 0.0)
+            with stage('infer_and_convert', rows=len(df), columns=len(df.columns), dataset_id=dataset.id):
+                processed_df = infer_and_convert_data_types(df, report=inference_report, progress=progress)
+            with stage('compact_dtypes', rows=len(processed_df), dataset_id=dataset.id):
+                processed_df = compact_dtypes(processed_df, report=memory_report)
+            with stage('store_write', rows=len(processed_df), dataset_id=dataset.id):
+                store.append(processed_df)
+    except Exception:
+        store.delete()
+        raise
+
+    with stage('save_column_types', columns=len(store.dtypes), dataset_id=dataset.id):
+        for col_name in store.columns:
+            # The types describe the converted values; the store may hold them in a compacted dtype
+            dtype = memory_report[col_name]['original_type']
+            dataset.column_types.create(
+                column_name=col_name, original_type=dtype, inferred_type=dtype, user_modified_type=get_user_friendly_dtype(dtype),
+                confidence=inference_report[col_name]['confidence'], sampled=inference_report[col_name]['sampled'],
+                original_memory_bytes=memory_report[col_name]['original_memory_bytes'], memory_bytes=memory_report[col_name]['memory_bytes'],
+            )
+    dataset.storage_path = store.key
+    dataset.processed_at = timezone.now()
+    dataset.save()
+    remember_processed_upload(dataset, store)
+    return store
+
+
+def _streams(path):
+    if path.lower().endswith('.csv'):
+        return os.path.getsize(path) >= settings.STREAMING_UPLOAD_MIN_BYTES
+    min_bytes = getattr(settings, 'EXCEL_STREAMING_MIN_BYTES', 10 * 1024 * 1024)
+    return excel_engine() == 'openpyxl' and os.path.getsize(path) >= min_bytes
+
+
+def dataset_response(dataset, store=None):
+    """
+    Builds the response describing a processed dataset: its schema and the first page of rows.
+
+    Parameters:
+    - dataset (Dataset): A dataset that has been processed.
+    - store (ColumnStore, optional): The dataset's store, if already open.
+
+    Returns:
+    - dict: The 'dataset_id', 'row_count', 'processed_data' and 'columns_with_types' of the dataset. Each
+      column lists the memory it took before and after its dtype was compacted, when measured.
+    """
+    store = store or ColumnStore(dataset.storage_path)
+    columns_with_types = [
+        {
+            'column': col.column_name,
+            'data_type': col.user_modified_type or col.inferred_type,
+            'confidence': col.confidence,
+            'sampled': col.sampled,
+            'original_memory_bytes': col.original_memory_bytes,
+            'memory_bytes': col.memory_bytes,
+        }
+        for col in dataset.column_types.order_by('id')
+    ]
+    with stage('read_rows', dataset_id=dataset.id) as record:
+        rows = store.read(stop=settings.ROWS_DEFAULT_LIMIT)
+        record['rows'] = len(rows)
+    with stage('serialise', rows=len(rows), dataset_id=dataset.id):
+        processed_data = serialise_dataframe(rows)
+    return {
+        'dataset_id': dataset.id,
+        'row_count': store.row_count,
+        'processed_data': processed_data,
+        'columns_with_types': columns_with_types,
+    }
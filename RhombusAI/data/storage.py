@@ -0,0 +1,363 @@
+import json
+import os
+import shutil
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from django.conf import settings
+from .cache import column_cache
+
+MANIFEST_NAME = 'manifest.json'
+EXTENSION_DTYPES = {'boolean', 'Int8', 'Int16', 'Int32', 'Int64', 'UInt8', 'UInt16', 'UInt32', 'UInt64', 'Float32', 'Float64', 'string'}
+
+
+class ColumnStore:
+    """
+    Stores a processed dataset on disk as one directory of Arrow IPC files per column.
+
+    Every call to `append` adds one part file to each column directory, so data can be written chunk by
+    chunk without holding the whole dataset in memory, and a single column can be replaced without
+    touching the others. A JSON manifest records the column order, the pandas dtype of each column and
+    its part files; parts written with a narrower type (e.g. int64 before a float64 chunk arrived) are
+    cast to the column's type when read. Reads go through memory-mapped files.
+
+    Category columns are stored as their plain values and complex columns as a struct of real and
+    imaginary parts, since Arrow IPC files cannot change dictionaries between parts or hold complex numbers.
+
+    Attributes:
+    - key (str): The directory name of the dataset under PROCESSED_DATA_ROOT.
+    - path (str): The absolute path of the dataset directory.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.path = os.path.join(str(settings.PROCESSED_DATA_ROOT), key)
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as manifest_file:
+                self.manifest = json.load(manifest_file)
+        else:
+            self.manifest = {'row_count': 0, 'columns': []}
+
+    @classmethod
+    def create(cls):
+        """
+        Creates an empty store in a new directory under PROCESSED_DATA_ROOT.
+
+        Returns:
+        - ColumnStore: The new, empty store.
+        """
+        store = cls(uuid.uuid4().hex)
+        os.makedirs(store.path)
+        return store
+
+    @property
+    def columns(self):
+        return [column['name'] for column in self.manifest['columns']]
+
+    @property
+    def row_count(self):
+        return self.manifest['row_count']
+
+    @property
+    def dtypes(self):
+        return {column['name']: column['dtype'] for column in self.manifest['columns']}
+
+    def append(self, df):
+        """
+        Appends the rows of a DataFrame as a new part of every column.
+
+        The first call defines the columns of the store; later calls must have the same columns.
+
+        Parameters:
+        - df (pd.DataFrame): The converted rows to append.
+        """
+        if not self.manifest['columns']:
+            self.manifest['columns'] = [
+                {'name': name, 'directory': f'c{position:04d}', 'dtype': str(df[name].dtype), 'parts': []}
+                for position, name in enumerate(df.columns)
+            ]
+        for column in self.manifest['columns']:
+            series = df[column['name']]
+            column['dtype'] = common_dtype(column['dtype'], str(series.dtype)) if column['parts'] else str(series.dtype)
+            column['parts'].append(self._write_part(column['directory'], len(column['parts']), series))
+        self.manifest['row_count'] += len(df)
+        self.save()
+
+    def replace_column(self, name, chunks, dtype=None):
+        """
+        Replaces the stored values of one column, leaving every other column untouched.
+
+        The new values are written to a fresh directory and swapped in through the manifest, so readers
+        never see a half-written column.
+
+        Parameters:
+        - name (str): The column to replace.
+        - chunks (iterable): One or more pd.Series holding the new values, in row order.
+        - dtype (str, optional): The pandas dtype to record for the column, instead of the dtype of the chunks.
+        """
+        self.replace_columns({name: chunks}, {name: dtype} if dtype else None)
+
+    def replace_columns(self, columns, dtypes=None):
+        """
+        Replaces the stored values of several columns at once, leaving every other column untouched.
+
+        Every new column is written to a fresh directory before the manifest is saved once, so readers see
+        either all of the new columns or none of them. If writing a column fails, the directories written
+        so far are removed and the store is unchanged.
+
+        Parameters:
+        - columns (dict): The new values of each column to replace, as an iterable of pd.Series in row order.
+        - dtypes (dict, optional): The pandas dtype to record for some of the columns, instead of the dtype of their chunks.
+        """
+        dtypes = dtypes or {}
+        replaced = {}
+        try:
+            for name, chunks in columns.items():
+                column = self._column(name)
+                directory = f"{column['directory'].split('-')[0]}-{uuid.uuid4().hex[:8]}"
+                replaced[name] = {'directory': directory, 'parts': [], 'dtype': None}
+                for series in chunks:
+                    chunk_dtype = replaced[name]['dtype']
+                    replaced[name]['dtype'] = common_dtype(chunk_dtype, str(series.dtype)) if chunk_dtype else str(series.dtype)
+                    replaced[name]['parts'].append(self._write_part(directory, len(replaced[name]['parts']), series))
+        except Exception:
+            for new in replaced.values():
+                shutil.rmtree(os.path.join(self.path, new['directory']), ignore_errors=True)
+            raise
+
+        old_directories = []
+        for name, new in replaced.items():
+            column = self._column(name)
+            old_directories.append(column['directory'])
+            column.update(directory=new['directory'], parts=new['parts'], dtype=dtypes.get(name) or new['dtype'] or column['dtype'])
+        self.save()
+        for directory in old_directories:
+            shutil.rmtree(os.path.join(self.path, directory), ignore_errors=True)
+
+    def set_dtype(self, name, dtype):
+        """
+        Records a new pandas dtype for a column whose stored values are unchanged, e.g. 'category' to 'object'.
+        """
+        self._column(name)['dtype'] = dtype
+        self.save()
+
+    def read_column(self, name, start=0, stop=None):
+        """
+        Reads the values of one column, optionally limited to a range of rows.
+
+        Columns are kept in the process's `column_cache` once read, and later reads of any range of the
+        column are served from memory until the column is rewritten. A range read that misses the cache
+        reads the whole column and caches it when its files fit within the cache's byte budget, so the
+        first page of a dataset deserialises each column once and later pages none; larger columns are
+        only read over the requested rows.
+
+        Parameters:
+        - name (str): The column to read.
+        - start (int): The first row to read.
+        - stop (int, optional): The row to stop before. Defaults to the end of the column.
+
+        Returns:
+        - pd.Series: The column values with the column's pandas dtype and a RangeIndex starting at 0.
+        """
+        column = self._column(name)
+        stop = self.row_count if stop is None else min(stop, self.row_count)
+        key = self._cache_key(column)
+        cached = column_cache.get(key)
+        if cached is None:
+            whole = start == 0 and stop == self.row_count
+            if not whole and self._stored_bytes(column) > column_cache.max_bytes:
+                return self._read_rows(column, start, stop)
+            cached = self._read_rows(column, 0, self.row_count)
+            column_cache.put(key, cached)
+        # Callers get a copy they are free to modify
+        return cached.iloc[start:stop].reset_index(drop=True).copy()
+
+    def read(self, columns=None, start=0, stop=None):
+        """
+        Reads several columns into a DataFrame, optionally limited to a range of rows.
+
+        Parameters:
+        - columns (list, optional): The columns to read, in order. Defaults to every column.
+        - start (int): The first row to read.
+        - stop (int, optional): The row to stop before. Defaults to the end of the dataset.
+
+        Returns:
+        - pd.DataFrame: The requested rows and columns.
+        """
+        columns = self.columns if columns is None else columns
+        return pd.DataFrame({name: self.read_column(name, start, stop) for name in columns}, columns=columns)
+
+    @property
+    def size_bytes(self):
+        """
+        The space taken by the store on disk.
+        """
+        return sum(
+            os.path.getsize(os.path.join(directory, name)) for directory, _, names in os.walk(self.path) for name in names
+        )
+
+    def copy(self):
+        """
+        Copies the store to a new directory under PROCESSED_DATA_ROOT.
+
+        Returns:
+        - ColumnStore: The copy.
+        """
+        key = uuid.uuid4().hex
+        shutil.copytree(self.path, os.path.join(str(settings.PROCESSED_DATA_ROOT), key))
+        return ColumnStore(key)
+
+    def exists(self):
+        return os.path.exists(os.path.join(self.path, MANIFEST_NAME))
+
+    def save(self):
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        with open(manifest_path + '.tmp', 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        column_cache.invalidate(self.key, keep={self._cache_key(column) for column in self.manifest['columns']})
+
+    def delete(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        column_cache.invalidate(self.key)
+
+    def _cache_key(self, column):
+        return (self.key, column['name'], column['directory'], len(column['parts']), column['dtype'])
+
+    def _column(self, name):
+        for column in self.manifest['columns']:
+            if column['name'] == name:
+                return column
+        raise KeyError(f"Column '{name}' does not exist in the dataset.")
+
+    def _read_rows(self, column, start, stop):
+        arrays = []
+        offset = 0
+        for part in column['parts']:
+            if offset >= stop:
+                break
+            with pa.memory_map(os.path.join(self.path, column['directory'], part)) as source:
+                values = pa.ipc.open_file(source).read_all().column(0)
+                if offset + len(values) > start:
+                    arrays.append(values.slice(max(start - offset, 0), stop - max(start, offset)))
+                offset += len(values)
+        return arrow_to_series(arrays, column['dtype']).rename(column['name'])
+
+    def _stored_bytes(self, column):
+        directory = os.path.join(self.path, column['directory'])
+        return sum(os.path.getsize(os.path.join(directory, part)) for part in column['parts'])
+
+    def _write_part(self, directory, index, series):
+        os.makedirs(os.path.join(self.path, directory), exist_ok=True)
+        part = f'part-{index:05d}.arrow'
+        values = series_to_arrow(series)
+        table = pa.table({'values': values})
+        with pa.OSFile(os.path.join(self.path, directory, part), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return part
+
+
+def common_dtype(first, second):
+    """
+    Returns the pandas dtype that can hold the values of two parts of the same column.
+
+    Numeric NumPy dtypes are promoted (e.g. int64 and float64 give float64), as are pandas nullable
+    integers, which stay nullable (e.g. Int8 and int32 give Int32); any other mismatch falls back to
+    'object', whose values are read back as strings.
+    """
+    if first == second:
+        return first
+    nullable = any(dtype.startswith(('Int', 'UInt')) for dtype in (first, second))
+    try:
+        first_dtype, second_dtype = (np.dtype(dtype.lower() if dtype.startswith(('Int', 'UInt')) else dtype) for dtype in (first, second))
+    except TypeError:
+        return 'object'
+    if first_dtype.kind in 'biufc' and second_dtype.kind in 'biufc':
+        promoted = np.result_type(first_dtype, second_dtype)
+        return str(promoted).capitalize().replace('Uint', 'UInt') if nullable and promoted.kind in 'iu' else str(promoted)
+    return 'object'
+
+
+def series_to_arrow(series):
+    """
+    Converts a pandas Series into an Arrow array suitable for storing in a column part.
+
+    Parameters:
+    - series (pd.Series): The values to convert.
+
+    Returns:
+    - pa.Array: The Arrow representation of the values.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_complex_dtype(dtype):
+        values = series.to_numpy()
+        return pa.StructArray.from_arrays([pa.array(values.real), pa.array(values.imag)], names=['real', 'imag'])
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series_to_arrow(series.astype(object))
+    if pd.api.types.is_object_dtype(dtype):
+        try:
+            values = pa.array(series, from_pandas=True)
+            if pa.types.is_string(values.type) or pa.types.is_null(values.type):
+                return values.cast(pa.string())
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+        # Mixed Python objects are kept as their string representation
+        strings = series.map(lambda value: value if isinstance(value, str) else str(value), na_action='ignore')
+        return pa.array(strings, type=pa.string(), from_pandas=True)
+    return pa.array(series, from_pandas=True)
+
+
+def arrow_to_series(arrays, dtype):
+    """
+    Converts stored Arrow arrays back into a pandas Series with the column's dtype.
+
+    Parameters:
+    - arrays (list): The Arrow arrays (or chunked arrays) of the column, in row order.
+    - dtype (str): The pandas dtype recorded for the column.
+
+    Returns:
+    - pd.Series: The column values.
+    """
+    if dtype.startswith('complex'):
+        chunks = [chunk for array in arrays for chunk in getattr(array, 'chunks', [array])]
+        real = np.concatenate([chunk.field('real').to_numpy(zero_copy_only=False) for chunk in chunks]) if chunks else np.array([])
+        imag = np.concatenate([chunk.field('imag').to_numpy(zero_copy_only=False) for chunk in chunks]) if chunks else np.array([])
+        return pd.Series(real + 1j * imag, dtype=dtype)
+
+    target = _arrow_type(dtype)
+    chunks = []
+    for array in arrays:
+        for chunk in getattr(array, 'chunks', [array]):
+            chunks.append(chunk if target is None or chunk.type == target else chunk.cast(target))
+    if not chunks:
+        return pd.Series([], dtype=object if dtype == 'category' else dtype)
+
+    if dtype == 'string':
+        # Text compacted to Arrow-backed strings is read without creating a Python object per value
+        return pd.Series(pd.arrays.ArrowStringArray(pa.chunked_array(chunks, type=pa.string())))
+    series = pa.chunked_array(chunks).to_pandas()
+    if dtype == 'category' or dtype in EXTENSION_DTYPES:
+        return series.astype(dtype)
+    if dtype == 'object':
+        return series.astype(object)
+    if str(series.dtype) != dtype:
+        return series.astype(dtype)
+    return series
+
+
+def _arrow_type(dtype):
+    if dtype in ('object', 'category', 'string'):
+        return pa.string()
+    if dtype in EXTENSION_DTYPES:
+        # Nullable dtypes are stored as the matching NumPy type with nulls
+        dtype = 'bool' if dtype == 'boolean' else dtype.lower()
+    try:
+        numpy_dtype = np.dtype(dtype)
+    except TypeError:
+        return None
+    if numpy_dtype.kind in 'biuf':
+        return pa.from_numpy_dtype(numpy_dtype)
+    return None
@@ -0,0 +1,129 @@
+import json
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.inference import ColumnProfile, widen_data_type
+from data.models import Dataset
+from data.storage import ColumnStore
+
+import pandas as pd
+
+
+class AppendRowsTestCase(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.root, PROCESSED_DATA_ROOT=f'{self.root}/processed')
+        self.settings_override.enable()
+        content = b'count,amount,city\n1,1.5,Paris\n2,2.5,Rome\n3,3.5,Paris\n4,4.5,Rome\n5,5.5,Paris\n6,6.5,Rome\n'
+        self.upload = self.client.post(reverse('data:file_upload'), {'datafile': self.csv(content, 'base.csv')}).json()
+        self.url = reverse('data:append', args=[self.upload['dataset_id']])
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def csv(self, content, name='append.csv'):
+        return SimpleUploadedFile(name, content, content_type='text/csv')
+
+    def types(self, response):
+        return {col['column']: col['data_type'] for col in response['columns_with_types']}
+
+    def test_append_converts_only_new_rows(self):
+        store = ColumnStore(Dataset.objects.get(id=self.upload['dataset_id']).storage_path)
+        stored_parts = [column['parts'][:] for column in store.manifest['columns']]
+
+        response = self.client.post(self.url, {'datafile': self.csv(b'city,count,amount\nParis,7.5,7.5\nRome,8,8.5\n')})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body['row_count'], body['appended_rows'], body['widened']), (8, 2, {}))
+        self.assertEqual(self.types(body), {'count': 'Decimal', 'amount': 'Decimal', 'city': 'Category'})
+
+        store = ColumnStore(Dataset.objects.get(id=self.upload['dataset_id']).storage_path)
+        self.assertEqual([column['parts'][:-1] for column in store.manifest['columns']], stored_parts)
+        self.assertEqual(store.read_column('count').tolist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.5, 8.0])
+
+    def test_append_widens_types(self):
+        new_rows = b'count,amount,city\n7,unknown amount,Oslo\n8,,Lima\n9,9.5,Kyiv\n10,10.5,Baku\n11,11.5,Doha\n12,12.5,Riga\n'
+        body = self.client.post(self.url, {'datafile': self.csv(new_rows)}).json()
+        self.assertEqual(body['widened'], {'amount': {'from': 'Decimal', 'to': 'Text'}, 'city': {'from': 'Category', 'to': 'Text'}})
+        self.assertEqual(self.types(body), {'count': 'Integer', 'amount': 'Text', 'city': 'Text'})
+
+        store = ColumnStore(Dataset.objects.get(id=self.upload['dataset_id']).storage_path)
+        self.assertEqual(store.read_column('amount').tolist()[:2], ['1.5', '2.5'])
+        self.assertEqual(store.read_column('amount').tolist()[6:8], ['unknown amount', None])
+        self.assertEqual(store.read_column('city').tolist()[-1], 'Riga')
+
+    def override(self, dataset_id, column, new_type):
+        data = json.dumps({'column': column, 'new_type': new_type})
+        response = self.client.post(reverse('data:dataset_override', args=[dataset_id]), data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_append_keeps_a_type_the_user_chose(self):
+        self.override(self.upload['dataset_id'], 'amount', 'Text')
+        body = self.client.post(self.url, {'datafile': self.csv(b'count,amount,city\n7,2021-01-01,Paris\n8,2021-02-01,Rome\n')}).json()
+        self.assertEqual(body['widened'], {})
+        self.assertEqual(self.types(body)['amount'], 'Text')
+        store = ColumnStore(Dataset.objects.get(id=self.upload['dataset_id']).storage_path)
+        self.assertEqual(store.read_column('amount').tolist()[5:], ['6.5', '2021-01-01', '2021-02-01'])
+
+        # A later append still sees the user's type
+        body = self.client.post(self.url, {'datafile': self.csv(b'count,amount,city\n9,2021-03-01,Paris\n')}).json()
+        self.assertEqual((body['widened'], self.types(body)['amount']), ({}, 'Text'))
+
+    def test_append_keeps_a_category_the_user_chose(self):
+        content = b'code,name\n1,a\n2,b\n1,c\n2,d\n1,e\n2,f\n'
+        upload = self.client.post(reverse('data:file_upload'), {'datafile': self.csv(content, 'codes.csv')}).json()
+        self.override(upload['dataset_id'], 'code', 'Category')
+        url = reverse('data:append', args=[upload['dataset_id']])
+        body = self.client.post(url, {'datafile': self.csv(b'code,name\n3.5,g\n4.5,h\n')}).json()
+        self.assertEqual(body['widened'], {})
+        self.assertEqual(self.types(body)['code'], 'Category')
+
+        store = ColumnStore(Dataset.objects.get(id=upload['dataset_id']).storage_path)
+        self.assertEqual(store.dtypes['code'], 'category')
+        self.assertEqual(store.read_column('code').astype(str).tolist(), ['1', '2', '1', '2', '1', '2', '3.5', '4.5'])
+
+    def test_rows_that_do_not_fit_a_chosen_type_are_rejected(self):
+        self.override(self.upload['dataset_id'], 'amount', 'Complex Number')
+        response = self.client.post(self.url, {'datafile': self.csv(b'count,amount,city\n7,unknown,Paris\n')})
+        self.assertEqual(response.status_code, 400)
+        dataset = Dataset.objects.get(id=self.upload['dataset_id'])
+        self.assertEqual((dataset.appends.count(), ColumnStore(dataset.storage_path).row_count), (0, 6))
+
+    def test_append_leaves_shared_store_alone(self):
+        shared_path = Dataset.objects.get(id=self.upload['dataset_id']).storage_path
+        self.client.post(self.url, {'datafile': self.csv(b'count,amount,city\n7,7.5,Paris\n')})
+        self.assertNotEqual(Dataset.objects.get(id=self.upload['dataset_id']).storage_path, shared_path)
+        self.assertEqual(ColumnStore(shared_path).row_count, 6)
+
+    def test_mismatched_columns_are_rejected(self):
+        response = self.client.post(self.url, {'datafile': self.csv(b'count,price\n1,2\n')})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Dataset.objects.get(id=self.upload['dataset_id']).appends.count(), 0)
+
+    def test_widen_data_type(self):
+        self.assertEqual(widen_data_type('Decimal', None), 'Decimal')
+        self.assertEqual(widen_data_type('Decimal', 'Date'), 'Date')
+        self.assertEqual(widen_data_type('Time Duration', 'Complex Number'), 'Complex Number')
+        self.assertEqual(widen_data_type('Text', 'Decimal', self.fail), 'Text')
+
+        def rescan(values):
+            profile = ColumnProfile()
+            profile.update(pd.Series(values))
+            return lambda: profile
+
+        self.assertEqual(widen_data_type('Boolean', 'Decimal', rescan(['0', '1', '2.5'])), 'Decimal')
+        self.assertEqual(widen_data_type('Boolean', 'Decimal', rescan(['yes', 'no', '2.5'])), 'Text')
+
+    def test_append_numbers_to_a_boolean_column(self):
+        content = b'flag\n0\n1\n1\n0\n'
+        upload = self.client.post(reverse('data:file_upload'), {'datafile': self.csv(content, 'flags.csv')}).json()
+        self.assertEqual(self.types(upload), {'flag': 'Boolean'})
+        url = reverse('data:append', args=[upload['dataset_id']])
+        body = self.client.post(url, {'datafile': self.csv(b'flag\n2.5\n1\n')}).json()
+        self.assertEqual(body['widened'], {'flag': {'from': 'Boolean', 'to': 'Decimal'}})
+        store = ColumnStore(Dataset.objects.get(id=upload['dataset_id']).storage_path)
+        self.assertEqual(store.read_column('flag').tolist(), [0.0, 1.0, 1.0, 0.0, 2.5, 1.0])
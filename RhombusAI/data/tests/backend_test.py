@@ -0,0 +1,79 @@
+import io
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.backend import ARROW_STRING_DTYPE, read_csv
+from data.inference import distinct_strings, infer_data_type_vectorised
+from data.models import Dataset
+from data.storage import ColumnStore
+from data.utils import infer_and_convert_data_types
+
+import pandas as pd
+
+CONTENT = (
+    'id,amount,price,flag,when,wait,code,name\n'
+    + ''.join(f'{i},{i}.5,USD {i},{"true" if i % 2 else "false"},2021-01-{i % 28 + 1:02d},{i} days,{i % 3},name {i}\n' for i in range(30))
+    + '30,,NA,,,,,\n'
+)
+
+
+class ArrowBackendTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, UPLOAD_CACHE_ENABLED=False)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def upload(self, backend, content=CONTENT, **settings):
+        file = SimpleUploadedFile('backend_test.csv', content.encode('utf-8'), content_type='text/csv')
+        with override_settings(READ_DTYPE_BACKEND=backend, **settings):
+            return self.client.post(reverse('data:file_upload'), {'datafile': file}).json()
+
+    def test_only_strings_stay_arrow_backed(self):
+        with override_settings(READ_DTYPE_BACKEND='pyarrow'):
+            df = read_csv(io.StringIO('a,b,c,d\n1,1.5,true,x\n,2,,y\n'))
+        self.assertEqual(df.dtypes.tolist(), ['float64', 'float64', 'object', ARROW_STRING_DTYPE])
+        self.assertEqual(df['c'].tolist()[0], True)
+
+    def test_arrow_strings_fall_back_for_other_characters(self):
+        self.assertEqual(distinct_strings(['1', '2'], ARROW_STRING_DTYPE).dtype, ARROW_STRING_DTYPE)
+        self.assertEqual(distinct_strings(['١٢', '3'], ARROW_STRING_DTYPE).dtype, object)
+        self.assertEqual(infer_data_type_vectorised(pd.Series(['١٢', '3'], dtype=ARROW_STRING_DTYPE)), 'Decimal')
+
+    def test_upload_matches_the_numpy_backend(self):
+        expected = self.upload('numpy')
+        body = self.upload('pyarrow')
+        self.assertEqual(body['processed_data'], expected['processed_data'])
+        self.assertEqual(
+            [(column['column'], column['data_type']) for column in body['columns_with_types']],
+            [(column['column'], column['data_type']) for column in expected['columns_with_types']],
+        )
+        store = ColumnStore(Dataset.objects.get(id=body['dataset_id']).storage_path)
+        self.assertEqual(store.dtypes['name'], 'string')
+
+    def test_streaming_upload_matches_the_numpy_backend(self):
+        content = CONTENT + ''.join(f'{i},text,x,true,2021-01-01,1 day,{i},name {i}\n' for i in range(31, 40))
+        expected = self.upload('numpy', content, STREAMING_UPLOAD_MIN_BYTES=0, STREAMING_CHUNK_ROWS=10)
+        body = self.upload('pyarrow', content, STREAMING_UPLOAD_MIN_BYTES=0, STREAMING_CHUNK_ROWS=10)
+        self.assertEqual(body['processed_data'], expected['processed_data'])
+        self.assertEqual(
+            [column['data_type'] for column in body['columns_with_types']],
+            [column['data_type'] for column in expected['columns_with_types']],
+        )
+
+    def test_parallel_path_keeps_arrow_strings(self):
+        results = []
+        for workers in (1, 2):
+            with override_settings(READ_DTYPE_BACKEND='pyarrow', INFERENCE_WORKERS=workers, PARALLEL_MIN_CELLS=0):
+                report = {}
+                results.append((infer_and_convert_data_types(read_csv(io.StringIO(CONTENT)), report=report), report))
+        (serial, serial_report), (parallel, parallel_report) = results
+        pd.testing.assert_frame_equal(parallel, serial)
+        self.assertEqual(parallel_report, serial_report)
+        self.assertEqual(parallel['name'].dtype, ARROW_STRING_DTYPE)
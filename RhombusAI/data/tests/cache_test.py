@@ -0,0 +1,92 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data import metrics
+from data.cache import ColumnCache, column_cache
+from data.models import Dataset
+from data.storage import ColumnStore
+
+import pandas as pd
+
+
+class ColumnCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root)
+        self.settings_override.enable()
+        column_cache.clear()
+        metrics.reset()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+        column_cache.clear()
+
+    def test_lru_is_bounded_by_bytes(self):
+        cache = ColumnCache(max_bytes=2000)
+        series = pd.Series(range(100), dtype='int64')  # 800 bytes
+        cache.put(('store', 'a'), series)
+        cache.put(('store', 'b'), series)
+        cache.get(('store', 'a'))
+        cache.put(('store', 'c'), series)
+
+        self.assertIsNone(cache.get(('store', 'b')))
+        self.assertIsNotNone(cache.get(('store', 'a')))
+        self.assertEqual(cache.size_bytes, 1600)
+        cache.put(('store', 'd'), pd.Series(range(1000)))
+        self.assertIsNone(cache.get(('store', 'd')))
+
+    def test_store_reads_hit_the_cache_until_the_column_is_rewritten(self):
+        store = ColumnStore.create()
+        store.append(pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}))
+        store.read()
+        with mock.patch('data.storage.pa.memory_map', side_effect=AssertionError('read from disk')):
+            page = ColumnStore(store.key).read(start=1, stop=3)
+            page.loc[0, 'a'] = 99
+            pd.testing.assert_frame_equal(store.read(), pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}))
+        self.assertEqual(page['a'].tolist(), [99, 3])
+
+        store.replace_column('a', [pd.Series([4, 5, 6])])
+        self.assertEqual(ColumnStore(store.key).read_column('a').tolist(), [4, 5, 6])
+        store.append(pd.DataFrame({'a': [7], 'b': ['w']}))
+        self.assertEqual(ColumnStore(store.key).read_column('b').tolist(), ['x', 'y', 'z', 'w'])
+        self.assertIn('data_column_cache_requests_total{result="hit"}', metrics.render())
+
+    def test_page_reads_fill_the_cache(self):
+        store = ColumnStore.create()
+        store.append(pd.DataFrame({'a': [1, 2, 3]}))
+        store.append(pd.DataFrame({'a': [4, 5]}))
+        self.assertEqual(ColumnStore(store.key).read_column('a', 1, 3).tolist(), [2, 3])
+        with mock.patch('data.storage.pa.memory_map', side_effect=AssertionError('read from disk')):
+            self.assertEqual(ColumnStore(store.key).read_column('a', 3, 5).tolist(), [4, 5])
+
+        # Columns whose files exceed the budget are only read over the requested rows, and not kept
+        with override_settings(DATASET_CACHE_MAX_BYTES=100):
+            column_cache.clear()
+            self.assertEqual(ColumnStore(store.key).read_column('a', 3, 4).tolist(), [4])
+            self.assertEqual(column_cache.size_bytes, 0)
+
+    def test_overrides_address_a_dataset_by_id(self):
+        with override_settings(UPLOAD_CACHE_ENABLED=False):
+            for name in ('first.csv', 'second.csv'):
+                file = SimpleUploadedFile(name, b'amount,flag\n1.5,yes\n2.5,no\n', content_type='text/csv')
+                self.client.post(reverse('data:file_upload'), {'datafile': file})
+        first, second = Dataset.objects.order_by('id')
+
+        data = json.dumps({'column': 'amount', 'new_type': 'Text'})
+        response = self.client.post(reverse('data:dataset_override', args=[first.id]), data, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['dataset_id'], first.id)
+        self.assertEqual(ColumnStore(first.storage_path).dtypes['amount'], 'object')
+        self.assertEqual(ColumnStore(second.storage_path).dtypes['amount'], 'float32')
+
+        data = json.dumps({'operations': [{'column': 'flag', 'new_type': 'Text'}]})
+        response = self.client.post(reverse('data:dataset_override_batch', args=[first.id]), data, content_type='application/json')
+        self.assertEqual(response.json()['dataset_id'], first.id)
+        response = self.client.post(reverse('data:dataset_override', args=[second.id + 1]), data, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,40 @@
+from django.test import TestCase
+from data.backend import ARROW_STRING_DTYPE
+from data.classifier import TypeHistogram, classify_strings, classify_value
+from data.inference import infer_data_type_legacy
+
+import pandas as pd
+
+VALUES = {
+    ' n/a ': 'none', '1,000': 'number', '-2.5': 'number', '10%': 'percent', 'EUR 4.50': 'currency',
+    '3+4j': 'complex', '1 + 2j': 'complex', '3 Days': 'timedelta', '2021-01-01': 'other', 'hello': 'other',
+}
+
+
+class ClassifierTestCase(TestCase):
+
+    def test_values_fall_into_one_class(self):
+        self.assertEqual({value: classify_value(value) for value in VALUES}, VALUES)
+
+    def test_arrow_strings_are_classified_alike(self):
+        strings = pd.Series(list(VALUES))
+        classes, candidates = classify_strings(strings)
+        arrow_classes, arrow_candidates = classify_strings(strings.astype(ARROW_STRING_DTYPE))
+        self.assertEqual(classes.tolist(), list(VALUES.values()))
+        self.assertEqual(arrow_classes.tolist(), classes.tolist())
+        self.assertEqual(arrow_candidates.tolist(), candidates.tolist())
+        self.assertFalse(candidates[1] or candidates[2])
+
+    def test_histogram_counts_rows(self):
+        histogram = TypeHistogram(pd.Series(['1', '1', '2%', 'NA', None, 'USD 3']))
+        self.assertEqual((histogram.rows, histogram.non_null, histogram.distinct, histogram.meaningful), (6, 5, 4, 4))
+        self.assertEqual(histogram.counts['number'], 2)
+        self.assertEqual(histogram.data_type, 'Text')
+
+    def test_histogram_labels_match_the_legacy_engine(self):
+        for values in (
+            ['yes', 'no', 'yes'], ['NA', None], ['1', '2.5%'], ['1', 'USD 2'], ['1', '5j'], ['1', '2 weeks'],
+            ['2021-01-01', 'x'], ['a', 'a', 'a', 'b'], ['a', 'b', 'c'],
+        ):
+            col = pd.Series(values, dtype=object)
+            self.assertEqual(TypeHistogram(col).data_type, infer_data_type_legacy(col), values)
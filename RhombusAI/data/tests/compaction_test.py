@@ -0,0 +1,79 @@
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.compaction import compact_column, compact_dtypes
+from data.models import Dataset
+from data.storage import ColumnStore
+
+import numpy as np
+import pandas as pd
+
+
+class DtypeCompactionTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, UPLOAD_CACHE_ENABLED=False)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def upload(self, content, name='compaction_test.csv'):
+        file = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post(reverse('data:file_upload'), {'datafile': file})
+
+    def test_compact_column_rules(self):
+        cases = [
+            (pd.Series([1, 2, 300]), 'int16'),
+            (pd.Series([1.0, np.nan, 3.0]), 'Int8'),
+            (pd.Series([0.5, 1.25, np.nan]), 'float32'),
+            (pd.Series([0.1, 0.2]), 'float64'),
+            (pd.Series([1e20, np.nan]), 'float64'),
+            (pd.Series(['a', 'b', 'a', 'a']), 'category'),
+            (pd.Series(['a', 'b', np.nan]), 'string'),
+            (pd.Series(['a', 1, 'c']), 'object'),
+            (pd.Series([True, False]), 'bool'),
+        ]
+        for col, dtype in cases:
+            compacted = compact_column(col)
+            self.assertEqual(str(compacted.dtype), dtype, col.tolist())
+            self.assertEqual([None if pd.isna(value) else value for value in compacted], [None if pd.isna(value) else value for value in col])
+
+    def test_disabled_compaction_keeps_dtypes(self):
+        df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+        report = {}
+        with override_settings(DTYPE_COMPACTION=False):
+            compacted = compact_dtypes(df, report=report)
+        self.assertEqual(compacted.dtypes.tolist(), df.dtypes.tolist())
+        self.assertEqual(report['b']['memory_bytes'], report['b']['original_memory_bytes'])
+
+    def test_upload_reports_memory_and_keeps_types(self):
+        content = 'count,amount,name\n' + ''.join(f'{i},{i}.5,name {i}\n' for i in range(40)) + ',,\n'
+        body = self.upload(content.encode('utf-8')).json()
+
+        columns = {column['column']: column for column in body['columns_with_types']}
+        self.assertEqual({name: column['data_type'] for name, column in columns.items()}, {'count': 'Decimal', 'amount': 'Decimal', 'name': 'Text'})
+        for column in columns.values():
+            self.assertLess(column['memory_bytes'], column['original_memory_bytes'])
+        self.assertEqual((body['processed_data'][0]['count'], body['processed_data'][0]['amount']), (0, 0.5))
+
+        dataset = Dataset.objects.get(id=body['dataset_id'])
+        dtypes = ColumnStore(dataset.storage_path).dtypes
+        self.assertEqual((dtypes['count'], dtypes['amount'], dtypes['name']), ('Int8', 'float32', 'string'))
+        self.assertEqual(dataset.column_types.get(column_name='count').inferred_type, 'float64')
+
+    def test_append_keeps_the_compacted_columns(self):
+        body = self.upload(b'count,name\n1,a1\n2,a2\n,a3\n').json()
+        dataset = Dataset.objects.get(id=body['dataset_id'])
+        appended = SimpleUploadedFile('more.csv', b'count,name\n300,a4\n', content_type='text/csv')
+        response = self.client.post(reverse('data:append', args=[dataset.id]), {'datafile': appended})
+        self.assertEqual(response.status_code, 200)
+
+        store = ColumnStore(dataset.storage_path)
+        self.assertEqual((store.dtypes['count'], store.dtypes['name']), ('Int16', 'string'))
+        self.assertEqual(store.read_column('count').tolist(), [1, 2, pd.NA, 300])
+        self.assertEqual(dataset.column_types.get(column_name='count').user_modified_type, 'Decimal')
@@ -0,0 +1,46 @@
+from django.test import TestCase
+from data.backend import ARROW_STRING_DTYPE
+from data.complex_numbers import parse_complex
+from data.conversions import convert_to_complex
+from data.typechecks import is_complex
+
+import numpy as np
+import pandas as pd
+
+VALUES = {
+    '3+4j': 3 + 4j, '1 - 2.5i': 1 - 2.5j, '(5j)': 5j, '-J': -1j, '1e3-j': 1000 - 1j, '7': 7 + 0j,
+    '.5I': 0.5j, '1_0j': 10j,
+}
+
+
+class ComplexParsingTestCase(TestCase):
+
+    def test_reads_j_and_i_suffixes(self):
+        col = pd.Series(list(VALUES) + ['x', None], index=range(10, 20), name='z')
+        parsed = parse_complex(col)
+        self.assertEqual(parsed.dtype, np.complex128)
+        self.assertEqual(parsed.iloc[:-2].tolist(), list(VALUES.values()))
+        self.assertTrue(parsed.iloc[-2:].isna().all())
+        self.assertEqual((parsed.index.tolist(), parsed.name), (list(range(10, 20)), 'z'))
+        arrow = parse_complex(col.astype(ARROW_STRING_DTYPE))
+        self.assertTrue(arrow.equals(parsed))
+
+    def test_mixed_values_are_read_as_complex_reads_them(self):
+        parsed = parse_complex(pd.Series(['2+1j', 3, 1.5, 2j, np.nan], dtype=object))
+        self.assertEqual(parsed.iloc[:4].tolist(), [2 + 1j, 3 + 0j, 1.5 + 0j, 2j])
+
+    def test_raise_names_values_that_are_not_complex_numbers(self):
+        with self.assertRaisesRegex(ValueError, "'x', '\\(1\\+2j'"):
+            parse_complex(pd.Series(['1+2j', 'x', '(1+2j']), errors='raise')
+
+    def test_conversion_reads_none_tokens_as_missing(self):
+        df = pd.DataFrame({'z': ['3-4j', 'N/A', '1 + 2j', '3-4j']})
+        converted = convert_to_complex(df, 'z')
+        self.assertEqual(converted.dtype, np.complex128)
+        self.assertEqual(converted[[0, 2]].tolist(), [3 - 4j, 1 + 2j])
+        self.assertTrue(pd.isna(converted[1]))
+        text = pd.DataFrame({'z': ['1+2j', 'hello']})
+        self.assertTrue(convert_to_complex(text, 'z').equals(text['z']))
+
+    def test_inference_only_reads_the_j_suffix(self):
+        self.assertEqual([is_complex(value) for value in ('1 + 2j', '5j', '320i', '12', 'j')], [True, True, False, False, False])
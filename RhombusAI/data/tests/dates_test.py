@@ -0,0 +1,44 @@
+from django.test import TestCase
+from dateutil import parser
+from data.conversions import convert_to_datetime
+from data.dates import contains_date, convert_dates, detect_date_format, parse_date
+
+import pandas as pd
+
+
+class DateEngineTestCase(TestCase):
+
+    def test_detects_ranked_format(self):
+        self.assertEqual(detect_date_format(pd.Series(['2023-01-05', '2023-02-28'])), '%Y-%m-%d')
+        self.assertEqual(detect_date_format(pd.Series(['04/18/2002', '4/8/2002', 'soon'])), '%m/%d/%Y')
+        self.assertIsNone(detect_date_format(pd.Series(['apple', 'pear'])))
+
+    def test_conversion_matches_dateutil(self):
+        values = ['2023-01-05', '01/02/2023', 'March 3, 2021', '13/01/2023', ' 2022-02-02', '2023-01-05 10:00:00.1234567']
+        converted = convert_dates(pd.Series(values))
+        self.assertEqual(str(converted.dtype), 'datetime64[ns]')
+        self.assertEqual(converted.tolist(), [pd.Timestamp(parser.parse(value, fuzzy=True)) for value in values])
+
+    def test_leftovers_are_parsed_once_per_distinct_value(self):
+        parse_date.cache_clear()
+        convert_dates(pd.Series(['on 2023-01-05 maybe'] * 50 + ['2023-01-06'] * 50))
+        info = parse_date.cache_info()
+        self.assertEqual(info.misses, 1)
+        convert_dates(pd.Series(['on 2023-01-05 maybe']))
+        self.assertEqual(parse_date.cache_info().hits, info.hits + 1)
+
+    def test_time_zones_keep_python_datetimes(self):
+        df = pd.DataFrame({'dates': ['2023-01-01T10:00:00+02:00', '2023-01-02', 'n/a']})
+        converted = convert_to_datetime(df, 'dates')
+        self.assertEqual(converted.dtype, object)
+        self.assertEqual(converted[0], parser.parse('2023-01-01T10:00:00+02:00'))
+        self.assertTrue(pd.isna(converted[2]))
+
+    def test_unparseable_value_keeps_original_column(self):
+        df = pd.DataFrame({'dates': ['2023-01-01', 'not a date']})
+        self.assertTrue(convert_to_datetime(df, 'dates').equals(df['dates']))
+
+    def test_contains_date(self):
+        self.assertTrue(contains_date(pd.Series(['hello', '2023-01-01'])))
+        self.assertTrue(contains_date(pd.Series(['hello', 'May 5th 2021'])))
+        self.assertFalse(contains_date(pd.Series(['hello', 'world'])))
@@ -0,0 +1,78 @@
+import hashlib
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.dedup import evict_processed_uploads, release_files
+from data.models import Dataset, ProcessedUpload
+from data.storage import ColumnStore
+
+
+class UploadDeduplicationTestCase(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.root, PROCESSED_DATA_ROOT=f'{self.root}/processed', JOB_QUEUE_EAGER=True)
+        self.settings_override.enable()
+        self.content = b'amount,flag,city\n1.5,yes,Paris\n2.5,no,Rome\n3.5,yes,Paris\n'
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def upload(self, content=None, name='dedup_test.csv', **data):
+        file = SimpleUploadedFile(name, content or self.content, content_type='text/csv')
+        return self.client.post(reverse('data:file_upload'), {'datafile': file, **data})
+
+    def test_identical_upload_reuses_processed_result(self):
+        first = self.upload().json()
+        second = self.upload(name='renamed.csv').json()
+
+        self.assertTrue(second['cached'])
+        self.assertNotIn('cached', first)
+        self.assertNotEqual(second['dataset_id'], first['dataset_id'])
+        self.assertEqual(second['processed_data'], first['processed_data'])
+        self.assertEqual(second['columns_with_types'], first['columns_with_types'])
+
+        original, copy = Dataset.objects.get(id=first['dataset_id']), Dataset.objects.get(id=second['dataset_id'])
+        self.assertEqual(copy.content_hash, hashlib.blake2b(self.content).hexdigest())
+        self.assertEqual(copy.file_name, 'renamed.csv')
+        self.assertEqual((copy.storage_path, copy.original_file.name), (original.storage_path, original.original_file.name))
+        self.assertEqual(ProcessedUpload.objects.get().hits, 1)
+
+    def test_async_upload_is_answered_from_cache(self):
+        self.upload()
+        response = self.upload(mode='async')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['cached'])
+
+    def test_changed_settings_do_not_reuse_results(self):
+        self.upload()
+        with override_settings(INFERENCE_SAMPLE_SIZE=10):
+            response = self.upload().json()
+        self.assertNotIn('cached', response)
+        self.assertEqual(ProcessedUpload.objects.count(), 2)
+
+    def test_eviction_keeps_files_in_use(self):
+        first = self.upload().json()
+        with override_settings(UPLOAD_CACHE_MAX_ENTRIES=1):
+            self.upload(b'amount\n1\n2\n')
+        self.assertEqual(ProcessedUpload.objects.count(), 1)
+
+        dataset = Dataset.objects.get(id=first['dataset_id'])
+        self.assertTrue(ColumnStore(dataset.storage_path).exists())
+        self.assertNotIn('cached', self.upload().json())
+
+        storage_path, original_file = dataset.storage_path, dataset.original_file.name
+        dataset.delete()
+        release_files(storage_path, original_file)
+        self.assertFalse(ColumnStore(storage_path).exists())
+
+    def test_size_cap_evicts_least_recently_used(self):
+        self.upload()
+        self.upload(b'amount\n1\n2\n')
+        self.upload()  # Reused, so the first file is now the most recently used
+        with override_settings(UPLOAD_CACHE_MAX_BYTES=ProcessedUpload.objects.order_by('-last_accessed_at').first().size_bytes):
+            self.assertEqual(evict_processed_uploads(), 1)
+        self.assertEqual(ProcessedUpload.objects.get().content_hash, hashlib.blake2b(self.content).hexdigest())
@@ -0,0 +1,31 @@
+from django.test import TestCase, override_settings
+from data.conversions import convert_to_timedelta
+from data.durations import parse_durations
+
+import pandas as pd
+
+DAY = pd.Timedelta(days=1)
+
+
+class DurationParsingTestCase(TestCase):
+
+    def test_reads_pandas_iso_and_phrase_durations(self):
+        col = pd.Series(['3 days', '1 days 02:00:00', 'P1DT2H', 'P1.5D', '2 hrs 5 mins', '1 week and 2 days', 'NA', None, 'soon'])
+        self.assertEqual(parse_durations(col).tolist(), [
+            3 * DAY, DAY + pd.Timedelta(hours=2), DAY + pd.Timedelta(hours=2), 1.5 * DAY,
+            pd.Timedelta(hours=2, minutes=5), 9 * DAY, pd.NaT, pd.NaT, pd.NaT,
+        ])
+
+    @override_settings(DURATION_MONTH_DAYS=30, DURATION_YEAR_DAYS=365)
+    def test_months_and_years_have_the_configured_length(self):
+        col = pd.Series(['1 year, 2 months', 'P1Y2M', '1 Year 2 Months'], index=[7, 7, 8], name='wait')
+        converted = convert_to_timedelta(col.to_frame(), 'wait')
+        self.assertEqual(converted.tolist(), [425 * DAY] * 3)
+        self.assertEqual((converted.index.tolist(), converted.name), ([7, 7, 8], 'wait'))
+        # Beyond the range of timedelta64[ns]
+        self.assertTrue(pd.isna(parse_durations(pd.Series(['500 years']))[0]))
+
+    def test_raise_names_values_that_are_not_durations(self):
+        self.assertTrue(pd.isna(parse_durations(pd.Series(['1 year', 'nan']), errors='raise')[1]))
+        with self.assertRaisesRegex(ValueError, 'soon'):
+            parse_durations(pd.Series(['1 year', 'soon']), errors='raise')
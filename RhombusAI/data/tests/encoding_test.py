@@ -0,0 +1,34 @@
+from decimal import Decimal
+from django.test import TestCase
+from data.encoding import can_factorize, map_unique, transform_unique
+
+import numpy as np
+import pandas as pd
+
+
+class UniqueEncodingTestCase(TestCase):
+
+    def test_map_unique_matches_apply(self):
+        col = pd.Series(['yes', 'no', None, 'yes', np.nan, 'no', None], index=list('abcdefg'), name='flag')
+        func = lambda x: type(x).__name__ + str(x).upper()
+        pd.testing.assert_series_equal(map_unique(col, func), col.apply(func))
+
+    def test_func_runs_once_per_distinct_value(self):
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            return str(value).upper()
+
+        map_unique(pd.Series(['a', 'b', None, None] * 1000), func)
+        self.assertEqual(len(calls), 3)
+
+    def test_mixed_types_are_processed_row_by_row(self):
+        col = pd.Series([1, 1.0, True, Decimal('1')], dtype=object)
+        self.assertFalse(can_factorize(col))
+        self.assertEqual(map_unique(col, str).tolist(), ['1', '1.0', 'True', '1'])
+
+    def test_transform_unique(self):
+        col = pd.Series(['1 day', 'soon', None, '1 day'])
+        result = transform_unique(col, lambda values: pd.to_timedelta(values, errors='coerce'))
+        pd.testing.assert_series_equal(result, pd.to_timedelta(col, errors='coerce'))
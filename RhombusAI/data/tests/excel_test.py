@@ -0,0 +1,119 @@
+import datetime
+import io
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.excel import SheetReader, read_sheet, sheet_names
+from data.models import Dataset, ProcessingJob
+
+import pandas as pd
+from openpyxl import Workbook
+
+
+def workbook_bytes(sheets):
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+SALES = [['id', 'name', 'when', 'flag', 'amount']] + [
+    [i, f'name {i}', datetime.datetime(2021, 1, i % 28 + 1), i % 2 == 0, i + 0.5] for i in range(1, 31)
+] + [[31, None, None, None, 'n/a'], [], [32, 'last', datetime.datetime(2021, 2, 1), True, 4.25], [], []]
+STOCK = [['sku', 'count'], ['a', 1], ['b', 2], ['c', 3]]
+
+
+class ExcelReaderTestCase(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.root, PROCESSED_DATA_ROOT=f'{self.root}/processed', EXCEL_ENGINE='openpyxl', JOB_QUEUE_EAGER=True,
+        )
+        self.settings_override.enable()
+        self.path = f'{self.root}/book.xlsx'
+        with open(self.path, 'wb') as file:
+            file.write(workbook_bytes({'Sales': SALES, 'Stock': STOCK}))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def upload(self, content, name='book.xlsx', **data):
+        file = SimpleUploadedFile(name, content, content_type='application/octet-stream')
+        return self.client.post(reverse('data:file_upload'), {'datafile': file, **data})
+
+    def test_sheets_read_like_pandas(self):
+        self.assertEqual(sheet_names(self.path), ['Sales', 'Stock'])
+        for sheet in ('Sales', 1):
+            pd.testing.assert_frame_equal(read_sheet(self.path, sheet), pd.read_excel(self.path, sheet_name=sheet))
+        pd.testing.assert_frame_equal(read_sheet(self.path, nrows=5), pd.read_excel(self.path, nrows=5))
+        pd.testing.assert_frame_equal(read_sheet(self.path, usecols=['id', 'when']), pd.read_excel(self.path, usecols=['id', 'when']))
+        with self.assertRaisesRegex(ValueError, "Worksheet named 'Missing' not found"):
+            read_sheet(self.path, 'Missing')
+
+    def test_chunks_hold_the_rows_of_the_sheet(self):
+        with SheetReader(self.path) as reader:
+            chunks = list(reader.chunks(8))
+        self.assertEqual([len(chunk) for chunk in chunks], [8, 8, 8, 8, 1])
+        self.assertEqual(chunks[0]['amount'].dtype, 'float64')
+        self.assertEqual(pd.concat(chunks, ignore_index=True)['name'].tolist(), pd.read_excel(self.path)['name'].tolist())
+
+    def test_streamed_workbook_matches_the_in_memory_read(self):
+        content = open(self.path, 'rb').read()
+        with override_settings(UPLOAD_CACHE_ENABLED=False):
+            expected = self.upload(content).json()
+            with override_settings(EXCEL_STREAMING_MIN_BYTES=0, STREAMING_CHUNK_ROWS=8):
+                body = self.upload(content).json()
+        self.assertEqual(body['processed_data'], expected['processed_data'])
+        self.assertEqual(
+            [(column['column'], column['data_type']) for column in body['columns_with_types']],
+            [(column['column'], column['data_type']) for column in expected['columns_with_types']],
+        )
+
+    def test_upload_reads_the_chosen_sheet(self):
+        content = open(self.path, 'rb').read()
+        body = self.upload(content, sheet='Stock').json()
+        self.assertEqual([column['column'] for column in body['columns_with_types']], ['sku', 'count'])
+        self.assertEqual(Dataset.objects.get(id=body['dataset_id']).sheet_name, 'Stock')
+
+        # The first sheet of the same workbook is a different dataset, not a cache hit
+        body = self.upload(content).json()
+        self.assertNotIn('cached', body)
+        self.assertEqual(body['columns_with_types'][0]['column'], 'id')
+
+        response = self.upload(content, sheet='Missing')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['sheets'], ['Sales', 'Stock'])
+        response = self.upload(b'a,b\n1,2\n', name='rows.csv', sheet='Stock')
+        self.assertEqual(response.status_code, 400)
+
+    def test_every_sheet_becomes_a_dataset(self):
+        content = open(self.path, 'rb').read()
+        response = self.upload(content, sheet='*')
+        self.assertEqual(response.status_code, 202)
+        sheets = response.json()['sheets']
+        self.assertEqual([(sheet['sheet'], sheet['status']) for sheet in sheets], [('Sales', 'succeeded'), ('Stock', 'succeeded')])
+
+        datasets = Dataset.objects.filter(id__in=[sheet['dataset_id'] for sheet in sheets]).order_by('id')
+        self.assertEqual(len({dataset.original_file.name for dataset in datasets}), 1)
+        self.assertEqual(datasets[1].column_types.get(column_name='count').user_modified_type, 'Integer')
+        self.assertEqual(ProcessingJob.objects.filter(status='succeeded').count(), 2)
+
+        sheets = self.upload(content, sheet='*').json()['sheets']
+        self.assertTrue(all(sheet['cached'] for sheet in sheets))
+
+    def test_append_widens_from_the_dataset_sheet(self):
+        body = self.upload(open(self.path, 'rb').read(), sheet='Stock').json()
+        appended = SimpleUploadedFile('more.csv', b'sku,count\nd,many\n', content_type='text/csv')
+        response = self.client.post(reverse('data:append', args=[body['dataset_id']]), {'datafile': appended})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['widened'], {'count': {'from': 'Decimal', 'to': 'Text'}})
+        self.assertEqual([row['count'] for row in response.json()['processed_data']], ['1', '2', '3', 'many'])
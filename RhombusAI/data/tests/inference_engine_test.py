@@ -0,0 +1,79 @@
+import os
+from django.test import TestCase, override_settings
+from data.inference import infer_data_type_legacy, infer_data_type_vectorised
+from data.utils import infer_data_type, infer_column_type
+
+import numpy as np
+import pandas as pd
+
+
+class InferenceEngineParityTestCase(TestCase):
+
+    columns = {
+        'bool_words': ['yes', 'no', 'true', 'false', '1', '0'],
+        'bool_with_gap': ['yes', 'no', None],
+        'bool_with_maybe': ['yes', 'no', 'maybe'],
+        'ints': [123, 456, 789],
+        'zero_one_ints': [0, 1, 1, 0],
+        'none_token_ints': [-999, -999],
+        'floats': [1.5, np.nan, 2.25],
+        'all_nan': [np.nan, np.nan],
+        'none_tokens': ['N/A', 'null', 'missing'],
+        'numbers_with_commas': ['1,000', '2,500.5', '-3'],
+        'percentages': ['5%', '-10.5%', '100%'],
+        'currency': ['EUR 40.00', 'USD 12', '50'],
+        'complex': ['1+2j', '3-4j', 'not a complex number'],
+        'timedelta': ['1 day', '3 days', '6 hours'],
+        'timedelta_mixed': ['1 days', 'not a timedelta', '2 days'],
+        'dates': ['2023-01-01', '2023-03-15', '2023-05-20'],
+        'dates_mixed': ['2020-01-01', 'not a date', '2020-03-01'],
+        'category': ['A', 'B', 'A', 'A', 'B', 'A', 'B'],
+        'text': ['12345', '2020-01-01', 'Hello, World!'],
+        'mixed_objects': ['two', 1, 3.0],
+    }
+
+    def test_engines_agree_on_synthetic_columns(self):
+        for name, values in self.columns.items():
+            col = pd.Series(values, name=name)
+            self.assertEqual(infer_data_type_vectorised(col), infer_data_type_legacy(col), f'Engines disagree on {name}.')
+
+    def test_engines_agree_on_example_datasets(self):
+        base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        for file_name in ['challenging_dataset.csv', 'sample_data.csv']:
+            df = pd.read_csv(os.path.join(base_dir, 'datasets', file_name))
+            for name in df.columns:
+                self.assertEqual(infer_data_type_vectorised(df[name]), infer_data_type_legacy(df[name]), f'Engines disagree on {file_name}:{name}.')
+
+    @override_settings(INFERENCE_ENGINE='legacy')
+    def test_setting_selects_legacy_engine(self):
+        col = pd.Series(['1 day', '3 days', '6 hours'])
+        self.assertEqual(infer_data_type(col), 'Time Duration')
+
+
+class SampledInferenceTestCase(TestCase):
+
+    @override_settings(INFERENCE_MODE='sampled', INFERENCE_SAMPLE_SIZE=300)
+    def test_consistent_column_is_decided_from_sample(self):
+        col = pd.Series([f'{i},000.5' for i in range(5000)])
+        inference = infer_column_type(col)
+        self.assertEqual(inference, {'data_type': 'Decimal', 'confidence': 1.0, 'sampled': True})
+
+    @override_settings(INFERENCE_MODE='sampled', INFERENCE_SAMPLE_SIZE=300)
+    def test_disagreeing_strata_fall_back_to_full_scan(self):
+        # The head is all numbers while the rest is free text
+        col = pd.Series([str(i) for i in range(200)] + [f'item {i}' for i in range(4800)])
+        inference = infer_column_type(col)
+        self.assertFalse(inference['sampled'])
+        self.assertEqual(inference['data_type'], infer_data_type(col))
+
+    @override_settings(INFERENCE_MODE='sampled', INFERENCE_SAMPLE_SIZE=300, INFERENCE_CONFIDENCE_THRESHOLD=0.99)
+    def test_low_confidence_falls_back_to_full_scan(self):
+        col = pd.Series(['2020-01-01', 'not a date'] * 2500)
+        inference = infer_column_type(col)
+        self.assertFalse(inference['sampled'])
+        self.assertEqual(inference['data_type'], 'Date')
+        self.assertLess(inference['confidence'], 0.99)
+
+    def test_full_mode_reports_confidence_without_sampling(self):
+        inference = infer_column_type(pd.Series(['1', '2', 'three', '4']))
+        self.assertEqual(inference, {'data_type': 'Text', 'confidence': 0.25, 'sampled': False})
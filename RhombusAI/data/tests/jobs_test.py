@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.jobs import run_job, run_queued_jobs
+from data.models import ProcessingJob
+
+import pandas as pd
+
+
+class AsyncUploadTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        # The upload cache is off so that identical uploads are processed again
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, JOB_QUEUE_EAGER=True, UPLOAD_CACHE_ENABLED=False)
+        self.settings_override.enable()
+        self.data = pd.DataFrame({
+            'ints': range(6),
+            'dates': pd.date_range('2023-01-01', periods=6).strftime('%Y-%m-%d'),
+            'flags': ['yes', 'no'] * 3,
+        })
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def upload(self, content, name='jobs_test.csv', **data):
+        file = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post(reverse('data:file_upload'), {'datafile': file, **data})
+
+    def test_async_upload_matches_sync_upload(self):
+        content = self.data.to_csv(index=False).encode('utf-8')
+        sync_response = self.upload(content).json()
+
+        response = self.upload(content, mode='async')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+
+        status = self.client.get(reverse('data:job_status', args=[job_id])).json()
+        self.assertEqual(status['status'], 'succeeded')
+        self.assertEqual(status['progress'], 1.0)
+        self.assertEqual(status['column_progress'], {'ints': 1.0, 'dates': 1.0, 'flags': 1.0})
+        self.assertEqual(status['processed_data'], sync_response['processed_data'])
+        self.assertEqual(status['columns_with_types'], sync_response['columns_with_types'])
+
+    def test_failed_job_reports_error(self):
+        response = self.upload(b'not a workbook', name='broken.xlsx', mode='async')
+        status = self.client.get(reverse('data:job_status', args=[response.json()['job_id']])).json()
+        self.assertEqual(status['status'], 'failed')
+        self.assertTrue(status['error'])
+        self.assertNotIn('processed_data', status)
+
+    def test_queued_jobs_are_claimed_once(self):
+        with override_settings(JOB_QUEUE_EAGER=False):
+            response = self.upload(self.data.to_csv(index=False).encode('utf-8'), mode='async')
+        job_id = response.json()['job_id']
+        self.assertEqual(ProcessingJob.objects.get(id=job_id).status, 'queued')
+
+        self.assertEqual(run_queued_jobs(), 1)
+        self.assertFalse(run_job(job_id))
+        self.assertEqual(ProcessingJob.objects.get(id=job_id).status, 'succeeded')
+
+    def test_unknown_job_returns_404(self):
+        self.assertEqual(self.client.get(reverse('data:job_status', args=[0])).status_code, 404)
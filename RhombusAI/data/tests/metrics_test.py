@@ -0,0 +1,51 @@
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data import metrics
+
+
+class MetricsTestCase(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_stage_is_logged_and_aggregated(self):
+        with self.assertLogs('data.metrics', 'INFO') as logs:
+            with metrics.stage('read_file', dataset_id=7) as record:
+                record['rows'] = 100
+
+        logged = logs.records[0].metrics
+        self.assertEqual((logged['stage'], logged['rows'], logged['dataset_id']), ('read_file', 100, 7))
+        self.assertIn('seconds', logged)
+        text = metrics.render()
+        self.assertIn('data_stage_duration_seconds_count{stage="read_file"} 1', text)
+        self.assertIn('data_stage_duration_seconds_bucket{stage="read_file",le="+Inf"} 1', text)
+        self.assertIn('data_stage_rows_total{stage="read_file"} 100', text)
+
+    def test_failed_stage_counts_an_error(self):
+        with self.assertLogs('data.metrics', 'WARNING'):
+            with self.assertRaises(ValueError):
+                with metrics.stage('serialise'):
+                    raise ValueError('bad value')
+
+        text = metrics.render()
+        self.assertIn('data_stage_errors_total{stage="serialise"} 1', text)
+        self.assertNotIn('data_stage_duration_seconds_count{stage="serialise"}', text)
+
+    def test_metrics_endpoint_after_upload(self):
+        storage_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, storage_root, ignore_errors=True)
+        with override_settings(PROCESSED_DATA_ROOT=storage_root):
+            file = SimpleUploadedFile('metrics_test.csv', b'amount,flag\n1.5,yes\n2.5,no\n', content_type='text/csv')
+            self.client.post(reverse('data:file_upload'), {'datafile': file})
+
+        response = self.client.get(reverse('data:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        for stage in ('process_dataset', 'read_file', 'infer_and_convert', 'store_write', 'save_column_types', 'serialise'):
+            self.assertIn(f'data_stage_duration_seconds_count{{stage="{stage}"}} 1', text)
+        self.assertIn('data_column_inference_duration_seconds_count{data_type="Decimal"} 1', text)
+        self.assertIn('data_column_inference_duration_seconds_count{data_type="Boolean"} 1', text)
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from data.backend import ARROW_STRING_DTYPE
+from data.conversions import convert_to_numeric
+from data.numbers import parse_numbers
+
+import numpy as np
+import pandas as pd
+
+VALUES = ['1,000.5', ' 12.5% ', 'EUR 40.00', 'usd 3', '1e5', 'NA', None, 'EUR 5%', '-7']
+EXPECTED = [1000.5, 0.125, 40.0, 3.0, 100000.0, np.nan, np.nan, np.nan, -7.0]
+
+
+class NumberParsingTestCase(TestCase):
+
+    def test_parses_formatted_numbers(self):
+        col = pd.Series(VALUES, index=range(10, 19), name='amount')
+        for values in (col, col.astype(ARROW_STRING_DTYPE), col.astype('category')):
+            numbers, currencies = parse_numbers(values)
+            np.testing.assert_array_equal(numbers.to_numpy(), EXPECTED)
+            self.assertEqual((numbers.index.tolist(), numbers.name), (col.index.tolist(), 'amount'))
+            self.assertEqual(currencies.cat.categories.tolist(), ['EUR', 'USD'])
+            self.assertEqual(currencies.tolist()[2:4], ['EUR', 'USD'])
+
+    def test_repeated_values_are_parsed_once_per_distinct_value(self):
+        col = pd.Series(VALUES * 2000)
+        numbers, currencies = parse_numbers(col)
+        np.testing.assert_array_equal(numbers.to_numpy(), EXPECTED * 2000)
+        self.assertEqual(currencies.value_counts().to_dict(), {'EUR': 4000, 'USD': 2000})
+
+    def test_mixed_values_keep_their_numbers(self):
+        numbers, currencies = parse_numbers(pd.Series([5, '2.5%', 'x', None, 1.5], dtype=object))
+        np.testing.assert_array_equal(numbers.to_numpy(), [5, 0.025, np.nan, np.nan, 1.5])
+        self.assertIsNone(currencies)
+
+    def test_convert_to_numeric_keeps_currency_codes_on_request(self):
+        df = pd.DataFrame({'price': ['EUR 1', 'GBP 2', '3']})
+        self.assertEqual(convert_to_numeric(df, 'price', currency_column='currency').tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(df['currency'].dtype, 'category')
+        with self.assertRaisesRegex(ValueError, 'complex numbers'):
+            convert_to_numeric(pd.DataFrame({'z': ['1', '3 + 4j']}), 'z')
+
+    def test_repeated_percent_signs_are_all_removed(self):
+        numbers, _ = parse_numbers(pd.Series(['5%%', '%7%', '5 % %', '1']))
+        np.testing.assert_array_equal(numbers.to_numpy(), [0.05, 0.07, np.nan, 1.0])
+        self.assertEqual(convert_to_numeric(pd.DataFrame({'rate': ['5%%', '2.5%']}), 'rate').tolist(), [0.05, 0.025])
@@ -0,0 +1,87 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.models import Dataset
+from data.storage import ColumnStore
+
+import pandas as pd
+
+
+class BatchOverrideTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, UPLOAD_CACHE_ENABLED=False)
+        self.settings_override.enable()
+        content = 'amount,flag,label,code\n1.5,yes,a,1\n2.5,no,b,2\n3.5,yes,c,x\n'
+        file = SimpleUploadedFile('batch_test.csv', content.encode('utf-8'), content_type='text/csv')
+        self.client.post(reverse('data:file_upload'), {'datafile': file})
+        self.dataset = Dataset.objects.latest('id')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def override(self, operations):
+        return self.client.post(reverse('data:override_batch'), json.dumps({'operations': operations}), content_type='application/json')
+
+    def user_types(self):
+        return {col.column_name: col.user_modified_type for col in self.dataset.column_types.all()}
+
+    def test_overrides_columns_in_one_write(self):
+        with mock.patch.object(ColumnStore, 'save', autospec=True, side_effect=ColumnStore.save) as save:
+            response = self.override([
+                {'column': 'amount', 'new_type': 'Text'},
+                {'column': 'flag', 'new_type': 'Text'},
+            ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(save.call_count, 1)
+
+        body = response.json()
+        self.assertTrue(all(result['success'] for result in body['results']))
+        self.assertEqual((body['processed_data'][0]['amount'], body['processed_data'][0]['flag']), ('1.5', 'True'))
+        dtypes = ColumnStore(self.dataset.storage_path).dtypes
+        self.assertEqual((dtypes['amount'], dtypes['flag'], dtypes['label']), ('object', 'object', 'string'))
+        self.assertEqual((self.user_types()['amount'], self.user_types()['flag']), ('Text', 'Text'))
+
+    def test_failed_conversion_changes_nothing(self):
+        store = ColumnStore(self.dataset.storage_path)
+        before, types_before = store.read(), self.user_types()
+
+        response = self.override([
+            {'column': 'amount', 'new_type': 'Text'},
+            {'column': 'code', 'new_type': 'Integer'},
+        ])
+        self.assertEqual(response.status_code, 500)
+        results = {result['column']: result['success'] for result in response.json()['results']}
+        self.assertEqual(results, {'amount': True, 'code': False})
+        pd.testing.assert_frame_equal(ColumnStore(self.dataset.storage_path).read(), before)
+        self.assertEqual(self.user_types(), types_before)
+
+    def test_failed_boolean_conversion_names_the_invalid_values(self):
+        response = self.override([{'column': 'code', 'new_type': 'Boolean'}])
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("cannot be converted to boolean: '2', 'x'.", response.json()['results'][0]['message'])
+
+        response = self.override([{'column': 'flag', 'new_type': 'Boolean'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ColumnStore(self.dataset.storage_path).dtypes['flag'], 'boolean')
+
+    def test_failed_write_rolls_back_column_types(self):
+        types_before = self.user_types()
+        with mock.patch.object(ColumnStore, '_write_part', side_effect=OSError('disk full')):
+            response = self.override([{'column': 'amount', 'new_type': 'Text'}])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.user_types(), types_before)
+        self.assertEqual(ColumnStore(self.dataset.storage_path).dtypes['amount'], 'float32')
+
+    def test_invalid_operations(self):
+        for operations in ([], [{'column': 'amount'}], [{'column': 'amount', 'new_type': 'Text'}] * 2):
+            self.assertEqual(self.override(operations).status_code, 400)
+        response = self.override([{'column': 'missing', 'new_type': 'Text'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('missing', response.json()['error'])
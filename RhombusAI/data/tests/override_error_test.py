@@ -7,11 +7,8 @@ import json
 class OverrideDataTypeTestCase(TestCase):
 
     def setUp(self):
-        # Create a test Dataset object with processed file pickle data
-        self.dataset = Dataset.objects.create(
-            file_name='test_data.csv',
-            processed_file_pkl=b'\x80\x04\x95\x00\x00\x00\x00\x00\x00\x00\x8c\x08pandas...',
-        )
+        # Create a test Dataset object without any processed data on disk
+        self.dataset = Dataset.objects.create(file_name='test_data.csv')
 
     def test_overriding_column_to_date_error(self):
         # Attempt to override a column to 'date', which is not supported
@@ -0,0 +1,77 @@
+import json
+import shutil
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data import utils
+from data.models import Dataset
+from data.storage import ColumnStore
+
+import pandas as pd
+
+
+class OverridePreviewTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, UPLOAD_CACHE_ENABLED=False)
+        self.settings_override.enable()
+        content = 'code,when\n' + ''.join(f'{i},2023-01-{i % 28 + 1:02d}\n' for i in range(50)) + 'n/a,2023-02-01\nX12,soon\n'
+        file = SimpleUploadedFile('preview_test.csv', content.encode('utf-8'), content_type='text/csv')
+        self.client.post(reverse('data:file_upload'), {'datafile': file})
+        self.dataset = Dataset.objects.latest('id')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def override(self, **data):
+        return self.client.post(reverse('data:override'), json.dumps(data), content_type='application/json')
+
+    def test_dry_run_reports_failures_without_saving(self):
+        store = ColumnStore(self.dataset.storage_path)
+        before = store.read()
+
+        response = self.override(column='code', new_type='Integer', dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        preview = response.json()
+        self.assertTrue(preview['dry_run'])
+        self.assertEqual((preview['sample_size'], preview['failed'], preview['estimated_failures']), (52, 1, 1))
+        self.assertEqual(preview['examples'], ['X12'])
+        self.assertFalse(preview['valid'])
+
+        pd.testing.assert_frame_equal(ColumnStore(self.dataset.storage_path).read(), before)
+        self.assertEqual(self.dataset.column_types.get(column_name='code').user_modified_type, 'Text')
+
+    def test_dry_run_finds_the_value_a_date_conversion_gives_up_on(self):
+        preview = self.override(column='when', new_type='Date', dry_run=True).json()
+        self.assertEqual((preview['failed'], preview['examples']), (1, ['soon']))
+
+        preview = self.override(column='when', new_type='Category', dry_run=True).json()
+        self.assertTrue(preview['valid'])
+
+    def test_sampled_preview_estimates_failures(self):
+        col = pd.Series([str(i) for i in range(10000)] + ['bad'] * 100, dtype=object)
+        preview = utils.preview_override(col, 'Decimal', sample_size=300)
+        self.assertEqual(preview['sample_size'], 300)
+        self.assertEqual(preview['examples'], ['bad'])
+        self.assertLess(preview['estimated_failures'], 1000)
+
+    def test_invalid_type_in_dry_run(self):
+        response = self.override(column='code', new_type='int', dry_run=True)
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('error', response.json())
+
+    def test_override_converts_once(self):
+        with mock.patch.object(utils, 'convert_to_datetime', wraps=utils.convert_to_datetime) as convert:
+            response = self.override(column='when', new_type='Date')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(convert.call_count, 1)
+
+    def test_failed_write_rolls_back_the_column_type(self):
+        with mock.patch.object(ColumnStore, '_write_part', side_effect=OSError('disk full')):
+            response = self.override(column='code', new_type='Category')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.dataset.column_types.get(column_name='code').user_modified_type, 'Text')
@@ -0,0 +1,52 @@
+from django.test import TestCase, override_settings
+from data.parallel import worker_pool
+from data.utils import infer_and_convert_data_types
+
+import numpy as np
+import pandas as pd
+
+
+class ParallelInferenceTestCase(TestCase):
+
+    def create_frame(self):
+        return pd.DataFrame({
+            'ints': [1, 2, 3, 4, 5, 6],
+            'floats': [1.5, np.nan, 2.5, 3.0, 4.0, 5.5],
+            'bools': ['yes', 'no', 'true', 'false', '1', '0'],
+            'numbers': ['1,000', '2,500.5', '-3', '5%', None, '7'],
+            'dates': ['2023-01-01', '2023-03-15', None, '2023-05-20', '2023-06-01', '2023-07-04'],
+            'durations': ['1 day', '3 days', '6 hours', np.nan, '2 days', '4 days'],
+            'complex': ['1+2j', '3-4j', '5+6j', '7+8j', '9+1j', '2+3j'],
+            'category': ['A', 'B', 'A', 'A', 'B', 'A'],
+            'text': ['alpha', np.nan, 'gamma', 'delta', 'epsilon', 'zeta'],
+            'mixed': ['two', 1, 3.0, np.nan, 'five', 6],
+        })
+
+    def test_parallel_matches_serial(self):
+        serial_report, parallel_report = {}, {}
+        with override_settings(INFERENCE_WORKERS=1):
+            serial = infer_and_convert_data_types(self.create_frame(), report=serial_report)
+        with override_settings(INFERENCE_WORKERS=2, PARALLEL_MIN_CELLS=0):
+            parallel = infer_and_convert_data_types(self.create_frame(), report=parallel_report)
+
+        pd.testing.assert_frame_equal(parallel, serial)
+        self.assertEqual(parallel_report, serial_report)
+        self.assertEqual(list(parallel.columns), list(self.create_frame().columns))
+
+    @override_settings(INFERENCE_WORKERS=2, PARALLEL_MIN_CELLS=1000)
+    def test_small_frames_stay_serial(self):
+        df = infer_and_convert_data_types(self.create_frame())
+        self.assertEqual(str(df['floats'].dtype), 'float64')
+
+    @override_settings(INFERENCE_WORKERS=2, PARALLEL_MIN_CELLS=0)
+    def test_uploads_share_one_pool_that_is_not_forked(self):
+        infer_and_convert_data_types(self.create_frame())
+        pool = worker_pool(2)
+        self.assertNotEqual(pool._mp_context.get_start_method(), 'fork')
+        infer_and_convert_data_types(self.create_frame())
+        self.assertIs(worker_pool(2), pool)
+
+    @override_settings(INFERENCE_WORKERS=2, PARALLEL_MIN_CELLS=0, DURATION_MONTH_DAYS=30)
+    def test_workers_use_the_settings_of_the_upload(self):
+        df = infer_and_convert_data_types(pd.DataFrame({'wait': ['1 month', '2 months'], 'other': ['a', 'b']}))
+        self.assertEqual(df['wait'].tolist(), [pd.Timedelta(days=30), pd.Timedelta(days=60)])
@@ -0,0 +1,89 @@
+import json
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.utils import serialise_dataframe, serialise_dataframe_columnar, dumps_json
+
+import numpy as np
+import pandas as pd
+
+
+class DatasetRowsTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(PROCESSED_DATA_ROOT=self.storage_root, ROWS_DEFAULT_LIMIT=5)
+        self.settings_override.enable()
+
+        data = pd.DataFrame({
+            'number': range(12),
+            'date': pd.date_range('2023-01-01', periods=12).strftime('%Y-%m-%d'),
+            'label': ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta', 'iota', 'kappa', 'lambda', 'mu'],
+        })
+        file = SimpleUploadedFile('rows_test.csv', data.to_csv(index=False).encode('utf-8'), content_type='text/csv')
+        self.upload = self.client.post(reverse('data:file_upload'), {'datafile': file}).json()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def test_upload_returns_schema_and_first_page(self):
+        self.assertEqual(self.upload['row_count'], 12)
+        self.assertEqual(len(self.upload['processed_data']), 5)
+        self.assertEqual([col['column'] for col in self.upload['columns_with_types']], ['number', 'date', 'label'])
+
+    def test_rows_endpoint_slices_and_projects(self):
+        url = reverse('data:rows', args=[self.upload['dataset_id']])
+        response = self.client.get(url, {'offset': 10, 'limit': 5, 'columns': 'label,date'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['processed_data'], [
+            {'label': 'lambda', 'date': '2023-01-11 00:00:00'},
+            {'label': 'mu', 'date': '2023-01-12 00:00:00'},
+        ])
+
+    def test_rows_endpoint_columnar_orient(self):
+        url = reverse('data:rows', args=[self.upload['dataset_id']])
+        response = self.client.get(url, {'offset': 10, 'columns': 'number,label', 'orient': 'columns'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['processed_data'], {
+            'columns': ['number', 'label'],
+            'data': {'number': [10, 11], 'label': ['lambda', 'mu']},
+        })
+
+    def test_rows_endpoint_rejects_bad_requests(self):
+        url = reverse('data:rows', args=[self.upload['dataset_id']])
+        self.assertEqual(self.client.get(url, {'limit': 'ten'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'limit': 5000}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'columns': 'missing'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'orient': 'index'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('data:rows', args=[0])).status_code, 404)
+
+
+class ColumnarSerialisationTestCase(TestCase):
+
+    def test_columnar_payload_matches_records(self):
+        df = pd.DataFrame({
+            'ints': [1, 2, 3],
+            'floats': [1.5, np.nan, 3.0],
+            'dates': pd.to_datetime(['2023-01-01', None, '2023-01-03']),
+            'durations': pd.to_timedelta(['1 day', None, '90 seconds']),
+            'category': pd.Series(['a', None, 'b'], dtype='category'),
+            'text': ['x', None, 'z'],
+            'complex': [1 + 2j, np.nan, 3j],
+            'flags': [True, False, True],
+        })
+        payload = json.loads(dumps_json(serialise_dataframe_columnar(df)))
+        self.assertEqual(payload['data'], {
+            'ints': [1, 2, 3],
+            'floats': [1.5, 'N/A', 3.0],
+            'dates': ['2023-01-01 00:00:00', 'N/A', '2023-01-03 00:00:00'],
+            'durations': [86400.0, 'N/A', 90.0],
+            'category': ['a', 'N/A', 'b'],
+            'text': ['x', 'N/A', 'z'],
+            'complex': ['(1+2j)', 'N/A', '3j'],
+            'flags': [True, False, True],
+        })
+        records = [dict(zip(payload['columns'], row)) for row in zip(*payload['data'].values())]
+        self.assertEqual(records, serialise_dataframe(df))
@@ -0,0 +1,71 @@
+import json
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from data.compaction import compact_dtypes
+from data.models import Dataset
+from data.storage import ColumnStore
+from data.utils import infer_and_convert_data_types
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingUploadTestCase(TestCase):
+
+    def setUp(self):
+        self.storage_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(STREAMING_UPLOAD_MIN_BYTES=0, STREAMING_CHUNK_ROWS=4, PROCESSED_DATA_ROOT=self.storage_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+
+    def create_frame(self):
+        return pd.DataFrame({
+            'ints': range(10),
+            'floats': [1.5, 2.0, 3.0, 4.0, np.nan, 6.0, 7.0, 8.0, 9.0, 10.0],
+            'late_text': ['1', '2', '3', '4', '5', '6', '7', '8', 'nine', '10'],
+            'dates': ['2023-01-01', '2023-01-02', None, '2023-01-04', '2023-01-05', '2023-01-06', '2023-01-07', '2023-01-08', '2023-01-09', '2023-01-10'],
+            'late_duration': ['', '', '', '', '', '', '', '', '3 days', '4 days'],
+            'category': ['A', 'B'] * 5,
+            'flags': ['yes', 'no'] * 5,
+        })
+
+    def upload(self, df):
+        file = SimpleUploadedFile('stream_test.csv', df.to_csv(index=False).encode('utf-8'), content_type='text/csv')
+        return self.client.post(reverse('data:file_upload'), {'datafile': file})
+
+    def test_streamed_upload_matches_in_memory_processing(self):
+        df = self.create_frame()
+        response = self.upload(df)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['row_count'], 10)
+
+        dataset = Dataset.objects.latest('id')
+        stored = ColumnStore(dataset.storage_path).read()
+        expected = compact_dtypes(infer_and_convert_data_types(pd.read_csv(dataset.original_file.path)))
+        pd.testing.assert_frame_equal(stored, expected)
+        self.assertEqual(dataset.column_types.get(column_name='late_text').user_modified_type, 'Text')
+
+    def test_override_on_streamed_dataset_rewrites_one_column(self):
+        self.upload(self.create_frame())
+        dataset = Dataset.objects.latest('id')
+        shared_path = dataset.storage_path
+        store = ColumnStore(shared_path)
+        untouched = store.manifest['columns'][0]['directory']
+
+        data = {'column': 'floats', 'new_type': 'Text'}
+        response = self.client.post(reverse('data:override'), json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        # The store is shared with the upload cache, so the dataset gets its own copy before the rewrite
+        dataset.refresh_from_db()
+        self.assertNotEqual(dataset.storage_path, shared_path)
+        store = ColumnStore(dataset.storage_path)
+        self.assertEqual(store.read_column('floats').tolist()[:2], ['1.5', '2.0'])
+        self.assertEqual(store.manifest['columns'][0]['directory'], untouched)
+        self.assertEqual(ColumnStore(shared_path).read_column('floats').tolist()[:2], [1.5, 2.0])
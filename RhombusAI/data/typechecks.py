@@ -5,32 +5,22 @@ import traceback
 from dateutil import parser
 from dateutil.parser import ParserError
 
-def is_timedelta(column):
-    """
-    Checks if a column contains text representing time durations.
-
-    Parameters:
-    - column (pd.Series): The column to check.
-
-    Returns:
-    - bool: True if the column contains text representing time durations, False otherwise.
-    """
-    patterns = [
-        r'\d+\s*years?',
-        r'\d+\s*months?',
-        r'\d+\s*weeks?',
-        r'\d+\s*days?',
-        r'\d+\s*hours?',
-        r'\d+\s*minutes?',
-        r'\d+\s*seconds?',
-    ]
-    
-    for pattern in patterns:
-        if column.str.contains(pattern, case=False, regex=True).any():
-            return True
-    
-    return False
-
+# Whole-value patterns shared by the per-value predicates below, the vectorised inference engine and the
+# value classifier (see data/classifier.py). The predicates use the versions compiled once at import.
+NUMBER_PATTERN = r'-?\d+(?:\.\d+)?%?'
+CURRENCY_PATTERN = r'-?\d+(?:\.\d+)?|[a-zA-Z]{3} \d+(?:\.\d+)?'
+# Inference only reads the 'j' suffix, so text such as model names ('320i') stays text; a conversion
+# also reads 'i' (see data/complex_numbers.py)
+COMPLEX_SUFFIX = 'j'
+COMPLEX_PATTERN = r'(?:[+-]?[\d.]+)?[+-]?[\d.]+j'
+TIMEDELTA_PATTERN = r'\b\d+\s*(?:years?|months?|weeks?|days?|hours?|minutes?|seconds?)\b'
+NON_DATE_PATTERN = r'^\d+$|^-?\d+(?:.\d+)?$'
+
+NUMBER_RE = re.compile(NUMBER_PATTERN)
+CURRENCY_RE = re.compile(f'(?:{CURRENCY_PATTERN})$')
+COMPLEX_RE = re.compile(COMPLEX_PATTERN)
+TIMEDELTA_RE = re.compile(TIMEDELTA_PATTERN, re.IGNORECASE)
+NON_DATE_RE = re.compile(NON_DATE_PATTERN)
 
 def is_category(col: pd.Series, max_unique_ratio=0.5):
     """
@@ -51,24 +41,6 @@ def is_category(col: pd.Series, max_unique_ratio=0.5):
             return True
     return False
 
-def is_complex(col: pd.Series):
-    """
-    Checks if the given pandas Series contains complex number data.
-
-    Parameters:
-    - col (pd.Series): The pandas Series to check.
-
-    Returns:
-    - bool: True if the Series contains complex numbers, False otherwise.
-    """
-    try:
-        for value in col.dropna():
-            complex(value)  # Attempt to convert each value to complex
-    except (ValueError, TypeError):
-        return False
-    return True
-
-
 def is_complex(val):
     """
     Determines whether a given value represents a complex number.
@@ -88,9 +60,9 @@ def is_complex(val):
     if isinstance(val, complex):
         return True
     if isinstance(val, str):
-        # Match strings that are in the form of a complex number (a + bi)
-        match = re.match(r'^([+-]?[\d.]+)?([+-]?[\d.]+j)$', val.strip().replace(' ', ''))
-        return bool(match)
+        # Only a value ending in 'j' can match, so other strings are turned down without the pattern
+        val = val.strip()
+        return val.endswith(COMPLEX_SUFFIX) and COMPLEX_RE.fullmatch(val.replace(' ', '')) is not None
     return False
 
 
@@ -109,17 +81,8 @@ def is_timedelta(string):
     Returns:
     - bool: True if the string contains time duration patterns, False otherwise.
     """
-    # Patterns for different time units
-    patterns = [
-        r'\b\d+\s*years?\b',
-        r'\b\d+\s*months?\b',
-        r'\b\d+\s*weeks?\b',
-        r'\b\d+\s*days?\b',
-        r'\b\d+\s*hours?\b',
-        r'\b\d+\s*minutes?\b',
-        r'\b\d+\s*seconds?\b',
-    ]
-    return any(re.search(pattern, string, re.IGNORECASE) for pattern in patterns)
+    # One alternation over the time units, e.g. '3 days' or '1hour'
+    return TIMEDELTA_RE.search(string) is not None
 
 def looks_like_number(val):
     """
@@ -141,11 +104,9 @@ def looks_like_number(val):
         return True
     if isinstance(val, str):
         val = val.replace(',', '').strip()
-        # Check for a percentage at the end of the string and remove it
-        if val.endswith('%'):
-            val = val[:-1]
-        # This regex will match any string that represents an int or float, negative or positive
-        if re.match(r'^-?\d+(?:\.\d+)?$', val):
+        # This regex will match any string that represents an int or float, negative or positive,
+        # optionally followed by a percentage sign
+        if NUMBER_RE.fullmatch(val):
             return True
     return False
 
@@ -166,6 +127,6 @@ def looks_like_currency(val):
     if pd.isna(val):
         return False
     # This regex matches currency patterns like "50", "-40", or "EUR 40.00"
-    if re.match(r'^-?\d+(?:\.\d+)?$', val) or re.match(r'^[a-zA-Z]{3} \d+(?:\.\d+)?$', val):
+    if CURRENCY_RE.match(val):
         return True
     return False
\ No newline at end of file
@@ -8,4 +8,11 @@ app_name = 'data'
 urlpatterns = [
     path('upload/', views.upload_file, name='file_upload'),
     path('override/', views.override_data_type, name='override'),
+    path('override/batch/', views.override_data_types, name='override_batch'),
+    path('<int:dataset_id>/override/', views.override_data_type, name='dataset_override'),
+    path('<int:dataset_id>/override/batch/', views.override_data_types, name='dataset_override_batch'),
+    path('<int:dataset_id>/rows/', views.dataset_rows, name='rows'),
+    path('<int:dataset_id>/append/', views.append_rows, name='append'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,15 +1,30 @@
 import re
+import json
+import logging
+import datetime
 import pandas as pd
 import numpy as np
-import traceback
 from dateutil import parser
 from dateutil.parser import ParserError
-from .conversions import is_allowed_none, convert_to_boolean, convert_to_categorical, convert_to_datetime, convert_to_numeric, convert_to_timedelta, convert_to_complex, looks_like_number
-from .typechecks import is_category, is_complex, is_timedelta, looks_like_currency, looks_like_number
-from .data_handling import normalise_boolean, parse_mixed_data, can_parse_date, preprocess_for_float_conversion
-from django.db.models import Max
+from .conversions import is_allowed_none, convert_to_boolean, convert_to_categorical, convert_to_datetime, convert_to_numeric, convert_to_timedelta, convert_to_complex
+from .typechecks import is_category
+from .data_handling import parse_mixed_data, preprocess_for_float_conversion
+from .complex_numbers import parse_complex
+from .durations import parse_durations
 from .models import Dataset, ColumnType
-from django.db.models import Max
+from .inference import infer_data_type_legacy, infer_data_type_vectorised, stratified_sample, label_confidence
+from .parallel import infer_and_convert_parallel
+from .metrics import column_stage
+from .encoding import transform_unique
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 column_type_overrides = {}
 
@@ -17,9 +32,9 @@ def infer_data_type(col):
     """
     Infers the most likely data type of a given pandas Series by analyzing its contents.
 
-    The function checks for specific patterns and types within the series, such as boolean values,
-    complex numbers, numeric values, currencies, time durations, dates, categories, and textual data.
-    It preprocesses the data to normalize boolean values and clean numeric and textual representations.
+    The inference engine is selected with the INFERENCE_ENGINE setting: 'vectorised' (the default)
+    classifies whole columns with pandas string accessors, while 'legacy' runs the original
+    per-value predicates. Both engines return the same labels.
 
     Parameters:
     - col (pd.Series): A pandas Series whose data type is to be inferred.
@@ -27,65 +42,103 @@ def infer_data_type(col):
     Returns:
     - str: A string representing the inferred data type, such as 'Boolean', 'Decimal', 'Date', etc.
     """
-    # Preprocess column, removing commas and converting to None types as needed
-    col_normalised_bool = col.apply(normalise_boolean)
-    if pd.api.types.is_bool_dtype(col_normalised_bool):
-        return 'Boolean'
-    
-    col_cleaned = col.apply(lambda x: x.replace(',', '').strip() if isinstance(x, str) else x)
-    col_cleaned = col_cleaned.apply(lambda x: None if is_allowed_none(x) else x)
+    if getattr(settings, 'INFERENCE_ENGINE', 'vectorised') == 'legacy':
+        return infer_data_type_legacy(col)
+    return infer_data_type_vectorised(col)
 
-    print(f"Cleaned {col.name}:", col_cleaned.tolist())  # Debug print statement
-    if all(isinstance(x, bool) for x in col_cleaned.dropna()):
-        return 'Boolean'
-    if any(is_complex(x) for x in col_cleaned.dropna()):
-        return 'Complex Number'
-    if all(looks_like_number(x) for x in col_cleaned.dropna()):
-        return 'Decimal'
-    if all(looks_like_currency(x) for x in col_cleaned.dropna()):
-        return 'Decimal'
-    if any(is_timedelta(str(x)) for x in col.dropna()):
-        return 'Time Duration'
-    if any(can_parse_date(str(x)) for x in col.dropna()):
-        return 'Date'
-    if len(set(col.dropna())) < len(col.dropna()) / 2:
-        return 'Category'
-    if all(isinstance(x, str) for x in col.dropna()):
-        return 'Text'
 
-    return 'Text'
+def infer_column_type(col):
+    """
+    Infers the data type of a column and scores how confidently the values support it.
+
+    With INFERENCE_MODE set to 'sampled', columns longer than INFERENCE_SAMPLE_SIZE are first
+    classified from a stratified sample of head, tail and random rows. The sample result is kept
+    only when all three strata agree and its confidence reaches INFERENCE_CONFIDENCE_THRESHOLD;
+    otherwise the full column is scanned. In 'full' mode every column is scanned in full and the
+    confidence is scored on a sample.
 
+    Parameters:
+    - col (pd.Series): A pandas Series whose data type is to be inferred.
+
+    Returns:
+    - dict: The inferred 'data_type' label, its 'confidence' (0 to 1) and whether it was decided
+      from a sample ('sampled').
+    """
+    sample_size = getattr(settings, 'INFERENCE_SAMPLE_SIZE', 3000)
+    threshold = getattr(settings, 'INFERENCE_CONFIDENCE_THRESHOLD', 0.95)
+    sample = pd.concat(stratified_sample(col, sample_size)) if len(col) > sample_size else col
 
+    if getattr(settings, 'INFERENCE_MODE', 'full') == 'sampled' and len(col) > sample_size:
+        strata_types = {infer_data_type(part) for part in stratified_sample(col, sample_size)}
+        data_type = infer_data_type(sample)
+        confidence = label_confidence(sample, data_type)
+        if strata_types == {data_type} and confidence >= threshold:
+            return {'data_type': data_type, 'confidence': confidence, 'sampled': True}
 
-def infer_and_convert_data_types(df):
+    data_type = infer_data_type(col)
+    return {'data_type': data_type, 'confidence': label_confidence(sample, data_type), 'sampled': False}
+
+
+def infer_and_convert_data_types(df, report=None, progress=None):
     """
     Iterates through each column of a DataFrame, infers its data type, and converts it to a more
     specific type where applicable. This can help in optimizing memory usage and ensuring data
     integrity by enforcing consistent data types across the DataFrame.
 
+    Frames with at least PARALLEL_MIN_CELLS cells are processed across INFERENCE_WORKERS worker
+    processes; smaller frames, or a single configured worker, use the serial loop. The time spent on
+    each column is recorded in the per-type metrics (see data/metrics.py).
+
     Parameters:
     - df (pd.DataFrame): The DataFrame whose columns are to be analyzed and converted.
+    - report (dict, optional): If given, filled with the result of `infer_column_type` for each column.
+    - progress (function, optional): Called as `progress(column, 1.0)` once each column is converted.
 
     Returns:
     - pd.DataFrame: The same DataFrame with its columns converted to the inferred data types.
     """
+    workers = getattr(settings, 'INFERENCE_WORKERS', 1)
+    if workers > 1 and len(df.columns) > 1 and df.size >= getattr(settings, 'PARALLEL_MIN_CELLS', 500000):
+        return infer_and_convert_parallel(df, workers, report, progress)
+
     for col in df.columns:
-        dtype = infer_data_type(df[col])
-        if dtype == 'Decimal':
-            df[col] = convert_to_numeric(df, col)
-        elif dtype == 'Date':
-            df[col] = convert_to_datetime(df, col)
-        elif dtype == 'Time Duration':
-            df[col] = convert_to_timedelta(df, col)
-        elif dtype == 'Complex Number':
-            df[col] = convert_to_complex(df, col)
-        elif dtype == 'Boolean':
-            df[col] = convert_to_boolean(df, col)
-        elif dtype == 'Category':
-            df[col] = df[col].astype('category')
+        with column_stage(col, len(df)) as record:
+            inference = infer_column_type(df[col])
+            df[col] = convert_column(df, col, inference['data_type'])
+            record['data_type'] = inference['data_type']
+        if report is not None:
+            report[col] = inference
+        if progress is not None:
+            progress(col, 1.0)
     
     return df
 
+def convert_column(df, col, data_type):
+    """
+    Converts a column of a DataFrame to the pandas dtype matching an inferred data type label.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame containing the column to convert.
+    - col (str): The name of the column to convert.
+    - data_type (str): The inferred data type label, such as 'Decimal' or 'Date'.
+
+    Returns:
+    - pd.Series: The converted column, or the original column for labels that need no conversion.
+    """
+    if data_type == 'Decimal':
+        return convert_to_numeric(df, col)
+    elif data_type == 'Date':
+        return convert_to_datetime(df, col)
+    elif data_type == 'Time Duration':
+        return convert_to_timedelta(df, col)
+    elif data_type == 'Complex Number':
+        return convert_to_complex(df, col)
+    elif data_type == 'Boolean':
+        return convert_to_boolean(df, col)
+    elif data_type == 'Category':
+        return df[col].astype('category')
+    return df[col]
+
 def get_user_friendly_dtype(dtype):
     """
     Converts a pandas data type object into a more user-friendly string representation that is easier
@@ -99,7 +152,7 @@ def get_user_friendly_dtype(dtype):
     'Complex Number', 'Time Duration', 'Boolean', 'Date', 'Category', or 'Text'.
     """
     dtype_name = str(dtype)
-    if dtype_name.startswith('int') or dtype_name.startswith('uint'):
+    if dtype_name.startswith(('int', 'uint', 'Int', 'UInt')):
         return 'Integer'
     elif dtype_name.startswith('float'):
         return 'Decimal'
@@ -110,7 +163,9 @@ def get_user_friendly_dtype(dtype):
     else:
         return {
             'object': 'Text',
+            'string': 'Text',
             'bool': 'Boolean',
+            'boolean': 'Boolean',
             'datetime64[ns]': 'Date',
             'category': 'Category',
         }.get(dtype_name, dtype_name)  # Default to original if no match found
@@ -122,29 +177,133 @@ def serialise_dataframe(df):
     converting date and time types to strings, handling NaN and NaT values, and ensuring categorical
     data is represented accurately.
 
+    The values are prepared column by column by `serialise_dataframe_columnar`; only the final
+    regrouping into rows happens per row.
+
     Parameters:
     - df (pd.DataFrame): The DataFrame to serialize.
 
     Returns:
     - list: A list of dictionaries, each representing a row in the DataFrame, ready for JSON serialization.
     """
-    df = df.copy()
-    for column in df.columns:
-        dtype = df[column].dtype
-        if pd.api.types.is_datetime64_any_dtype(dtype):
-            df[column] = df[column].dt.strftime('%Y-%m-%d %H:%M:%S').replace(pd.NaT, "N/A")
-        elif pd.api.types.is_timedelta64_dtype(dtype):
-            df[column] = df[column].apply(lambda x: x.total_seconds() if pd.notnull(x) else "N/A")
-        elif pd.api.types.is_categorical_dtype(dtype) or pd.api.types.is_object_dtype(dtype):
-            df[column] = df[column].astype(str).replace({'nan': "N/A", 'None': "N/A"})
-        elif pd.api.types.is_complex_dtype(dtype):
-            df[column] = df[column].apply(lambda x: str(x) if pd.notnull(x) else "N/A")
+    payload = serialise_dataframe_columnar(df)
+    columns = payload['columns']
+    values = [_to_list(payload['data'][column]) for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
 
-        else:
-            # Convert NaN values to None, which will be serialised as null in JSON
-            df[column] = df[column].apply(lambda x: 'N/A' if pd.isnull(x) else x)
-    
-    return df.to_dict(orient='records')
+def serialise_dataframe_columnar(df):
+    """
+    Converts a pandas DataFrame into a column-oriented structure ready for JSON serialization, using
+    the same formatting rules as `serialise_dataframe`: dates become 'YYYY-MM-DD HH:MM:SS' strings,
+    durations become seconds, categorical, object and complex values become strings, and every
+    missing value becomes "N/A".
+
+    Every column is formatted with vectorised pandas operations and a single null mask. Numeric and
+    boolean columns without missing values are returned as NumPy arrays, which `dumps_json` encodes
+    without creating a Python object per value.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame to serialize.
+
+    Returns:
+    - dict: {'columns': [names], 'data': {name: values}}, where values is a list or a NumPy array.
+    """
+    return {
+        'columns': list(df.columns),
+        'data': {column: _serialise_column(df[column]) for column in df.columns},
+    }
+
+def dumps_json(payload):
+    """
+    Encodes a payload holding lists and NumPy arrays (e.g. from `serialise_dataframe_columnar`) as JSON.
+
+    orjson is used when installed, serialising NumPy arrays natively; otherwise the standard library
+    encoder is used with the arrays converted to lists.
+
+    Parameters:
+    - payload: The object to encode.
+
+    Returns:
+    - bytes: The UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=_json_default)
+    return json.dumps(payload, cls=DjangoJSONEncoder, default=_json_default).encode('utf-8')
+
+def _serialise_column(series):
+    dtype = series.dtype
+    missing = series.isna().to_numpy()
+    if dtype == np.dtype('datetime64[ns]'):
+        # NumPy formats naive timestamps as fixed-width 'YYYY-MM-DDTHH:MM:SS' strings; swap the 'T' in place
+        strings = np.datetime_as_string(series.to_numpy(), unit='s').astype('U19')
+        strings.view('U1').reshape(-1, 19)[:, 10] = ' '
+        values = strings.astype(object)
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object)
+    elif pd.api.types.is_timedelta64_dtype(dtype):
+        # Timedelta.total_seconds() works in whole microseconds
+        values = series.dt.floor('us').dt.total_seconds().to_numpy(dtype=object)
+    elif isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(dtype):
+        # Text columns keep the string forms of their missing values, except 'nan', 'None' and '<NA>'
+        values = series.astype(str)
+        missing = values.isin(['nan', 'None', '<NA>']).to_numpy()
+        values = values.to_numpy(dtype=object)
+    elif isinstance(dtype, pd.StringDtype):
+        values = series.to_numpy(dtype=object)
+        missing |= series.isin(['nan', 'None', '<NA>']).to_numpy(dtype=bool, na_value=False)
+    elif pd.api.types.is_complex_dtype(dtype):
+        values = series.astype(str).to_numpy(dtype=object)
+    elif not missing.any() and isinstance(dtype, np.dtype) and dtype.kind in 'biuf' and dtype != np.float16:
+        return series.to_numpy()
+    else:
+        values = series.to_numpy(dtype=object)
+    values[missing] = 'N/A'
+    return values.tolist()
+
+def _to_list(values):
+    return values.tolist() if isinstance(values, np.ndarray) else values
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def override_conversions(df):
+    """
+    Returns the conversion applied to a column of a DataFrame for each data type a user can override it to.
+
+    Parameters:
+    - df (pd.DataFrame): The DataFrame holding the columns to convert.
+
+    Returns:
+    - dict: A function per data type label, taking a column name and returning the converted column. A
+      function raises if the column cannot be converted.
+    """
+    return {
+        'Date': lambda col: convert_to_datetime(df, col),
+        'Integer': lambda col: pd.to_numeric(df[col], errors='raise').astype('Int64'),
+        'Decimal': lambda col: convert_to_numeric(df, col),  # Using convert_to_numeric for Decimal as well
+        'Time Duration': lambda col: parse_durations(df[col], errors='raise'),
+        'Boolean': lambda col: convert_to_boolean(df, col),
+        'Complex Number': lambda col: transform_unique(df[col], lambda uniques: parse_complex(uniques, errors='raise')),
+        'Category': lambda col: convert_to_categorical(df, col, is_category),
+        'Text': lambda col: df[col].astype(str)
+    }
+
+# Python types of the converted values for each override; None accepts any value
+OVERRIDE_VALUE_TYPES = {
+    'Date': datetime.datetime,
+    'Integer': (int, np.integer),
+    'Decimal': (int, float, np.number),
+    'Time Duration': datetime.timedelta,
+    'Boolean': (bool, np.bool_),
+    'Complex Number': (complex, np.complexfloating),
+    'Category': None,
+    'Text': None,
+}
+
+# Number of failing values returned as examples by preview_override
+OVERRIDE_PREVIEW_EXAMPLES = 5
 
 def override_data(df, column, new_type):
     """
@@ -152,6 +311,9 @@ def override_data(df, column, new_type):
     specified type. This can be useful for data cleaning and preparation, especially if the
     initial data type inference was incorrect or suboptimal.
 
+    The column is converted once: the result replaces the column if the conversion succeeds, and the
+    column is left as it was if the conversion raises. Use `preview_override` to check a sample first.
+
     Parameters:
     - df (pd.DataFrame): The DataFrame containing the column to be converted.
     - column (str): The name of the column whose data type is to be overridden.
@@ -161,50 +323,121 @@ def override_data(df, column, new_type):
     - tuple: A tuple containing a boolean indicating whether the conversion was successful, and a
              string message with details about the conversion outcome.
     """
-    print(f"Attempting to override column '{column}' to new type '{new_type}'.")
+    logger.info("Attempting to override column '%s' to new type '%s'.", column, new_type)
     try:
-        conversion_functions = {
-            'Date': lambda col: convert_to_datetime(df, col),
-            'Integer': lambda col: pd.to_numeric(df[col], errors='raise').astype('Int64'),
-            'Decimal': lambda col: convert_to_numeric(df, col),  # Using convert_to_numeric for Decimal as well
-            'Time Duration': lambda col: pd.to_timedelta(df[col], errors='raise'),
-            'Boolean': lambda col: convert_to_boolean(df, col),
-            'Complex Number': lambda col: df[col].apply(lambda x: complex(x) if pd.notna(x) else x),
-            'Category': lambda col: convert_to_categorical(df, col, is_category),  # Note: Ensure you have an is_category function defined
-            'Text': lambda col: df[col].astype(str)
-        }
+        conversion_functions = override_conversions(df)
 
         if new_type in conversion_functions:
-            # Check if all values can be converted without error
-            if can_convert(column, conversion_functions[new_type]):
-                df[column] = conversion_functions[new_type](column)
-                global column_type_overrides
-                column_type_overrides[column] = new_type
-                return True, f"Data type overridden successfully to {new_type}."
-            else:
+            try:
+                converted = conversion_functions[new_type](column)
+            except ValueError as e:
+                # Conversions raise ValueError with the reason, e.g. the values that are not boolean tokens
+                logger.info("Cannot convert column '%s' to '%s'", column, new_type, exc_info=True)
+                return False, f"Cannot convert from {column} to {new_type}, operation aborted. {e}"
+            except Exception:
+                logger.info("Cannot convert column '%s' to '%s'", column, new_type, exc_info=True)
                 return False, f"Cannot convert from {column} to {new_type}, operation aborted."
+            df[column] = converted
+            global column_type_overrides
+            column_type_overrides[column] = new_type
+            return True, f"Data type overridden successfully to {new_type}."
         else:
             return False, f"Invalid data type specified: {new_type}."
 
     except Exception as e:
-        traceback_str = traceback.format_exc()
-        print(traceback_str)
+        logger.exception("Error overriding column '%s' to '%s'", column, new_type)
         return False, str(e)
-    
-def can_convert(col, conversion_function):
+
+def preview_override(col, new_type, sample_size=None):
     """
-    Checks if the values in a pandas Series can be converted using a given conversion function without raising an error.
+    Checks how an override would go on a sample of a column, without changing the column.
+
+    The head, tail and random middle rows of the column (see `stratified_sample`) are converted the way
+    `override_data` converts the whole column. A value fails when the conversion cannot turn it into the
+    new type: it makes the conversion raise, is coerced to a missing value, or is left unconverted.
+    Missing values and allowed none tokens never fail. The number of failures over the whole column is
+    estimated from the random middle rows, counting the head and tail rows as they are.
 
     Parameters:
-    - col (pd.Series): The pandas Series to check.
-    - conversion_function (callable): The function to use for attempting the conversion.
+    - col (pd.Series): The column to check.
+    - new_type (str): The data type the column would be overridden to.
+    - sample_size (int, optional): The number of rows to check. Defaults to OVERRIDE_PREVIEW_SAMPLE_SIZE.
 
     Returns:
-    - bool: True if the conversion can be performed without errors, False otherwise.
+    - dict: The 'sample_size', the number of 'failed' sample values, the 'estimated_failures' over the
+      whole column, up to OVERRIDE_PREVIEW_EXAMPLES distinct failing 'examples', and whether the sample
+      is 'valid' (no value failed).
+
+    Raises:
+    - ValueError: If the data type is not one a column can be overridden to.
+    """
+    if new_type not in OVERRIDE_VALUE_TYPES:
+        raise ValueError(f"Invalid data type specified: {new_type}.")
+    sample_size = sample_size or getattr(settings, 'OVERRIDE_PREVIEW_SAMPLE_SIZE', 1000)
+    strata = stratified_sample(col, sample_size) if len(col) > sample_size else [col.iloc[:0], col, col.iloc[:0]]
+    sample = pd.concat(strata).reset_index(drop=True)
+
+    failed = _conversion_failures(sample, new_type).to_numpy(dtype=bool)
+    head, middle, tail = np.split(failed, [len(strata[0]), len(strata[0]) + len(strata[1])])
+    unsampled = len(col) - len(head) - len(tail)
+    estimated = head.sum() + tail.sum() + (middle.mean() * unsampled if len(middle) else 0)
+    failed_values = sample[failed]
+    return {
+        'sample_size': len(sample),
+        'failed': len(failed_values),
+        'estimated_failures': int(round(estimated)),
+        'examples': [str(value) for value in pd.unique(failed_values)[:OVERRIDE_PREVIEW_EXAMPLES]],
+        'valid': failed_values.empty,
+    }
+
+def _conversion_failures(col, new_type):
     """
+    Returns a boolean mask of the values of a column that an override to `new_type` cannot convert.
+
+    The distinct values are converted together. One bad value can make the whole conversion raise, or
+    give up and leave every value unconverted. The values that fail on their own are then found by
+    splitting the batch in halves, or for dates, where each conversion first detects the format, by
+    parsing each value as the conversion's fallback parser would.
+    """
+    codes, uniques = pd.factorize(col.astype(object), use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=object)
+    failed = _batch_failures(uniques, new_type)
+    if failed is None and new_type == 'Date':
+        failed = np.array([not is_allowed_none(value) and not _parses_as_date(value) for value in uniques], dtype=bool)
+    elif failed is None:
+        failed = _isolate_failures(uniques, new_type)
+    return pd.Series(failed[codes], index=col.index)
+
+def _isolate_failures(values, new_type):
+    middle = len(values) // 2
+    halves = [values.iloc[:middle], values.iloc[middle:]]
+    failed = [_batch_failures(half, new_type) for half in halves]
+    return np.concatenate([
+        half_failed if half_failed is not None else _isolate_failures(half, new_type)
+        for half, half_failed in zip(halves, failed)
+    ])
+
+def _batch_failures(values, new_type):
+    # Converts the values together, as override_data does; None if the conversion fails as a whole
+    values = values.reset_index(drop=True).rename('value')
+    missing = np.array([is_allowed_none(value) for value in values], dtype=bool)
+    try:
+        converted = override_conversions(values.to_frame())[new_type]('value')
+    except Exception:
+        return ~missing if len(values) == 1 else None
+
+    value_types = OVERRIDE_VALUE_TYPES[new_type]
+    if value_types is None:
+        return np.zeros(len(values), dtype=bool)
+    failed = ~missing & ~np.array([pd.notna(value) and isinstance(value, value_types) for value in converted], dtype=bool)
+    if len(values) > 1 and failed.any() and (failed | missing).all():
+        return None
+    return failed
+
+def _parses_as_date(value):
+    from .dates import parse_date
     try:
-        # Attempt conversion
-        conversion_function(col)
+        parse_date(str(value))
         return True
-    except:
+    except (ValueError, OverflowError):
         return False
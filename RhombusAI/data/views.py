@@ -1,54 +1,166 @@
 import json
-import pickle
-from django.http import JsonResponse
+import logging
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from .models import Dataset
-from .utils import infer_and_convert_data_types, override_data, get_user_friendly_dtype, serialise_dataframe
-import pandas as pd
-import traceback
+from django.db import transaction
+from .models import Dataset, ColumnType, ProcessingJob
+from .storage import ColumnStore
+from .processing import is_supported_file, process_dataset, dataset_response
+from .jobs import enqueue_dataset
+from .appending import append_to_dataset
+from .dedup import HashingUploadHandler, file_digest, sheet_digest, find_processed_upload, dataset_from_processed_upload, private_store
+from .excel import sheet_names
+from .utils import override_data, preview_override, serialise_dataframe, serialise_dataframe_columnar, dumps_json
+from .metrics import stage, render as render_metrics
 from django.core.serializers.json import DjangoJSONEncoder
 from django.core.files.base import ContentFile
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# The 'sheet' of an upload that processes every sheet of a workbook as its own dataset
+ALL_SHEETS = '*'
 
 @csrf_exempt
 def upload_file(request):
+    """
+    Processes an uploaded CSV file or Excel workbook ('datafile') into a new dataset.
+
+    The file is processed in the request, or by a background job with 'mode' set to 'async'. For a
+    workbook, 'sheet' names the sheet to read instead of the first one; with 'sheet' set to '*' every
+    sheet becomes its own dataset, processed by background jobs that run concurrently, and the response
+    lists the 'sheets' with their dataset and job.
+    """
     if request.method == 'POST':
+        # The upload is hashed while it streams in, before the request body is read
+        hasher = HashingUploadHandler(request)
+        request.upload_handlers.insert(0, hasher)
+
         datafile = request.FILES.get('datafile', None)
         if datafile is None:
             return JsonResponse({'error': 'No file provided.'}, status=400)
+        if not is_supported_file(datafile.name):
+            return JsonResponse({'error': 'Unsupported file format. Only .csv and .xlsx are supported.'}, status=400)
+
+        content_hash = hasher.digests.get('datafile') or file_digest(datafile)
+        sheet = request.POST.get('sheet') or None
+        if sheet is not None:
+            if not datafile.name.lower().endswith('.xlsx'):
+                return JsonResponse({'error': 'Sheets can only be chosen for Excel workbooks.'}, status=400)
+            try:
+                sheets = sheet_names(datafile)
+            except Exception as e:
+                return JsonResponse({'error': f'The workbook cannot be read: {e}'}, status=400)
+            finally:
+                datafile.seek(0)
+            if sheet == ALL_SHEETS:
+                return _upload_sheets(datafile, content_hash, sheets)
+            if sheet not in sheets:
+                return JsonResponse({'error': f"Worksheet named '{sheet}' not found.", 'sheets': sheets}, status=400)
+            content_hash = sheet_digest(content_hash, sheet)
+
+        # An identical file processed with the same settings is answered from the cache, in either mode
+        entry = find_processed_upload(content_hash)
+        if entry is not None:
+            try:
+                dataset = dataset_from_processed_upload(entry, datafile.name, sheet_name=sheet)
+                return JsonResponse({**dataset_response(dataset), 'cached': True})
+            except Exception as e:
+                logger.exception("Error reusing the processed upload of '%s'", datafile.name)
+                return JsonResponse({'error': str(e)}, status=500)
+
+        # The raw file is saved first; it is processed from disk either here or by a background job
+        dataset = Dataset(file_name=datafile.name, original_file=datafile, content_hash=content_hash, sheet_name=sheet)
+        dataset.save()
+
+        if request.POST.get('mode') == 'async':
+            job = enqueue_dataset(dataset)
+            return JsonResponse({'job_id': job.id, 'dataset_id': dataset.id, 'status': job.status}, status=202)
 
         try:
-            if str(datafile.name).lower().endswith('.csv'):
-                df = pd.read_csv(datafile)
-            elif str(datafile.name).lower().endswith('.xlsx'):
-                df = pd.read_excel(datafile)
+            store = process_dataset(dataset)
+            return JsonResponse(dataset_response(dataset, store))
+        except Exception as e:
+            logger.exception("Error processing upload '%s'", datafile.name)
+            dataset.original_file.delete(save=False)
+            dataset.delete()
+            return JsonResponse({'error': str(e)}, status=500)
+    else:
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+
+def _upload_sheets(datafile, content_hash, sheets):
+    """
+    Makes a dataset of every sheet of an uploaded workbook. Sheets processed before are answered from the
+    cache; the others share one saved copy of the workbook and are queued as background jobs.
+    """
+    results = []
+    saved_file = None
+    try:
+        for sheet in sheets:
+            key = sheet_digest(content_hash, sheet)
+            entry = find_processed_upload(key)
+            if entry is not None:
+                dataset = dataset_from_processed_upload(entry, datafile.name, sheet_name=sheet)
+                results.append({'sheet': sheet, 'dataset_id': dataset.id, 'job_id': None, 'status': ProcessingJob.SUCCEEDED, 'cached': True})
+                continue
+            dataset = Dataset(file_name=datafile.name, content_hash=key, sheet_name=sheet)
+            if saved_file is None:
+                dataset.original_file = datafile
             else:
-                return JsonResponse({'error': 'Unsupported file format. Only .csv and .xlsx are supported.'}, status=400)
-
-            processed_df = infer_and_convert_data_types(df)
-            processed_data_list = serialise_dataframe(processed_df)
-            processed_data_pkl = pickle.dumps(processed_df)
-            columns_with_types = [{'column': col, 'data_type': get_user_friendly_dtype(dtype)} for col, dtype in zip(processed_df.columns, processed_df.dtypes)]
-            # Serialize dataframe using pickle
-            processed_data_pkl = pickle.dumps(processed_df)
-            
-            # Save the uploaded data and column types to the database
-            dataset = Dataset(file_name=datafile.name, original_file=datafile)
-            dataset.processed_file_pkl = processed_data_pkl 
+                dataset.original_file.name = saved_file
             dataset.save()
+            saved_file = dataset.original_file.name
+            job = enqueue_dataset(dataset)
+            results.append({'sheet': sheet, 'dataset_id': dataset.id, 'job_id': job.id, 'status': job.status, 'cached': False})
+    except Exception as e:
+        logger.exception("Error queueing the sheets of '%s'", datafile.name)
+        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({'sheets': results}, status=202)
 
-            for col_name, dtype in zip(processed_df.columns, processed_df.dtypes):
-                user_friendly_type = get_user_friendly_dtype(dtype)
-                dataset.column_types.create(column_name=col_name, original_type=str(dtype), inferred_type=str(dtype), user_modified_type=user_friendly_type)
+def job_status(request, job_id):
+    """
+    Returns the status and per-column progress of a background upload job.
 
-            return JsonResponse({'processed_data': processed_data_list, 'columns_with_types': columns_with_types})
+    Once the job has succeeded the response also holds the schema and first page of the dataset, like
+    a synchronous upload.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+
+    job = ProcessingJob.objects.select_related('dataset').filter(id=job_id).first()
+    if job is None:
+        return JsonResponse({'error': 'Job not found.'}, status=404)
+
+    response = {
+        'job_id': job.id,
+        'dataset_id': job.dataset_id,
+        'status': job.status,
+        'progress': job.progress,
+        'column_progress': job.column_progress,
+        'error': job.error,
+    }
+    if job.status == ProcessingJob.SUCCEEDED:
+        try:
+            response.update(dataset_response(job.dataset))
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("Error reading the dataset of job %s", job.id)
             return JsonResponse({'error': str(e)}, status=500)
-    else:
-        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+    return JsonResponse(response)
+
+def _dataset_to_modify(dataset_id):
+    """
+    Returns the dataset an override addresses, and an error response if there is none.
+
+    The routes without a dataset id modify the most recently uploaded dataset.
+    """
+    if dataset_id is None:
+        dataset = Dataset.objects.order_by('-uploaded_at').first()
+        return dataset, None if dataset else JsonResponse({'error': 'No dataset available to modify.'}, status=400)
+    dataset = Dataset.objects.filter(id=dataset_id).first()
+    return dataset, None if dataset else JsonResponse({'error': 'Dataset not found.'}, status=404)
 
 @csrf_exempt
-def override_data_type(request):
+def override_data_type(request, dataset_id=None):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
@@ -56,40 +168,64 @@ def override_data_type(request):
             column = data.get('column')
             new_type = data.get('new_type')
 
-            # Get the most recent dataset
-            dataset = Dataset.objects.order_by('-uploaded_at').first()
+            dataset, error_response = _dataset_to_modify(dataset_id)
+            if error_response:
+                return error_response
+
+            if not dataset.storage_path:
+                return JsonResponse({'error': 'The dataset has no processed data to modify.'}, status=500)
 
-            if dataset is None:
-                return JsonResponse({'error': 'No dataset available to modify.'}, status=400)
+            # Only the affected column is loaded from the column store
+            store = ColumnStore(dataset.storage_path)
+            with stage('read_column', dataset_id=dataset.id, column=column) as record:
+                processed_df = store.read([column])
+                record['rows'] = len(processed_df)
 
-            # Deserialize dataframe from pickle
-            processed_df = pickle.loads(dataset.processed_file_pkl)
+            # A dry run converts a sample of the column and reports the values that would fail, without saving anything
+            if data.get('dry_run'):
+                try:
+                    with stage('override_preview', rows=len(processed_df), dataset_id=dataset.id, column=column, new_type=new_type):
+                        preview = preview_override(processed_df[column], new_type)
+                except ValueError as e:
+                    return JsonResponse({'error': str(e)}, status=500)
+                return JsonResponse({'dataset_id': dataset.id, 'column': column, 'new_type': new_type, 'dry_run': True, **preview})
 
             # Retrieve column types from the database
             column_types = dataset.column_types.all()
             column_types_dict = {col.column_name: col for col in column_types}
 
-            success, message = override_data(processed_df, column, new_type)
+            with stage('override', rows=len(processed_df), dataset_id=dataset.id, column=column, new_type=new_type):
+                success, message = override_data(processed_df, column, new_type)
 
             if success:
-                # Update column type in the database
                 column_obj = column_types_dict[column]
                 column_obj.user_modified_type = new_type
-                column_obj.save()
-
-                # Re-serialize and save updated dataframe
-                dataset.processed_file_pkl = pickle.dumps(processed_df)
-                dataset.save()
+                with transaction.atomic():
+                    # Update column type in the database
+                    column_obj.save()
+                    # Datasets uploaded from the same file share a store until one of them is modified
+                    store = private_store(dataset)
+                    # Rewrite only the overridden column, last, so a failed write rolls the column type back
+                    with stage('store_write', rows=len(processed_df), dataset_id=dataset.id, column=column):
+                        store.replace_column(column, [processed_df[column]])
+                processed_df = store.read(stop=settings.ROWS_DEFAULT_LIMIT)
 
                 # Update columns_with_types
                 columns_with_types = [
-                    {'column': col.column_name, 'data_type': col.user_modified_type or col.inferred_type}
+                    {
+                        'column': col.column_name,
+                        'data_type': col.user_modified_type or col.inferred_type,
+                        'confidence': col.confidence,
+                        'sampled': col.sampled,
+                    }
                     for col in column_types
                 ]
 
-                processed_data_list = serialise_dataframe(processed_df)
-                print(processed_data_list)
+                with stage('serialise', rows=len(processed_df), dataset_id=dataset.id):
+                    processed_data_list = serialise_dataframe(processed_df)
                 return JsonResponse({
+                    'dataset_id': dataset.id,
+                    'row_count': store.row_count,
                     'processed_data': processed_data_list,
                     'columns_with_types': columns_with_types,
                     'message': message  # Include success message
@@ -99,7 +235,173 @@ def override_data_type(request):
         except json.JSONDecodeError as e:
             return JsonResponse({'error': 'Invalid JSON.'}, status=400)
         except Exception as e:
-            traceback.print_exc()
+            logger.exception("Error overriding a column type")
             return JsonResponse({'error': str(e)}, status=500)
     else:
         return JsonResponse({'error': 'Method not allowed.'}, status=405)
+
+@csrf_exempt
+def override_data_types(request, dataset_id=None):
+    """
+    Overrides the data types of several columns of a dataset in one request.
+
+    The body holds a list of 'operations', each a {'column', 'new_type'} pair. The affected columns are
+    read once and converted in memory; only if every conversion succeeds are the column types saved and
+    the columns written back, in one transaction and one manifest update. Otherwise nothing changes.
+    Either way the response lists the outcome of each operation under 'results'.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+    try:
+        operations = json.loads(request.body).get('operations')
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({'error': 'Invalid JSON.'}, status=400)
+    if not isinstance(operations, list) or not operations or not all(
+        isinstance(op, dict) and op.get('column') and op.get('new_type') for op in operations
+    ):
+        return JsonResponse({'error': "operations must be a non-empty list of {column, new_type} objects."}, status=400)
+    columns = [op['column'] for op in operations]
+    if len(set(columns)) != len(columns):
+        return JsonResponse({'error': 'Each column can only be overridden once per request.'}, status=400)
+
+    dataset, error_response = _dataset_to_modify(dataset_id)
+    if error_response:
+        return error_response
+    if not dataset.storage_path:
+        return JsonResponse({'error': 'The dataset has no processed data to modify.'}, status=500)
+
+    try:
+        store = ColumnStore(dataset.storage_path)
+        unknown_columns = [col for col in columns if col not in store.columns]
+        if unknown_columns:
+            return JsonResponse({'error': f"Unknown columns: {', '.join(unknown_columns)}."}, status=400)
+
+        # The affected columns are loaded from the column store once
+        with stage('read_column', dataset_id=dataset.id, columns=len(columns)) as record:
+            processed_df = store.read(columns)
+            record['rows'] = len(processed_df)
+
+        results = []
+        for op in operations:
+            with stage('override', rows=len(processed_df), dataset_id=dataset.id, column=op['column'], new_type=op['new_type']):
+                success, message = override_data(processed_df, op['column'], op['new_type'])
+            results.append({'column': op['column'], 'new_type': op['new_type'], 'success': success, 'message': message})
+        if not all(result['success'] for result in results):
+            return JsonResponse({'error': 'No column was overridden, as some conversions failed.', 'results': results}, status=500)
+
+        column_types = {col.column_name: col for col in dataset.column_types.filter(column_name__in=columns)}
+        for op in operations:
+            column_types[op['column']].user_modified_type = op['new_type']
+        with transaction.atomic():
+            ColumnType.objects.bulk_update(column_types.values(), ['user_modified_type'])
+            # Datasets uploaded from the same file share a store until one of them is modified
+            store = private_store(dataset)
+            # Written last, so a failed write rolls the column types back
+            with stage('store_write', rows=len(processed_df), dataset_id=dataset.id, columns=len(columns)):
+                store.replace_columns({col: [processed_df[col]] for col in columns})
+    except Exception as e:
+        logger.exception("Error overriding column types")
+        return JsonResponse({'error': str(e)}, status=500)
+
+    return JsonResponse({
+        **dataset_response(dataset, store),
+        'results': results,
+        'message': f"Data types of {len(columns)} columns overridden successfully.",
+    })
+
+@csrf_exempt
+def append_rows(request, dataset_id):
+    """
+    Appends the rows of an uploaded file ('datafile') to a processed dataset.
+
+    Only the new rows are inferred and converted, against the dataset's current column types, which are
+    widened when the new rows need it. The response describes the dataset like an upload, plus the
+    number of 'appended_rows' and the 'widened' columns.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+
+    dataset = Dataset.objects.filter(id=dataset_id).first()
+    if dataset is None or not dataset.storage_path:
+        return JsonResponse({'error': 'Dataset not found.'}, status=404)
+    datafile = request.FILES.get('datafile', None)
+    if datafile is None:
+        return JsonResponse({'error': 'No file provided.'}, status=400)
+    if not is_supported_file(datafile.name):
+        return JsonResponse({'error': 'Unsupported file format. Only .csv and .xlsx are supported.'}, status=400)
+
+    try:
+        result = append_to_dataset(dataset, datafile)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.exception("Error appending '%s' to dataset %s", datafile.name, dataset.id)
+        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({**dataset_response(dataset), **result})
+
+def dataset_rows(request, dataset_id):
+    """
+    Returns one page of a processed dataset, read straight from its column store.
+
+    Query parameters:
+    - offset (int): The first row to return. Defaults to 0.
+    - limit (int): The number of rows to return, at most ROWS_MAX_LIMIT. Defaults to ROWS_DEFAULT_LIMIT.
+    - columns (str): A comma-separated list of columns to return. Defaults to every column.
+    - orient (str): 'records' (the default) returns a list of rows; 'columns' returns
+      {columns: [...], data: {column: [...]}}, which is cheaper to build and encode.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+
+    dataset = Dataset.objects.filter(id=dataset_id).first()
+    if dataset is None or not dataset.storage_path:
+        return JsonResponse({'error': 'Dataset not found.'}, status=404)
+
+    try:
+        offset = int(request.GET.get('offset', 0))
+        limit = int(request.GET.get('limit', settings.ROWS_DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': 'offset and limit must be integers.'}, status=400)
+    if offset < 0 or limit < 1 or limit > settings.ROWS_MAX_LIMIT:
+        return JsonResponse({'error': f'offset must be at least 0 and limit between 1 and {settings.ROWS_MAX_LIMIT}.'}, status=400)
+
+    orient = request.GET.get('orient', 'records')
+    if orient not in ('records', 'columns'):
+        return JsonResponse({'error': "orient must be 'records' or 'columns'."}, status=400)
+
+    store = ColumnStore(dataset.storage_path)
+    columns = request.GET.get('columns')
+    columns = columns.split(',') if columns else store.columns
+    unknown_columns = [col for col in columns if col not in store.columns]
+    if unknown_columns:
+        return JsonResponse({'error': f"Unknown columns: {', '.join(unknown_columns)}."}, status=400)
+
+    try:
+        with stage('read_rows', dataset_id=dataset.id) as record:
+            rows = store.read(columns, start=offset, stop=offset + limit)
+            record['rows'] = len(rows)
+        response = {
+            'dataset_id': dataset.id,
+            'row_count': store.row_count,
+            'offset': offset,
+            'limit': limit,
+            'columns': columns,
+        }
+        with stage('serialise', rows=len(rows), dataset_id=dataset.id, orient=orient):
+            if orient == 'columns':
+                response['processed_data'] = serialise_dataframe_columnar(rows)
+                return HttpResponse(dumps_json(response), content_type='application/json')
+            response['processed_data'] = serialise_dataframe(rows)
+            return JsonResponse(response)
+    except Exception as e:
+        logger.exception("Error reading rows of dataset %s", dataset.id)
+        return JsonResponse({'error': str(e)}, status=500)
+
+def metrics(request):
+    """
+    Serves the pipeline metrics of this server process in the Prometheus text format: per-stage
+    duration, throughput and memory histograms, and per-type column inference histograms.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Method not allowed.'}, status=405)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
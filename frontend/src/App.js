@@ -18,9 +18,9 @@ import DataTableComponent from './components/DataTableComponent';
  * Callbacks:
  * - handleUploadSuccess(data): A function that updates the `processedData` state with the data returned from the
  *   FileUploadComponent upon a successful file upload.
- * - handleOverrideSuccess(newProcessedData, newColumnsWithTypes): A function that updates the `processedData` state
- *   to reflect changes made through the DataTypeOverrideComponent. It merges the new processed data and columns with
- *   types information into the existing state.
+ * - handleOverrideSuccess(response): A function that updates the `processedData` state to reflect changes made
+ *   through the DataTypeOverrideComponent. It merges the dataset id, row count, first page of processed data and
+ *   columns with types information from the override response into the existing state.
  *
  * Children:
  * - FileUploadComponent: A child component used for uploading files. It accepts a callback (`onUploadSuccess`) to
@@ -38,12 +38,14 @@ function App() {
     setProcessedData(data);
   };
 
-  const handleOverrideSuccess = (newProcessedData, newColumnsWithTypes) => {
+  const handleOverrideSuccess = (response) => {
     // Update the processedData with the new data and types
     setProcessedData(prevData => ({
       ...prevData,
-      processed_data: newProcessedData,
-      columns_with_types: newColumnsWithTypes,
+      dataset_id: response.dataset_id,
+      row_count: response.row_count,
+      processed_data: response.processed_data,
+      columns_with_types: response.columns_with_types,
     }));
   };
 
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import DataTypeOverrideComponent from './DataTypeOverrideComponent';
 
 /**
@@ -10,26 +10,31 @@ import DataTypeOverrideComponent from './DataTypeOverrideComponent';
  * and metadata about the columns (such as names and data types).
  *
  * Props:
- * - processedData (Object): An object containing processed data and metadata. It should have two keys:
- *   `processed_data`, an array of objects where each object represents a row of data, and `columns_with_types`,
- *   an array of objects detailing columns and their data types.
+ * - processedData (Object): An object containing processed data and metadata. It should have four keys:
+ *   `dataset_id`, the id of the stored dataset; `row_count`, the total number of rows in the dataset;
+ *   `processed_data`, an array of objects holding the first page of rows; and `columns_with_types`, an array of
+ *   objects detailing columns and their data types.
  * - onOverrideSuccess (function): A callback function that is called when the data type of a column is successfully
- *   overridden. It receives the updated processed data and columns metadata as its arguments.
+ *   overridden. It receives the server response, holding the first page of rows and the updated columns metadata.
  *
  * Usage:
  * <DataTableComponent
  *   processedData={{
+ *     dataset_id: 1,
+ *     row_count: 1000,
  *     processed_data: [{ Column1: 'Value1', Column2: 'Value2' }, ...],
  *     columns_with_types: [{ column: 'Column1', data_type: 'Text' }, ...]
  *   }}
- *   onOverrideSuccess={(processedData, columnsWithTypes) => {
+ *   onOverrideSuccess={(response) => {
  *     // Handle the successful override (e.g., update state or UI)
  *   }}
  * />
  *
  * The component first checks if the `processedData` prop is provided and contains data; if not, it renders nothing.
- * It calculates the total number of pages based on the data size and the specified `pageSize`. It displays the data
- * for the current page, with column headers showing both the column names and their data types. Below the table,
+ * It calculates the total number of pages from `row_count` and the specified `pageSize`. The first page is taken from
+ * the rows returned with the upload; every other page is fetched on demand from the `/data/<dataset_id>/rows/`
+ * endpoint, so the browser never holds more than one page of a large dataset. It displays the data for the current
+ * page, with column headers showing both the column names and their data types. Below the table,
  * pagination controls ('Previous' and 'Next' buttons) allow the user to navigate through the pages.
  *
  * The DataTypeOverrideComponent is included below the table, allowing users to override the data type of any column.
@@ -39,20 +44,44 @@ import DataTypeOverrideComponent from './DataTypeOverrideComponent';
  * Note:
  * - This component is designed to work with data structures specific to its props. Ensure your data conforms to the
  *   expected format.
- * - The `pageSize` is currently set to 5 rows per page and can be adjusted as needed.
+ * - The `pageSize` is currently set to 5 rows per page and can be adjusted as needed. It must not exceed the first
+ *   page returned by the server (ROWS_DEFAULT_LIMIT) or the largest page it serves (ROWS_MAX_LIMIT).
+ * - The server URL is hardcoded to 'https://data-processing-app-1.onrender.com/data/<dataset_id>/rows/'.
  * - The component uses simple inline styling for the table and pagination controls. Consider using CSS or styled
  *   components for more sophisticated styling and responsiveness.
  */
 function DataTableComponent({ processedData, onOverrideSuccess }) {
   const pageSize = 5; // Number of rows per page
   const [currentPage, setCurrentPage] = useState(1);
+  const [currentData, setCurrentData] = useState([]);
+
+  // Go back to the first page whenever a new upload or override replaces the data
+  useEffect(() => {
+    setCurrentPage(1);
+  }, [processedData]);
+
+  useEffect(() => {
+    if (!processedData || !processedData.processed_data) return;
+    if (currentPage === 1) {
+      setCurrentData(processedData.processed_data.slice(0, pageSize));
+      return;
+    }
+
+    let cancelled = false;
+    const offset = (currentPage - 1) * pageSize;
+    fetch(`https://data-processing-app-1.onrender.com/data/${processedData.dataset_id}/rows/?offset=${offset}&limit=${pageSize}`)
+      .then(response => response.json())
+      .then(data => {
+        if (!cancelled) setCurrentData(data.processed_data || []);
+      })
+      .catch(error => console.error('Error fetching rows:', error));
+    // Ignore the response of a page the user has already moved away from
+    return () => { cancelled = true; };
+  }, [processedData, currentPage]);
 
   if (!processedData || processedData.length === 0) return null;
 
-  const totalPages = Math.ceil(processedData.processed_data.length / pageSize);
-  const startIndex = (currentPage - 1) * pageSize;
-  const endIndex = startIndex + pageSize;
-  const currentData = processedData.processed_data.slice(startIndex, endIndex);
+  const totalPages = Math.max(Math.ceil(processedData.row_count / pageSize), 1);
 
   const handlePrevPage = () => {
     if (currentPage > 1) {
@@ -67,7 +96,7 @@ function DataTableComponent({ processedData, onOverrideSuccess }) {
   };
 
   const handleOverride = (response) => {
-    onOverrideSuccess(response.processed_data, response.columns_with_types);
+    onOverrideSuccess(response);
   };
 
   return (
@@ -105,7 +134,7 @@ function DataTableComponent({ processedData, onOverrideSuccess }) {
         <span style={{ margin: '0 10px' }}>Page {currentPage} of {totalPages}</span>
         <button onClick={handleNextPage} disabled={currentPage === totalPages}>Next</button>
       </div>
-      <DataTypeOverrideComponent columnsWithTypes={processedData.columns_with_types} onSubmitOverride={handleOverride} />
+      <DataTypeOverrideComponent datasetId={processedData.dataset_id} columnsWithTypes={processedData.columns_with_types} onSubmitOverride={handleOverride} />
     </div>
   );
 }
@@ -8,6 +8,7 @@ import React, { useState } from 'react';
  * messages based on the response and invokes a callback function to inform the parent component of the change.
  *
  * Props:
+ * - datasetId (number): The id of the dataset whose columns are overridden.
  * - columnsWithTypes (Array): An array of objects where each object represents a column with its current data type.
  *   Each object should have a 'column' key indicating the column name. This prop is required for the component to
  *   function as intended.
@@ -17,6 +18,7 @@ import React, { useState } from 'react';
  *
  * Usage:
  * <DataTypeOverrideComponent
+ *   datasetId={1}
  *   columnsWithTypes={[
  *     { column: 'Column1', type: 'Integer' },
  *     { column: 'Column2', type: 'Text' },
@@ -32,18 +34,21 @@ import React, { useState } from 'react';
  * user selects both a column and a new data type and submits the form, the component attempts to post this information
  * to a server endpoint.
  *
+ * Before converting, the component sends a dry run that converts a sample of the column. If some sampled values would
+ * fail to convert, the user is shown examples and asked to confirm before the whole column is converted.
+ *
  * Upon a successful submission, it displays a success message and calls the `onSubmitOverride` callback function with
  * the response data. If an error occurs during submission, it displays an error message.
  *
  * Note:
- * - The server URL is hardcoded to 'http://127.0.0.1:8000/data/override/'. This may need to be updated to match the
- *   actual URL of your backend server.
+ * - The server URL is hardcoded to 'https://data-processing-app-1.onrender.com/data/<datasetId>/override/'. This may
+ *   need to be updated to match the actual URL of your backend server.
  * - The component initialises with no column or data type selected and requires the user to make selections before
  *   submission. It also resets its selections upon a successful submission.
  * - The component does minimal validation and error handling. You may need to extend these functionalities based on
  *   your requirements.
  */
-function DataTypeOverrideComponent({ columnsWithTypes, onSubmitOverride }) {
+function DataTypeOverrideComponent({ datasetId, columnsWithTypes, onSubmitOverride }) {
   const [selectedColumn, setSelectedColumn] = useState('');
   const [newDataType, setNewDataType] = useState('');
   const [error, setError] = useState('');
@@ -62,15 +67,30 @@ function DataTypeOverrideComponent({ columnsWithTypes, onSubmitOverride }) {
       return;
     }
   
+    const postOverride = (dryRun) => fetch(`https://data-processing-app-1.onrender.com/data/${datasetId}/override/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ column: selectedColumn, new_type: newDataType, dry_run: dryRun }),
+    });
+
     try {
-      const response = await fetch('https://data-processing-app-1.onrender.com/data/override/', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ column: selectedColumn, new_type: newDataType }),
-      });
-  
+      // Check a sample first, so the user can back out before the whole column is converted
+      const previewResponse = await postOverride(true);
+      const preview = await previewResponse.json();
+      if (!previewResponse.ok) {
+        setError(preview.error || 'An error occurred.');
+        return;
+      }
+      if (preview.failed > 0 && !window.confirm(
+        `About ${preview.estimated_failures} values of ${selectedColumn} may not convert to ${newDataType} ` +
+        `(e.g. ${preview.examples.join(', ')}). Override anyway?`
+      )) {
+        return;
+      }
+
+      const response = await postOverride(false);
       const data = await response.json();
       if (response.ok) {
         setSuccess(data.message || 'Data type overridden successfully.'); // Set success message
@@ -1,17 +1,20 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 
 /**
  * FileUploadComponent - A React component for uploading files to a server.
  *
  * This component provides a simple UI for selecting and uploading files. It uses axios for making HTTP POST requests
- * to upload the selected file to a specified server endpoint. The component accepts a single prop, `onUploadSuccess`,
- * which is a callback function that gets called with the response data from the server upon successful upload.
+ * to upload the selected file to a specified server endpoint. The file is uploaded in asynchronous mode: the server
+ * stores it, queues a processing job and answers straight away with a job id. The component then polls the job
+ * status endpoint, showing the progress of the job, until the processed data is ready. A file the server has already
+ * processed is answered from its cache with the processed data straight away, without a job. The component accepts a single
+ * prop, `onUploadSuccess`, which is a callback function that gets called with the processed data once the job succeeds.
  *
  * Props:
- * - onUploadSuccess (function): A callback function that is called when the file upload is successful. It receives
- *   the response data from the server as its only argument. This prop is optional; if not provided, the component
- *   will log a message to the console instead.
+ * - onUploadSuccess (function): A callback function that is called when the uploaded file has been processed. It
+ *   receives the final job status from the server, holding the processed data, as its only argument. This prop is
+ *   optional; if not provided, the component will log a message to the console instead.
  *
  * Usage:
  * <FileUploadComponent
@@ -22,19 +25,53 @@ import axios from 'axios';
  *
  * The component displays a file input for the user to select a file. Once a file is selected, an 'Upload' button
  * appears. Clicking this button will start the upload process. The component only accepts `.csv` and `.xlsx` files
- * for upload, but this can be customised via the `accept` attribute of the file input element.
+ * for upload, but this can be customised via the `accept` attribute of the file input element. For an `.xlsx` file a
+ * sheet name can be entered; the first sheet of the workbook is read when it is left empty.
  *
  * Dependencies:
  * - axios: The component uses axios for making HTTP requests. Ensure axios is installed and imported in your project.
  *
  * Note:
- * - The server URL is hardcoded to 'http://127.0.0.1:8000/data/upload/'. You may need to modify this to match your
+ * - The server URLs are hardcoded to 'https://data-processing-app-1.onrender.com/data/upload/' and
+ *   'https://data-processing-app-1.onrender.com/data/jobs/<job_id>/'. You may need to modify these to match your
  *   backend server's URL.
+ * - The job status is polled every `pollInterval` milliseconds (1 second by default).
  * - The component handles basic upload functionality and error logging. You may want to extend it with additional
- *   features such as progress indicators, more sophisticated error handling, or support for multiple file uploads.
+ *   features such as more sophisticated error handling or support for multiple file uploads.
  */
 function FileUploadComponent({ onUploadSuccess }) {
+  const pollInterval = 1000; // Milliseconds between two job status requests
   const [file, setFile] = useState(null);
+  const [sheet, setSheet] = useState('');
+  const [job, setJob] = useState(null);
+  const pollTimer = useRef(null);
+
+  // Stop polling when the component is removed
+  useEffect(() => () => clearTimeout(pollTimer.current), []);
+
+  const reportSuccess = (data) => {
+    if (typeof onUploadSuccess === 'function') {
+      onUploadSuccess(data);
+    } else {
+      console.error('onUploadSuccess is not a function');
+    }
+  };
+
+  const pollJob = async (jobId) => {
+    try {
+      const response = await axios.get(`https://data-processing-app-1.onrender.com/data/jobs/${jobId}/`);
+      setJob(response.data);
+      if (response.data.status === 'succeeded') {
+        reportSuccess(response.data);
+      } else if (response.data.status === 'failed') {
+        console.error('Error processing file:', response.data.error);
+      } else {
+        pollTimer.current = setTimeout(() => pollJob(jobId), pollInterval);
+      }
+    } catch (error) {
+      console.error('Error fetching job status:', error);
+    }
+  };
 
   const handleFileChange = (e) => {
     const selectedFile = e.target.files[0];
@@ -51,6 +88,11 @@ function FileUploadComponent({ onUploadSuccess }) {
     }
     const formData = new FormData();
     formData.append('datafile', file);
+    formData.append('mode', 'async');
+    if (sheet && file.name.toLowerCase().endsWith('.xlsx')) {
+      formData.append('sheet', sheet);
+    }
+    clearTimeout(pollTimer.current);
 
     try {
       const response = await axios.post('https://data-processing-app-1.onrender.com/data/upload/', formData, {
@@ -58,11 +100,14 @@ function FileUploadComponent({ onUploadSuccess }) {
           'Content-Type': 'multipart/form-data',
         },
       });
-      if (typeof onUploadSuccess === 'function') {
-        onUploadSuccess(response.data);
-      } else {
-        console.error('onUploadSuccess is not a function');
+      if (response.data.cached) {
+        // The file was processed before: the response already holds the processed data
+        setJob(null);
+        reportSuccess(response.data);
+        return;
       }
+      setJob(response.data);
+      pollJob(response.data.job_id);
     } catch (error) {
       console.error('Error uploading file:', error);
     }
@@ -71,7 +116,16 @@ function FileUploadComponent({ onUploadSuccess }) {
   return (
     <form>
       <input type="file" name="datafile" accept=".csv, .xlsx" onChange={handleFileChange} />
+      {file && file.name.toLowerCase().endsWith('.xlsx') && (
+        <input type="text" name="sheet" placeholder="Sheet (first by default)" value={sheet} onChange={(e) => setSheet(e.target.value)} />
+      )}
       <button type="button" onClick={handleUploadClick}>Upload</button>
+      {job && (job.status === 'queued' || job.status === 'running') && (
+        <span style={{ marginLeft: '10px' }}>Processing... {Math.round((job.progress || 0) * 100)}%</span>
+      )}
+      {job && job.status === 'failed' && (
+        <span style={{ marginLeft: '10px', color: 'red' }}>Processing failed: {job.error}</span>
+      )}
     </form>
   );
 }